@@ -0,0 +1 @@
+"""Performance benchmarks for the composer, the exporters and the command line tools."""
@@ -0,0 +1,95 @@
+"""Benchmarks for exporting yaml circuits through the API and the command line."""
+
+import importlib
+import os
+import subprocess
+import sys
+import tempfile
+
+from .circuits import build_circuit, scaled, write_circuit, write_nested_library
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+EXPORT_FORMATS = ["qiskit", "openqasm", "pyquil", "quil", "cirq"]
+
+REPOSITORY_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXPORT_SCRIPT = os.path.join(REPOSITORY_ROOT, "uranium_quantum", "circuit_exporter", "export-circuit.py")
+
+
+def _check_export_format(directory, export_format):
+    """Skip benchmarks for export formats that cannot run in this environment."""
+    path = write_circuit(os.path.join(directory, "probe.yaml"), build_circuit(2, 6), 0, "probe")
+    try:
+        code = ExportCircuit.get_exported_code([path], 0, export_format, False)
+    except Exception as ex:
+        raise NotImplementedError(f"Export format {export_format} is not available: {ex}")
+    if code.startswith("QASM translation exception"):
+        raise NotImplementedError(f"Export format {export_format} is not available: {code}")
+
+
+class ExportedCode:
+    """Time needed by get_exported_code for each export format."""
+
+    params = [EXPORT_FORMATS, scaled("gates"), scaled("qubits")]
+    param_names = ["format", "gates", "qubits"]
+
+    def setup(self, export_format, gates, qubits):
+        self.directory = tempfile.TemporaryDirectory()
+        _check_export_format(self.directory.name, export_format)
+        self.path = write_circuit(os.path.join(self.directory.name, "main.yaml"), build_circuit(qubits, gates), 0, "main")
+
+    def teardown(self, export_format, gates, qubits):
+        self.directory.cleanup()
+
+    def time_exported_code(self, export_format, gates, qubits):
+        ExportCircuit.get_exported_code([self.path], 0, export_format, False)
+
+    def peakmem_exported_code(self, export_format, gates, qubits):
+        ExportCircuit.get_exported_code([self.path], 0, export_format, False)
+
+
+class SubCircuitNesting:
+    """Time needed to export a circuit built from a chain of nested sub-circuits."""
+
+    params = [scaled("depth")]
+    param_names = ["depth"]
+
+    def setup(self, depth):
+        self.directory = tempfile.TemporaryDirectory()
+        self.files, self.main_circuit_id = write_nested_library(self.directory.name, depth)
+
+    def teardown(self, depth):
+        self.directory.cleanup()
+
+    def time_nested_export(self, depth):
+        ExportCircuit.get_exported_code(self.files, self.main_circuit_id, "qiskit", False)
+
+    def peakmem_nested_export(self, depth):
+        ExportCircuit.get_exported_code(self.files, self.main_circuit_id, "qiskit", False)
+
+
+class CommandLine:
+    """Wall time of one export-circuit.py invocation, interpreter start included."""
+
+    params = [scaled("gates")]
+    param_names = ["gates"]
+
+    def setup(self, gates):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = write_circuit(os.path.join(self.directory.name, "main.yaml"), build_circuit(20, gates), 0, "main")
+        self.environment = dict(os.environ)
+        self.environment["PYTHONPATH"] = os.pathsep.join(
+            [REPOSITORY_ROOT] + [path for path in [os.environ.get("PYTHONPATH")] if path]
+        )
+
+    def teardown(self, gates):
+        self.directory.cleanup()
+
+    def time_command_line_export(self, gates):
+        subprocess.run(
+            [sys.executable, EXPORT_SCRIPT, "-f", self.path, "-e", "qiskit", "-i", "0"],
+            cwd=self.directory.name,
+            env=self.environment,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
@@ -0,0 +1,177 @@
+"""Benchmarks for simulating circuits."""
+
+import random
+
+import numpy as np
+
+from uranium_quantum.circuit_composer.random_circuit_generator import generate_random_circuit
+from uranium_quantum.simulator import MPSSimulator, PauliSum, StatevectorSimulator, TableauSimulator, adjoint_gradient
+from uranium_quantum.simulator.gates import circuit_gates
+
+from .circuits import scaled
+
+CLIFFORD_GATES = [("hadamard", 1), ("s", 1), ("pauli-x", 1), ("swap", 2), ("iswap", 2)]
+
+
+def build_clifford_circuit(qubits, gates, seed=0):
+    """Build yaml data for a repeatable random Clifford circuit, about a third
+    of its gates being CX gates, followed by measurements of all qubits."""
+    random_generator = random.Random(seed)
+    circuit_gates = []
+    for _ in range(gates):
+        if random_generator.random() < 0.3:
+            control, target = random_generator.sample(range(qubits), 2)
+            circuit_gates.append({"name": "pauli-x", "targets": [target], "controls": [{"target": control, "state": "1"}]})
+        else:
+            name, no_targets = random_generator.choice(CLIFFORD_GATES)
+            circuit_gates.append({"name": name, "targets": random_generator.sample(range(qubits), no_targets)})
+    circuit_gates += [{"name": "measure-z", "targets": [qubit], "bit": qubit} for qubit in range(qubits)]
+    return {"steps": [{"index": 0, "gates": circuit_gates}]}
+
+
+def build_brickwork_circuit(qubits, layers, seed=0):
+    """Build yaml data for a repeatable random circuit of layers of u3 gates
+    followed by zz gates on alternate pairs of neighbouring qubits."""
+    random_generator = random.Random(seed)
+    circuit_gates = []
+    for layer in range(layers):
+        for qubit in range(qubits):
+            angles = {parameter: random_generator.uniform(-3, 3) for parameter in ("theta", "phi", "lambda")}
+            circuit_gates.append(dict(name="u3", targets=[qubit], **angles))
+        for qubit in range(layer % 2, qubits - 1, 2):
+            circuit_gates.append({"name": "zz", "targets": [qubit, qubit + 1], "theta": random_generator.uniform(-3, 3)})
+    return {"steps": [{"index": 0, "gates": circuit_gates}]}
+
+
+def build_parametric_circuit(qubits, layers):
+    """Build yaml data for a layered ansatz of ry and rz gates and zz gates
+    on alternate pairs of neighbouring qubits, each layer having its own
+    symbolic parameters named after the layer."""
+    circuit_gates = []
+    for layer in range(layers):
+        for qubit in range(qubits):
+            circuit_gates.append({"name": "ry-theta", "targets": [qubit], "theta": f"ry{layer}"})
+            circuit_gates.append({"name": "rz-theta", "targets": [qubit], "theta": f"rz{layer}"})
+        for qubit in range(layer % 2, qubits - 1, 2):
+            circuit_gates.append({"name": "zz", "targets": [qubit, qubit + 1], "theta": f"zz{layer}"})
+    return {"steps": [{"index": 0, "gates": circuit_gates}]}
+
+
+class CliffordSimulation:
+    """Time needed to simulate a random Clifford circuit of 10 gates per qubit
+    and measure all its qubits on a stabilizer tableau."""
+
+    params = [scaled("clifford_qubits")]
+    param_names = ["qubits"]
+
+    def setup(self, qubits):
+        self.yaml_data = build_clifford_circuit(qubits, 10 * qubits)
+
+    def time_run(self, qubits):
+        TableauSimulator(qubits, seed=0).run(self.yaml_data)
+
+    def peakmem_run(self, qubits):
+        TableauSimulator(qubits, seed=0).run(self.yaml_data)
+
+
+class MPSSimulation:
+    """Time needed to simulate a random brickwork circuit of 10 layers and
+    sample 1000 shots on a matrix product state of bond dimension at most 32."""
+
+    params = [scaled("qubits")]
+    param_names = ["qubits"]
+
+    def setup(self, qubits):
+        self.yaml_data = build_brickwork_circuit(qubits, 10)
+
+    def time_run(self, qubits):
+        MPSSimulator(qubits, max_bond_dimension=32, seed=0).run(self.yaml_data).sample(1000)
+
+    def peakmem_run(self, qubits):
+        MPSSimulator(qubits, max_bond_dimension=32, seed=0).run(self.yaml_data).sample(1000)
+
+
+class BatchedStatevectorSimulation:
+    """Time needed to simulate a 6 qubit ansatz of 5 layers for many bindings
+    of its parameters, in one batch or one binding at a time."""
+
+    params = [scaled("bindings")]
+    param_names = ["bindings"]
+
+    def setup(self, bindings):
+        self.yaml_data = build_parametric_circuit(6, 5)
+        random_generator = np.random.default_rng(0)
+        names = [f"{gate}{layer}" for gate in ("ry", "rz", "zz") for layer in range(5)]
+        self.bindings = {name: random_generator.uniform(-3, 3, bindings) for name in names}
+
+    def time_batched(self, bindings):
+        StatevectorSimulator.simulate(self.yaml_data, self.bindings)
+
+    def time_looped(self, bindings):
+        for index in range(bindings):
+            StatevectorSimulator.simulate(self.yaml_data, {name: values[index] for name, values in self.bindings.items()})
+
+
+class PauliExpectation:
+    """Time needed to compute the expectation value of a sum of random Pauli
+    operators on 8 statevectors of 14 qubits."""
+
+    params = [scaled("pauli_terms")]
+    param_names = ["terms"]
+
+    def setup(self, terms):
+        random_generator = random.Random(0)
+        self.observable = PauliSum({"".join(random_generator.choice("IXYZ") for _ in range(14)): 1.0 for _ in range(terms)})
+        states = np.random.default_rng(0).normal(size=(8, 2 ** 14)) + 0j
+        self.states = states / np.linalg.norm(states, axis=1)[:, None]
+
+    def time_expectation(self, terms):
+        self.observable.expectation(self.states)
+
+
+class AdjointGradient:
+    """Time needed to compute the gradient of the energy of a 10 qubit Ising
+    chain for an ansatz of a number of layers, three parameters per layer."""
+
+    params = [scaled("depth")]
+    param_names = ["layers"]
+
+    def setup(self, layers):
+        self.yaml_data = build_parametric_circuit(10, layers)
+        terms = {"I" * (8 - qubit) + "ZZ" + "I" * qubit: 1.0 for qubit in range(9)}
+        terms.update({"I" * (9 - qubit) + "X" + "I" * qubit: 0.5 for qubit in range(10)})
+        self.observable = PauliSum(terms)
+        random_generator = np.random.default_rng(0)
+        self.bindings = {f"{gate}{layer}": random_generator.uniform(-3, 3) for gate in ("ry", "rz", "zz") for layer in range(layers)}
+
+    def time_gradient(self, layers):
+        adjoint_gradient(self.yaml_data, self.observable, self.bindings)
+
+
+class PrecisionSimulation:
+    """Time, memory and accuracy of simulating a random circuit of 20 gates
+    per qubit from random_circuit_generator in each precision. The error is
+    the infidelity with the state simulated in double precision."""
+
+    params = [["double", "single", "mixed"], scaled("statevector_qubits")]
+    param_names = ["precision", "qubits"]
+
+    def setup(self, precision, qubits):
+        self.yaml_data = {"steps": [{"index": 0, "gates": circuit_gates(generate_random_circuit(qubits, 20 * qubits, seed=1))}]}
+        self.qubits = qubits
+
+    def simulate(self, precision):
+        return StatevectorSimulator(self.qubits, precision=precision, norm_check_interval=self.qubits).run(self.yaml_data)
+
+    def time_run(self, precision, qubits):
+        self.simulate(precision)
+
+    def peakmem_run(self, precision, qubits):
+        self.simulate(precision)
+
+    def track_infidelity(self, precision, qubits):
+        reference = self.simulate("double").states[0]
+        return 1 - abs(np.vdot(reference, self.simulate(precision).states[0])) ** 2
+
+    def track_norm_drift(self, precision, qubits):
+        return self.simulate(precision).norm_drift
@@ -0,0 +1,38 @@
+"""Benchmarks for routing yaml circuits on the coupling maps of devices."""
+
+from uranium_quantum.transpiler import CouplingMap, Router
+
+from .circuits import scaled
+
+
+def build_routing_circuit(qubits, gates):
+    """Build yaml data for a fixed, repeatable mix of single qubit gates and
+    CX gates between qubits a few rows apart on a square grid."""
+    rows = int(qubits ** 0.5)
+    strides = [1, rows, rows + 1, 2 * rows + 3, 5]
+    step_gates = []
+    for index in range(gates):
+        qubit = (index * 7) % qubits
+        if index % 2:
+            partner = (qubit + strides[index % len(strides)]) % qubits
+            step_gates.append({"name": "pauli-x", "targets": [partner], "controls": [{"target": qubit, "state": "1"}]})
+        else:
+            step_gates.append({"name": "hadamard", "targets": [qubit]})
+    return {"steps": [{"index": 0, "gates": step_gates}]}
+
+
+class Routing:
+    """Time needed to route a circuit on a square grid, swaps included."""
+
+    params = [scaled("gates"), scaled("grid_rows")]
+    param_names = ["gates", "grid_rows"]
+
+    def setup(self, gates, grid_rows):
+        self.router = Router(CouplingMap.grid(grid_rows, grid_rows))
+        self.yaml_data = build_routing_circuit(grid_rows * grid_rows, gates)
+
+    def time_route(self, gates, grid_rows):
+        self.router.route(self.yaml_data)
+
+    def peakmem_route(self, gates, grid_rows):
+        self.router.route(self.yaml_data)
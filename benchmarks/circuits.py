@@ -0,0 +1,131 @@
+"""Scaled circuits used as input by the benchmark suites."""
+
+import os
+
+import yaml
+
+from uranium_quantum.circuit_composer.circuit_composer import QuantumCircuit, Control
+
+# the scale is picked through an environment variable so that the same
+# suites can be used for a quick local check and for a full release run
+SCALES = {
+    "quick": {
+        "gates": [1_000, 10_000],
+        "qubits": [5, 50],
+        "depth": [1, 10, 50],
+        "grid_rows": [5, 10],
+        "clifford_qubits": [100, 1000],
+        "bindings": [10, 100],
+        "pauli_terms": [100, 1000],
+        "statevector_qubits": [10, 16],
+    },
+    "full": {
+        "gates": [1_000, 10_000, 100_000, 1_000_000],
+        "qubits": [5, 50, 200],
+        "depth": [1, 10, 100, 500],
+        "grid_rows": [5, 10, 32],
+        "clifford_qubits": [100, 1000, 5000],
+        "bindings": [10, 100, 1000],
+        "pauli_terms": [100, 1000, 10000],
+        "statevector_qubits": [10, 16, 22],
+    },
+}
+
+BENCHMARK_SCALE = os.environ.get("URANIUM_BENCHMARK_SCALE", "quick")
+
+
+def scaled(name):
+    """Get the list of values a benchmark parameter takes for the current scale."""
+    if BENCHMARK_SCALE not in SCALES:
+        raise Exception(f"Unknown benchmark scale {BENCHMARK_SCALE}, use one of: {', '.join(SCALES)}.")
+    return SCALES[BENCHMARK_SCALE][name]
+
+
+def add_gates(quantum_circuit, qubits, gates):
+    """Append a fixed, repeatable mix of one and two qubit gates to a circuit,
+    filling each step before moving to the next one."""
+    qubit = 0
+    for index in range(gates):
+        kind = index % 6
+        two_qubit_gate = kind >= 4 and qubits > 1
+        if qubit + (2 if two_qubit_gate else 1) > qubits:
+            quantum_circuit.increment_step()
+            qubit = 0
+        if two_qubit_gate:
+            if kind == 4:
+                quantum_circuit.gate_pauli_x([Control(target=qubit, state='1')], [qubit + 1])
+            else:
+                quantum_circuit.gate_zz([], [qubit, qubit + 1], 0.25)
+            qubit += 2
+        else:
+            if kind == 0:
+                quantum_circuit.gate_hadamard([], [qubit])
+            elif kind == 1:
+                quantum_circuit.gate_rz_theta([], [qubit], 0.5)
+            elif kind == 2:
+                quantum_circuit.gate_u3([], [qubit], 0.1, 0.2, 0.3)
+            else:
+                quantum_circuit.gate_t([], [qubit])
+            qubit += 1
+    return quantum_circuit
+
+
+def build_circuit(qubits, gates):
+    """Build a circuit with the requested number of qubits and gates."""
+    return add_gates(QuantumCircuit(qubits), qubits, gates)
+
+
+def write_circuit(path, quantum_circuit, circuit_id, circuit_name):
+    """Export a composer circuit and add the header fields the exporters expect."""
+    quantum_circuit.export(path)
+    with open(path, "r") as yaml_file:
+        content = yaml_file.read()
+    with open(path, "w") as yaml_file:
+        yaml_file.write(f"circuit_id: {circuit_id}\n")
+        yaml_file.write(f"circuit_name: {circuit_name}\n")
+        yaml_file.write(content)
+    return path
+
+
+def write_nested_library(directory, depth, qubits=3):
+    """Write a chain of circuits where each circuit uses the previous one as a gate.
+
+    Returns the list of files and the id of the outermost circuit."""
+    files = []
+    for circuit_id in range(depth + 1):
+        steps = [
+            {
+                "index": 0,
+                "gates": [{"name": "hadamard", "targets": [qubit]} for qubit in range(qubits)],
+            },
+            {
+                "index": 1,
+                "gates": [{"name": "pauli-x", "targets": [qubits - 1], "controls": [{"target": 0, "state": "1"}]}],
+            },
+        ]
+        if circuit_id > 0:
+            steps.append(
+                {
+                    "index": 2,
+                    "gates": [
+                        {
+                            "name": "circuit",
+                            "circuit_id": circuit_id - 1,
+                            "circuit_power": "1",
+                            "targets": list(range(qubits)),
+                        }
+                    ],
+                }
+            )
+        circuit = {
+            "circuit_id": circuit_id,
+            "circuit_name": f"level {circuit_id}",
+            "version": "1.1",
+            "circuit-type": "simple",
+            "steps": steps,
+        }
+        path = os.path.join(directory, f"level_{circuit_id}.yaml")
+        with open(path, "w") as yaml_file:
+            yaml.safe_dump(circuit, yaml_file, sort_keys=False)
+        files.append(path)
+    return files, depth
@@ -0,0 +1,210 @@
+"""Run the benchmark suites, store the results as a JSON baseline and
+compare them against a previous baseline.
+
+The suites follow the asv layout: classes with optional `params`, `param_names`,
+`setup` and `teardown` members and `time_*` or `peakmem_*` methods."""
+
+import datetime
+import importlib
+import itertools
+import json
+import pkgutil
+import platform
+import sys
+import time
+import tracemalloc
+
+import click
+
+from .circuits import BENCHMARK_SCALE
+
+BENCHMARK_PACKAGE = "benchmarks"
+BENCHMARK_MODULE_PREFIX = "bench_"
+
+
+def _package_version():
+    try:
+        from importlib.metadata import version
+
+        return version("uranium_quantum")
+    except Exception:
+        return "unknown"
+
+
+def discover_suites():
+    """Get (module name, class) pairs for all benchmark classes."""
+    package = importlib.import_module(BENCHMARK_PACKAGE)
+    suites = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        if not module_info.name.startswith(BENCHMARK_MODULE_PREFIX):
+            continue
+        module = importlib.import_module(f"{BENCHMARK_PACKAGE}.{module_info.name}")
+        for name, value in vars(module).items():
+            if isinstance(value, type) and value.__module__ == module.__name__ and _benchmark_methods(value):
+                suites.append((module_info.name, value))
+    return suites
+
+
+def _benchmark_methods(suite):
+    return [name for name in dir(suite) if name.startswith("time_") or name.startswith("peakmem_")]
+
+
+def _parameter_combinations(suite):
+    params = getattr(suite, "params", [])
+    if not params:
+        return [()]
+    # a flat list of values means a single parameter
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]
+    return list(itertools.product(*params))
+
+
+def _benchmark_key(module_name, suite, method, param_names, combination):
+    key = f"{module_name}.{suite.__name__}.{method}"
+    if combination:
+        arguments = ", ".join(f"{name}={value}" for name, value in zip(param_names, combination))
+        key += f"({arguments})"
+    return key
+
+
+def _measure(function, method, combination, repeat):
+    if method.startswith("peakmem_"):
+        tracemalloc.start()
+        try:
+            function(*combination)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"type": "peakmem", "unit": "bytes", "value": peak}
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*combination)
+        samples.append(time.perf_counter() - start)
+    return {"type": "time", "unit": "seconds", "value": min(samples), "samples": samples}
+
+
+def run_suites(selection=None, repeat=3):
+    """Run all benchmarks whose key contains the selection string."""
+    results = {}
+    for module_name, suite in discover_suites():
+        param_names = getattr(suite, "param_names", [])
+        for combination in _parameter_combinations(suite):
+            methods = [
+                method
+                for method in _benchmark_methods(suite)
+                if not selection or selection in _benchmark_key(module_name, suite, method, param_names, combination)
+            ]
+            for method in methods:
+                key = _benchmark_key(module_name, suite, method, param_names, combination)
+                instance = suite()
+                try:
+                    if hasattr(instance, "setup"):
+                        instance.setup(*combination)
+                except NotImplementedError as ex:
+                    results[key] = {"skipped": str(ex)}
+                    click.echo(f"{key}: skipped")
+                    continue
+                try:
+                    results[key] = _measure(getattr(instance, method), method, combination, repeat)
+                except Exception as ex:
+                    results[key] = {"failed": f"{type(ex).__name__}: {ex}"}
+                finally:
+                    if hasattr(instance, "teardown"):
+                        instance.teardown(*combination)
+                click.echo(f"{key}: {_format_result(results[key])}")
+    return results
+
+
+def _format_result(result):
+    if "skipped" in result:
+        return "skipped"
+    if "failed" in result:
+        return f"failed ({result['failed']})"
+    if result["type"] == "time":
+        return f"{result['value']:.6f} s"
+    return f"{result['value'] / 2**20:.2f} MiB"
+
+
+def compare_results(results, baseline, threshold):
+    """Get the benchmarks that got slower or use more memory than in the baseline
+    by more than the threshold ratio."""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous or "value" not in result or "value" not in previous:
+            continue
+        if previous["value"] <= 0:
+            continue
+        ratio = result["value"] / previous["value"]
+        if ratio > threshold:
+            regressions.append((key, previous["value"], result["value"], ratio))
+    return regressions
+
+
+@click.command()
+@click.option(
+    "--output",
+    "-o",
+    required=False,
+    help="JSON file where results are stored, by default benchmark_<version>_<scale>.json.",
+)
+@click.option(
+    "--compare",
+    "-c",
+    required=False,
+    help="A JSON baseline produced by an earlier run to compare the results against.",
+)
+@click.option(
+    "--threshold",
+    "-t",
+    type=float,
+    default=1.25,
+    help="Ratio between new and baseline value above which a benchmark is reported as a regression.",
+)
+@click.option(
+    "--repeat",
+    "-r",
+    type=int,
+    default=3,
+    help="How many times each timing benchmark is repeated, the best time is kept.",
+)
+@click.option(
+    "--bench",
+    "-b",
+    required=False,
+    help="Only run benchmarks whose name contains this string.",
+)
+def main(output, compare, threshold, repeat, bench):
+    version = _package_version()
+    results = run_suites(bench, repeat)
+    report = {
+        "meta": {
+            "version": version,
+            "scale": BENCHMARK_SCALE,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    output_file = output or f"benchmark_{version}_{BENCHMARK_SCALE}.json"
+    with open(output_file, "w") as outfile:
+        json.dump(report, outfile, indent=2, sort_keys=True)
+
+    if compare:
+        with open(compare, "r") as infile:
+            baseline = json.load(infile)
+        if baseline["meta"].get("scale") != BENCHMARK_SCALE:
+            click.echo(f"Warning: the baseline was recorded at scale {baseline['meta'].get('scale')}.")
+        regressions = compare_results(results, baseline["results"], threshold)
+        for key, previous, current, ratio in regressions:
+            click.echo(f"REGRESSION {key}: {previous:.6g} -> {current:.6g} ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        click.echo("No regressions found.")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,7 @@ except:
 
 setup(
   name = 'uranium-quantum',
-  packages = ['uranium_quantum/circuit_composer', 'uranium_quantum/circuit_exporter'],  
+  packages = ['uranium_quantum/circuit_composer', 'uranium_quantum/circuit_exporter', 'uranium_quantum/transpiler', 'uranium_quantum/simulator'],  
   version = '0.3.14',
   license='MIT',
   description = 'Support libraries for the Uranium quantum computing platform (https://uranium.transilvania-quantum.org/).',
@@ -1,5 +1,5 @@
 """This module defines some python helper API for working with quantum circuits."""
 
-__all__ = ["QuantumCircuit"]
+__all__ = ["QuantumCircuit", "Parameter"]
 
-from .circuit_composer import QuantumCircuit
+from .circuit_composer import QuantumCircuit, Parameter
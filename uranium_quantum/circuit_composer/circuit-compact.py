@@ -0,0 +1,62 @@
+"""Rewrites a circuit in yaml format with its gates moved to as few steps as
+possible. Circuits written by hand or imported from other tools often use
+more steps than needed, and fewer steps mean a shorter execution."""
+
+import click
+import yaml
+
+from uranium_quantum.circuit_composer.circuit_composer import QuantumCircuit
+from uranium_quantum.circuit_composer.step_index import StepIndex
+
+# top level keys written by QuantumCircuit.export, other keys, such as the
+# global phase of transpiled circuits, are carried over as they are
+COMPOSER_KEYS = {"version", "circuit-type", "circuit_id", "circuit_name", "steps"}
+
+
+def compact_circuit(input_path, output_path=None, schedule="asap", commute=False):
+    """Compact a circuit in yaml format and write it, over the input file
+    unless an output file is given. Returns the number of steps of the
+    circuit before and after."""
+    step_index = StepIndex(input_path)
+    other_keys = {key: value for key, value in step_index.header.items() if key not in COMPOSER_KEYS}
+    step_index.close()
+    quantum_circuit = QuantumCircuit.load(input_path)
+    compacted = quantum_circuit.compact(schedule, commute)
+    output_path = compacted.export(output_path or input_path)[0]
+    if other_keys:
+        with open(output_path, "a") as yaml_file:
+            yaml_file.write(yaml.safe_dump(other_keys, default_flow_style=False, sort_keys=False))
+    return quantum_circuit.current_step() + 1, compacted.current_step() + 1
+
+
+@click.command()
+@click.argument("input_file")
+@click.option(
+    "--output",
+    "-o",
+    "output_file",
+    required=False,
+    help="File the compacted circuit is written to, by default the input file."
+)
+@click.option(
+    "--schedule",
+    "-s",
+    type=click.Choice(["asap", "alap"], case_sensitive=False),
+    default="asap",
+    show_default=True,
+    help="Move gates to steps as soon or as late as possible."
+)
+@click.option(
+    "--commute",
+    is_flag=True,
+    default=False,
+    help="Let gates move past the gates they commute with."
+)
+def main(input_file, output_file = None, schedule = "asap", commute = False):
+    """Move the gates of a circuit in yaml format to as few steps as possible."""
+    depth_before, depth_after = compact_circuit(input_file, output_file, schedule.lower(), commute)
+    print(f"Depth: {depth_before} -> {depth_after} steps.")
+
+
+if __name__ == "__main__":
+    main()
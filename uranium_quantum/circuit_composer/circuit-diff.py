@@ -0,0 +1,322 @@
+"""Structural diff between two circuits in yaml format: steps are compared by
+their gates, independently of the order of gates in a step and of how
+parameters are written, and the steps of both circuits are aligned before
+the gates of changed steps are compared."""
+
+import bisect
+import collections
+import difflib
+
+import click
+
+from uranium_quantum.circuit_composer.step_index import StepIndex
+
+# gaps between aligned steps are diffed with difflib when smaller than this
+# number of step pairs, otherwise they are reported as changed steps
+MAX_GAP_COMPARISONS = 1_000_000
+
+
+def parse_scalar(value):
+    """Parse a scalar value as written by QuantumCircuit.export, numbers
+    are kept as text and converted when gates are made canonical."""
+    return value[1:-1] if value[:1] == "'" else value
+
+
+def parse_composer_step(body):
+    """Parse the gates of a step in the layout written by QuantumCircuit.export,
+    much faster than a yaml parser. The body starts with the 'gates:' line."""
+    gates = []
+    gate = None
+    aggregated_gate = None
+    for line in body.split("\n")[1:]:
+        text = line.lstrip(" ")
+        indent = len(line) - len(text)
+        if indent == 6:
+            gate = {"name": text[8:]}
+            gates.append(gate)
+        elif indent == 8:
+            key, _, value = text.partition(": ")
+            if value:
+                gate[key] = parse_scalar(value)
+            else:
+                gate[key[:-1]] = []
+        elif indent == 10:
+            if text.startswith("- name: "):
+                aggregated_gate = {"name": text[8:]}
+                gate["gates"].append(aggregated_gate)
+            elif text.startswith("- target: "):
+                gate["controls"].append({"target": int(text[10:])})
+            else:
+                gate["targets"].append(int(text[2:]))
+        elif indent == 12:
+            key, _, value = text.partition(": ")
+            if key == "state":
+                gate["controls"][-1]["state"] = parse_scalar(value)
+            elif value:
+                aggregated_gate[key] = parse_scalar(value)
+            else:
+                aggregated_gate[key[:-1]] = []
+        elif indent == 14:
+            aggregated_gate["targets"].append(int(text[2:]))
+    return gates
+
+
+def normalize_parameter(key, value):
+    if key == "root":
+        # 1/2^k and 1/t, with k and t written either as integers or as floats
+        value = str(value)
+        prefix, degree = ("1/2^", value[4:]) if "^" in value else ("1/", value[2:])
+        return prefix + repr(float(degree))
+    if key == "circuit_power":
+        return str(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def canonical_gate(gate):
+    """Get a hashable form of a gate: controls and aggregated gates are
+    sorted, numeric parameters are compared as floats."""
+    controls = gate.get("controls")
+    controls = tuple(sorted((control["target"], str(control["state"])) for control in controls)) if controls else ()
+    aggregated_gates = gate.get("gates")
+    aggregated_gates = tuple(sort_gates(canonical_gate(aggregated_gate) for aggregated_gate in aggregated_gates)) if aggregated_gates else ()
+    parameters = tuple(sorted(
+        (key, normalize_parameter(key, value)) for key, value in gate.items()
+        if key not in ("name", "targets", "controls", "gates")
+    ))
+    return (gate["name"], tuple(gate.get("targets") or []), controls, parameters, aggregated_gates)
+
+
+def sort_gates(gates):
+    # gates in a step act on different qubits, so sorting them by
+    # qubits never compares parameters of different types
+    return sorted(gates, key=lambda gate: gate[1:3])
+
+
+class CircuitSteps:
+    """The canonical gates of each step of a yaml circuit file, read step by step."""
+
+    def __init__(self, path):
+        self._steps = StepIndex(path)
+
+    def __len__(self):
+        return len(self._steps)
+
+    def gates(self, step):
+        """Get the canonical gates of a step, sorted."""
+        if self._steps.composer_layout:
+            gates = parse_composer_step(self._steps.read_body(step))
+        else:
+            gates = self._steps.read_gates(step)
+        return sort_gates(canonical_gate(gate) for gate in gates)
+
+    def keys(self, known_steps):
+        """Get one hash per step, equal for steps holding the same gates.
+
+        known_steps maps hashes of the text of steps to step hashes, it is
+        shared by both circuits so identical steps are made canonical once."""
+        keys = []
+        for step in range(len(self._steps)):
+            text_key = hash(self._steps.read(step).partition("\n")[2])
+            key = known_steps.get(text_key)
+            if key is None:
+                key = known_steps[text_key] = hash(tuple(self.gates(step)))
+            keys.append(key)
+        return keys
+
+    def close(self):
+        self._steps.close()
+
+
+def unique_positions(keys, start, end):
+    positions = {}
+    for position in range(start, end):
+        key = keys[position]
+        positions[key] = None if key in positions else position
+    return positions
+
+
+def align_steps(left_keys, right_keys):
+    """Align two sequences of step hashes, returns difflib style opcodes.
+
+    Common prefixes and suffixes are matched first, then steps whose hash is
+    unique on both sides are used as anchors, the longest increasing run of
+    anchors is kept and the gaps between anchors are aligned recursively
+    (patience diff). This keeps the alignment close to linear in the number
+    of steps for the usual case of few, local changes."""
+    opcodes = []
+    pending = [(0, len(left_keys), 0, len(right_keys))]
+    while pending:
+        left_start, left_end, right_start, right_end = pending.pop()
+        prefix = 0
+        while left_start + prefix < left_end and right_start + prefix < right_end and left_keys[left_start + prefix] == right_keys[right_start + prefix]:
+            prefix += 1
+        suffix = 0
+        while left_end - suffix > left_start + prefix and right_end - suffix > right_start + prefix and left_keys[left_end - suffix - 1] == right_keys[right_end - suffix - 1]:
+            suffix += 1
+        if prefix:
+            opcodes.append(("equal", left_start, left_start + prefix, right_start, right_start + prefix))
+        if suffix:
+            opcodes.append(("equal", left_end - suffix, left_end, right_end - suffix, right_end))
+        left_start, left_end = left_start + prefix, left_end - suffix
+        right_start, right_end = right_start + prefix, right_end - suffix
+        if left_start == left_end and right_start == right_end:
+            continue
+        if left_start == left_end:
+            opcodes.append(("insert", left_start, left_end, right_start, right_end))
+            continue
+        if right_start == right_end:
+            opcodes.append(("delete", left_start, left_end, right_start, right_end))
+            continue
+
+        left_unique = unique_positions(left_keys, left_start, left_end)
+        right_unique = unique_positions(right_keys, right_start, right_end)
+        matches = [
+            (position, right_unique[key]) for key, position in left_unique.items()
+            if position is not None and right_unique.get(key) is not None
+        ]
+        anchors = longest_increasing_matches(sorted(matches))
+        if anchors:
+            previous_left, previous_right = left_start, right_start
+            for left_position, right_position in anchors + [(left_end, right_end)]:
+                if previous_left < left_position or previous_right < right_position:
+                    pending.append((previous_left, left_position, previous_right, right_position))
+                if left_position < left_end:
+                    opcodes.append(("equal", left_position, left_position + 1, right_position, right_position + 1))
+                previous_left, previous_right = left_position + 1, right_position + 1
+        elif (left_end - left_start) * (right_end - right_start) <= MAX_GAP_COMPARISONS:
+            matcher = difflib.SequenceMatcher(None, left_keys[left_start:left_end], right_keys[right_start:right_end], autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                opcodes.append((tag, left_start + i1, left_start + i2, right_start + j1, right_start + j2))
+        else:
+            opcodes.append(("replace", left_start, left_end, right_start, right_end))
+    return sorted(opcodes, key=lambda opcode: (opcode[1], opcode[3]))
+
+
+def longest_increasing_matches(matches):
+    """Keep the longest run of (left, right) matches, sorted by left position,
+    whose right positions increase too."""
+    tails = []
+    tail_indices = []
+    previous = [None] * len(matches)
+    for index, (_, right_position) in enumerate(matches):
+        length = bisect.bisect_left(tails, right_position)
+        if length == len(tails):
+            tails.append(right_position)
+            tail_indices.append(index)
+        else:
+            tails[length] = right_position
+            tail_indices[length] = index
+        previous[index] = tail_indices[length - 1] if length else None
+    longest = []
+    index = tail_indices[-1] if tail_indices else None
+    while index is not None:
+        longest.append(matches[index])
+        index = previous[index]
+    return longest[::-1]
+
+
+def diff_gates(left_gates, right_gates):
+    """Compare the canonical gates of two steps: gates on the same qubits
+    which differ otherwise are reported as changed."""
+    left_counts = collections.Counter(left_gates)
+    right_counts = collections.Counter(right_gates)
+    inserted = [gate for gate in right_gates if right_counts[gate] > left_counts[gate]]
+    removed = [gate for gate in left_gates if left_counts[gate] > right_counts[gate]]
+    inserted_by_qubits = {gate[1:3]: gate for gate in inserted}
+    changed = []
+    for gate in list(removed):
+        same_qubits = inserted_by_qubits.pop(gate[1:3], None)
+        if same_qubits is not None:
+            removed.remove(gate)
+            inserted.remove(same_qubits)
+            changed.append((gate, same_qubits))
+    return inserted, removed, changed
+
+
+def diff_circuits(left_path, right_path):
+    """Compare two circuits in yaml format, returns the list of differences.
+
+    Each difference is a dictionary with a 'kind', either 'removed-step',
+    'inserted-step' or 'changed-step', the step index in the left and in the
+    right circuit (None for inserted and removed steps) and the 'inserted',
+    'removed' and 'changed' gates, gates being in the form returned by
+    canonical_gate and changed gates (left gate, right gate) pairs. Steps are
+    identified by hashes of their canonical gates."""
+    left, right = CircuitSteps(left_path), CircuitSteps(right_path)
+    try:
+        differences = []
+        known_steps = {}
+        alignment = align_steps(left.keys(known_steps), right.keys(known_steps))
+        for tag, left_start, left_end, right_start, right_end in alignment:
+            if tag == "equal":
+                continue
+            # steps of a replaced range are compared in order, the
+            # remaining steps are removed or inserted as a whole
+            paired = min(left_end - left_start, right_end - right_start)
+            for offset in range(paired):
+                inserted, removed, changed = diff_gates(left.gates(left_start + offset), right.gates(right_start + offset))
+                differences.append({
+                    "kind": "changed-step", "left_step": left_start + offset, "right_step": right_start + offset,
+                    "inserted": inserted, "removed": removed, "changed": changed,
+                })
+            for step in range(left_start + paired, left_end):
+                differences.append({
+                    "kind": "removed-step", "left_step": step, "right_step": None,
+                    "inserted": [], "removed": left.gates(step), "changed": [],
+                })
+            for step in range(right_start + paired, right_end):
+                differences.append({
+                    "kind": "inserted-step", "left_step": None, "right_step": step,
+                    "inserted": right.gates(step), "removed": [], "changed": [],
+                })
+        return differences
+    finally:
+        left.close()
+        right.close()
+
+
+def format_gate(gate):
+    name, targets, controls, parameters, aggregated_gates = gate
+    text = f"{name} {list(targets)}"
+    if controls:
+        text += " controls " + ", ".join(f"{target}:{state}" for target, state in controls)
+    for key, value in parameters:
+        text += f" {key}={value}"
+    if aggregated_gates:
+        text += " (" + "; ".join(format_gate(aggregated_gate) for aggregated_gate in aggregated_gates) + ")"
+    return text
+
+
+def format_differences(differences):
+    """Get a readable report of the differences between two circuits."""
+    lines = []
+    for difference in differences:
+        if difference["kind"] == "removed-step":
+            lines.append(f"- step {difference['left_step']} removed")
+        elif difference["kind"] == "inserted-step":
+            lines.append(f"+ step {difference['right_step']} inserted")
+        else:
+            lines.append(f"~ step {difference['left_step']} -> {difference['right_step']} changed")
+        lines += [f"    - {format_gate(gate)}" for gate in difference["removed"]]
+        lines += [f"    + {format_gate(gate)}" for gate in difference["inserted"]]
+        lines += [f"    ~ {format_gate(left)} -> {format_gate(right)}" for left, right in difference["changed"]]
+    return "\n".join(lines)
+
+
+@click.command()
+@click.argument("left_file")
+@click.argument("right_file")
+def main(left_file, right_file):
+    """Report the steps and gates that differ between two circuits in yaml format."""
+    differences = diff_circuits(left_file, right_file)
+    if differences:
+        print(format_differences(differences))
+    else:
+        print("The circuits are identical.")
+
+
+if __name__ == "__main__":
+    main()
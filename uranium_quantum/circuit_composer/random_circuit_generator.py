@@ -2,6 +2,7 @@ import random
 import click
 
 from uranium_quantum.circuit_composer.circuit_composer import (
+    Control,
     QuantumCircuit,
 )
 
@@ -15,47 +16,47 @@ def _add_random_single_qbit_gate(quantum_circuit, qbit):
     gate = random.randint(0, NO_SINGLE_QBIT_GATES - 1)
 
     if gate == 0:
-        quantum_circuit.gate_u3(qbit, 1, 2, 3)
+        quantum_circuit.gate_u3([], [qbit], 1, 2, 3)
     elif gate == 1:
-        quantum_circuit.gate_u2(qbit, 2, 3)
+        quantum_circuit.gate_u2([], [qbit], 2, 3)
     elif gate == 2:
-        quantum_circuit.gate_u1(qbit, 2)
+        quantum_circuit.gate_u1([], [qbit], 2)
     elif gate == 3:
-        quantum_circuit.gate_identity(qbit)
+        quantum_circuit.gate_identity([qbit])
     elif gate == 4:
-        quantum_circuit.gate_hadamard(qbit)
+        quantum_circuit.gate_hadamard([], [qbit])
     elif gate == 5:
-        quantum_circuit.gate_pauli_x(qbit)
+        quantum_circuit.gate_pauli_x([], [qbit])
     elif gate == 6:
-        quantum_circuit.gate_pauli_y(qbit)
+        quantum_circuit.gate_pauli_y([], [qbit])
     elif gate == 7:
-        quantum_circuit.gate_pauli_z(qbit)
+        quantum_circuit.gate_pauli_z([], [qbit])
     elif gate == 8:
-        quantum_circuit.gate_t(qbit)
+        quantum_circuit.gate_t([], [qbit])
     elif gate == 9:
-        quantum_circuit.gate_t_dagger(qbit)
+        quantum_circuit.gate_t_dagger([], [qbit])
     elif gate == 10:
-        quantum_circuit.gate_rx_theta(qbit, 1.2)
+        quantum_circuit.gate_rx_theta([], [qbit], 1.2)
     elif gate == 11:
-        quantum_circuit.gate_ry_theta(qbit, 1.3)
+        quantum_circuit.gate_ry_theta([], [qbit], 1.3)
     elif gate == 12:
-        quantum_circuit.gate_rz_theta(qbit, 1.4)
+        quantum_circuit.gate_rz_theta([], [qbit], 1.4)
     elif gate == 13:
-        quantum_circuit.gate_s(qbit)
+        quantum_circuit.gate_s([], [qbit])
     elif gate == 14:
-        quantum_circuit.gate_s_dagger(qbit)
+        quantum_circuit.gate_s_dagger([], [qbit])
     elif gate == 15:
-        quantum_circuit.gate_pauli_x_root(qbit, k=random.randint(3, 10))
+        quantum_circuit.gate_pauli_x_root([], [qbit], k=random.randint(3, 10))
     elif gate == 16:
-        quantum_circuit.gate_pauli_y_root(qbit, k=random.randint(3, 10))
+        quantum_circuit.gate_pauli_y_root([], [qbit], k=random.randint(3, 10))
     elif gate == 17:
-        quantum_circuit.gate_pauli_z_root(qbit, k=random.randint(3, 10))
+        quantum_circuit.gate_pauli_z_root([], [qbit], k=random.randint(3, 10))
     elif gate == 18:
-        quantum_circuit.gate_pauli_x_root_dagger(qbit, k=random.randint(3, 10))
+        quantum_circuit.gate_pauli_x_root_dagger([], [qbit], k=random.randint(3, 10))
     elif gate == 19:
-        quantum_circuit.gate_pauli_y_root_dagger(qbit, k=random.randint(3, 10))
+        quantum_circuit.gate_pauli_y_root_dagger([], [qbit], k=random.randint(3, 10))
     elif gate == 20:
-        quantum_circuit.gate_pauli_z_root_dagger(qbit, k=random.randint(3, 10))
+        quantum_circuit.gate_pauli_z_root_dagger([], [qbit], k=random.randint(3, 10))
 
 
 def _add_random_two_qbit_gate(quantum_circuit, qbit, qbit2):
@@ -66,74 +67,62 @@ def _add_random_two_qbit_gate(quantum_circuit, qbit, qbit2):
     if random.randint(0, 1) == 1:
         qbit2, qbit = qbit, qbit2
 
-    control_state = random.randint(0, 1)
+    control = Control(target=qbit, state=str(random.randint(0, 1)))
 
     if gate == 0:
-        quantum_circuit.gate_ctrl_u3(qbit, control_state, qbit2, 1.0, 2.0, 3.0)
+        quantum_circuit.gate_u3([control], [qbit2], 1.0, 2.0, 3.0)
     elif gate == 1:
-        quantum_circuit.gate_ctrl_u2(qbit, control_state, qbit2, 2.0, 3.0)
+        quantum_circuit.gate_u2([control], [qbit2], 2.0, 3.0)
     elif gate == 2:
-        quantum_circuit.gate_ctrl_u1(qbit, control_state, qbit2, 1.0)
+        quantum_circuit.gate_u1([control], [qbit2], 1.0)
     elif gate == 3:
-        quantum_circuit.gate_ctrl_hadamard(qbit, control_state, qbit2)
+        quantum_circuit.gate_hadamard([control], [qbit2])
     elif gate == 4:
-        quantum_circuit.gate_ctrl_pauli_x(qbit, control_state, qbit2)
+        quantum_circuit.gate_pauli_x([control], [qbit2])
     elif gate == 5:
-        quantum_circuit.gate_ctrl_pauli_x(qbit, control_state, qbit2)
+        quantum_circuit.gate_pauli_y([control], [qbit2])
     elif gate == 6:
-        quantum_circuit.gate_ctrl_pauli_z(qbit, control_state, qbit2)
+        quantum_circuit.gate_pauli_z([control], [qbit2])
     elif gate == 7:
-        quantum_circuit.gate_ctrl_t(qbit, control_state, qbit2)
+        quantum_circuit.gate_t([control], [qbit2])
     elif gate == 8:
-        quantum_circuit.gate_ctrl_t_dagger(qbit, control_state, qbit2)
+        quantum_circuit.gate_t_dagger([control], [qbit2])
     elif gate == 9:
-        quantum_circuit.gate_ctrl_rx_theta(qbit, control_state, qbit2, 2.0)
+        quantum_circuit.gate_rx_theta([control], [qbit2], 2.0)
     elif gate == 10:
-        quantum_circuit.gate_ctrl_ry_theta(qbit, control_state, qbit2, 3.0)
+        quantum_circuit.gate_ry_theta([control], [qbit2], 3.0)
     elif gate == 11:
-        quantum_circuit.gate_ctrl_rz_theta(qbit, control_state, qbit2, 4.0)
+        quantum_circuit.gate_rz_theta([control], [qbit2], 4.0)
     elif gate == 12:
-        quantum_circuit.gate_ctrl_s(qbit, control_state, qbit2)
+        quantum_circuit.gate_s([control], [qbit2])
     elif gate == 13:
-        quantum_circuit.gate_ctrl_s_dagger(qbit, control_state, qbit2)
+        quantum_circuit.gate_s_dagger([control], [qbit2])
     elif gate == 14:
-        quantum_circuit.gate_ctrl_pauli_x_root(
-            qbit, control_state, qbit2, k=random.randint(3, 10)
-        )
+        quantum_circuit.gate_pauli_x_root([control], [qbit2], k=random.randint(3, 10))
     elif gate == 15:
-        quantum_circuit.gate_ctrl_pauli_y_root(
-            qbit, control_state, qbit2, k=random.randint(3, 10)
-        )
+        quantum_circuit.gate_pauli_y_root([control], [qbit2], k=random.randint(3, 10))
     elif gate == 16:
-        quantum_circuit.gate_ctrl_pauli_z_root(
-            qbit, control_state, qbit2, k=random.randint(3, 10)
-        )
+        quantum_circuit.gate_pauli_z_root([control], [qbit2], k=random.randint(3, 10))
     elif gate == 17:
-        quantum_circuit.gate_ctrl_pauli_x_root_dagger(
-            qbit, control_state, qbit2, k=random.randint(3, 10)
-        )
+        quantum_circuit.gate_pauli_x_root_dagger([control], [qbit2], k=random.randint(3, 10))
     elif gate == 18:
-        quantum_circuit.gate_ctrl_pauli_y_root_dagger(
-            qbit, control_state, qbit2, k=random.randint(3, 10)
-        )
+        quantum_circuit.gate_pauli_y_root_dagger([control], [qbit2], k=random.randint(3, 10))
     elif gate == 19:
-        quantum_circuit.gate_ctrl_pauli_z_root_dagger(
-            qbit, control_state, qbit2, k=random.randint(3, 10)
-        )
+        quantum_circuit.gate_pauli_z_root_dagger([control], [qbit2], k=random.randint(3, 10))
     elif gate == 20:
-        quantum_circuit.gate_swap(qbit, qbit2)
+        quantum_circuit.gate_swap([], [qbit, qbit2])
     elif gate == 21:
-        quantum_circuit.gate_sqrt_swap(qbit, qbit2)
+        quantum_circuit.gate_sqrt_swap([], [qbit, qbit2])
     elif gate == 22:
-        quantum_circuit.gate_swap_theta(qbit, qbit2, 2.0)
+        quantum_circuit.gate_swap_theta([], [qbit, qbit2], 2.0)
     elif gate == 23:
-        quantum_circuit.gate_iswap(qbit, qbit2)
+        quantum_circuit.gate_iswap([], [qbit, qbit2])
     # elif gate == 24:
-    #     quantum_circuit.gate_xx(qbit, qbit2, 3.0)
+    #     quantum_circuit.gate_xx([], [qbit, qbit2], 3.0)
     # elif gate == 25:
-    #     quantum_circuit.gate_yy(qbit, qbit2, 3.0)
+    #     quantum_circuit.gate_yy([], [qbit, qbit2], 3.0)
     # elif gate == 26:
-    #     quantum_circuit.gate_zz(qbit, qbit2, 3.0)
+    #     quantum_circuit.gate_zz([], [qbit, qbit2], 3.0)
 
 
 def _add_random_three_qbit_gate(quantum_circuit, qbit, qbit2, qbit3):
@@ -153,13 +142,15 @@ def _add_random_three_qbit_gate(quantum_circuit, qbit, qbit2, qbit3):
     elif qbit_order == 5:
         qbit, qbit3, qbit2 = qbit, qbit2, qbit3
 
-    control_state = random.randint(0, 1)
-    control_state2 = random.randint(0, 1)
+    control = Control(target=qbit, state=str(random.randint(0, 1)))
+    control2 = Control(target=qbit2, state=str(random.randint(0, 1)))
 
     if gate == 0:
-        quantum_circuit.gate_toffoli(qbit, control_state, qbit2, control_state2, qbit3)
+        # toffoli
+        quantum_circuit.gate_pauli_x([control, control2], [qbit3])
     else:
-        quantum_circuit.gate_fredkin(qbit, control_state, qbit2, qbit3)
+        # fredkin
+        quantum_circuit.gate_swap([control], [qbit2, qbit3])
 
 
 def _add_single_qubit_gate(quantum_circuit, qubits, latest_qbit, fillqubits=False):
@@ -209,6 +200,48 @@ def _add_three_qubit_gate(quantum_circuit, qubits, latest_qbit, fillqubits=False
     return latest_qbit
 
 
+def generate_random_circuit(qubits, gates, seed=None, measuregates=False, fill=False):
+    """Generate a random circuit with a number of qubits and gates, the same
+    circuit for the same seed."""
+
+    qubits = int(qubits)
+    gates = int(gates)
+
+    if seed:
+        seed = int(seed)
+        random.seed(seed)
+    else:
+        random.seed(1024)
+
+    quantum_circuit = QuantumCircuit(qubits)
+    # I want three qubit gates to show up more often
+    no_all_gates = NO_SINGLE_QBIT_GATES + NO_TWO_QBIT_GATES + 2 * NO_THREE_QBIT_GATES
+
+    latest_qbit = -1
+    for _ in range(gates):
+
+        gate_choice = random.randint(0, no_all_gates)
+        if gate_choice < NO_SINGLE_QBIT_GATES:
+            latest_qbit = _add_single_qubit_gate(
+                quantum_circuit, qubits, latest_qbit, fill
+            )
+        elif gate_choice < NO_SINGLE_QBIT_GATES + NO_TWO_QBIT_GATES:
+            latest_qbit = _add_two_qubit_gate(
+                quantum_circuit, qubits, latest_qbit, fill
+            )
+        else:
+            latest_qbit = _add_three_qubit_gate(
+                quantum_circuit, qubits, latest_qbit, fill
+            )
+
+    if measuregates:
+        quantum_circuit.increment_step()
+        for qubit in range(qubits):
+            quantum_circuit.gate_measure_z([qubit], qubit)
+
+    return quantum_circuit
+
+
 @click.command()
 @click.option(
     "--qubits", "-q", type=int, required=True, help="Number of qubits in the circuit."
@@ -247,40 +280,7 @@ def _add_three_qubit_gate(quantum_circuit, qubits, latest_qbit, fillqubits=False
 )
 def main(qubits, gates, output, seed, measuregates, fill):
 
-    qubits = int(qubits)
-    gates = int(gates)
-
-    if seed:
-        seed = int(seed)
-        random.seed(seed)
-    else:
-        random.seed(1024)
-
-    quantum_circuit = QuantumCircuit(qubits)
-    # I want three qubit gates to show up more often
-    no_all_gates = NO_SINGLE_QBIT_GATES + NO_TWO_QBIT_GATES + 2 * NO_THREE_QBIT_GATES
-
-    latest_qbit = -1
-    for _ in range(gates):
-
-        gate_choice = random.randint(0, no_all_gates)
-        if gate_choice < NO_SINGLE_QBIT_GATES:
-            latest_qbit = _add_single_qubit_gate(
-                quantum_circuit, qubits, latest_qbit, fill
-            )
-        elif gate_choice < NO_SINGLE_QBIT_GATES + NO_TWO_QBIT_GATES:
-            latest_qbit = _add_two_qubit_gate(
-                quantum_circuit, qubits, latest_qbit, fill
-            )
-        else:
-            latest_qbit = _add_three_qubit_gate(
-                quantum_circuit, qubits, latest_qbit, fill
-            )
-
-    if measuregates:
-        quantum_circuit.increment_step()
-        for qubit in range(qubits):
-            quantum_circuit.gate_measure_z(qubit, qubit)
+    quantum_circuit = generate_random_circuit(qubits, gates, seed, measuregates, fill)
 
     output_file = output or "generated_circuit"
     output_file = output_file.rstrip(".yaml")
@@ -0,0 +1,119 @@
+"""Rebuilds the steps of circuits with as few steps as possible.
+
+Gates are placed in steps as soon (ASAP) or as late (ALAP) as possible. As
+when gates are added to a QuantumCircuit, a gate reserves in its step all
+the qubits between its lowest and its highest qubit. Gates keep their order
+on the qubits they act on unless commutation is allowed, in which case a
+gate may also move past gates it commutes with."""
+
+import numpy as np
+
+# basis each gate is diagonal in on its targets, the gates diagonal in the
+# same basis on all the qubits they share commute
+TARGET_BASES = {
+    "pauli-z": "z", "pauli-z-root": "z", "pauli-z-root-dagger": "z", "rz-theta": "z", "u1": "z", "p": "z",
+    "s": "z", "s-dagger": "z", "t": "z", "t-dagger": "z", "zz": "z",
+    "pauli-x": "x", "pauli-x-root": "x", "pauli-x-root-dagger": "x", "rx-theta": "x", "v": "x", "v-dagger": "x", "xx": "x",
+    "pauli-y": "y", "pauli-y-root": "y", "pauli-y-root-dagger": "y", "ry-theta": "y", "yy": "y",
+}
+BASES = ("x", "y", "z", None)
+
+PAULIS = {"x": np.array([[0, 1], [1, 0]]), "y": np.array([[0, -1j], [1j, 0]]), "z": np.array([[1, 0], [0, -1]])}
+# rotations the exporters apply to controls before the controlled gate, so
+# that the control state becomes state 1
+X = PAULIS["x"]
+H = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+ROTATION_TO_Y_BASIS = np.array([[1, 1], [1j, -1j]]) / np.sqrt(2)
+
+
+def control_basis(state):
+    """Get the basis the projector of a control state is diagonal in, from
+    the rotation the exporters apply to the control, None when the projector
+    is not diagonal in the x, y or z basis."""
+    state = str(state)
+    if "i" in state:
+        rotation = ROTATION_TO_Y_BASIS
+    elif "+" in state or "-" in state:
+        rotation = H
+    else:
+        rotation = np.eye(2)
+    if state in ("0", "+", "+i"):
+        rotation = X @ rotation
+    vector = rotation.conj().T @ np.array([0, 1])
+    for basis, pauli in PAULIS.items():
+        image = pauli @ vector
+        if abs(abs(np.vdot(vector, image)) - 1) < 1e-9:
+            return basis
+    return None
+
+
+CONTROL_BASES = {state: control_basis(state) for state in ("0", "1", "+", "-", "+i", "-i")}
+
+
+def gate_span(gate):
+    """Get the qubits a gate reserves in its step."""
+    qubits = [control["target"] for control in gate.get("controls") or []] + list(gate.get("targets") or [])
+    for aggregated_gate in gate.get("gates") or []:
+        qubits += aggregated_gate["targets"]
+    return range(min(qubits), max(qubits) + 1) if qubits else range(0)
+
+
+def gate_actions(gate, commute):
+    """Get the basis a gate is diagonal in on each of its qubits, None when
+    it is not diagonal in any basis. Classical bits written by measurements
+    are included, as keys ('bit', index)."""
+    actions = {}
+    if gate["name"] == "barrier":
+        # nothing moves across a barrier, on any qubit it spans
+        return {qubit: None for qubit in gate_span(gate)}
+    if gate["name"] == "aggregate":
+        for aggregated_gate in gate["gates"]:
+            for target in aggregated_gate["targets"]:
+                actions[target] = TARGET_BASES.get(aggregated_gate["name"]) if commute else None
+    elif gate["name"] == "identity" and commute:
+        return {}
+    else:
+        basis = TARGET_BASES.get(gate["name"]) if commute else None
+        for target in gate.get("targets") or []:
+            actions[target] = basis
+    for control in gate.get("controls") or []:
+        actions[control["target"]] = CONTROL_BASES.get(str(control["state"])) if commute else None
+    if "bit" in gate:
+        actions[("bit", gate["bit"])] = None
+    return actions
+
+
+def schedule_gates(gates, schedule="asap", commute=False):
+    """Place gates, given in circuit order, in steps. Returns the list of
+    steps, each a list of gates."""
+    if schedule not in ("asap", "alap"):
+        raise Exception(f"Unknown schedule {schedule}, use asap or alap.")
+    if schedule == "alap":
+        # ALAP is ASAP on the reversed circuit, with the steps reversed
+        return [step_gates[::-1] for step_gates in reversed(schedule_gates(gates[::-1], "asap", commute))]
+
+    steps = []
+    # for each qubit or bit, the last step used by gates diagonal in each basis
+    last_steps = {}
+    # for each qubit, the steps it is reserved in
+    reserved = {}
+    for gate in gates:
+        actions = gate_actions(gate, commute)
+        step = 0
+        for key, basis in actions.items():
+            for other_basis, last_step in (last_steps.get(key) or {}).items():
+                if basis is None or other_basis != basis:
+                    step = max(step, last_step + 1)
+        span = gate_span(gate)
+        while any(step in reserved.get(qubit, ()) for qubit in span):
+            step += 1
+
+        if step == len(steps):
+            steps.append([])
+        steps[step].append(gate)
+        for qubit in span:
+            reserved.setdefault(qubit, set()).add(step)
+        for key, basis in actions.items():
+            key_steps = last_steps.setdefault(key, {})
+            key_steps[basis] = max(key_steps.get(basis, -1), step)
+    return steps
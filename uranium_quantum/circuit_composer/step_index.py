@@ -0,0 +1,100 @@
+"""Index of the steps in a yaml circuit file, used to load circuits lazily:
+steps are located by their byte offsets and parsed only when needed."""
+
+import re
+
+import yaml
+
+# a line holding a top level key, which ends the list of steps
+TOP_LEVEL_KEY = re.compile(rb"\n[^\s#-][^\n]*:")
+# qubit indices, used to find the size of a circuit without parsing it
+QUBIT_INDEX = re.compile(rb"(?:target:|-) (\d+)")
+FLOW_TARGETS = re.compile(rb"targets: \[([\d, ]*)\]")
+# the lines of the steps written by QuantumCircuit.export, which can be
+# copied as they are and parsed without a yaml parser
+ANGLE = rb"(?:'[^'\n]*'|-?(?:\d+\.?\d*|\.\d+)(?:e[+-]?\d+)?)"
+ROOT = rb"1/(?:2\^)?\d+(?:\.\d*)?"
+COMPOSER_LINE = (
+    rb"  - index: \d+\n|    gates:\n|      - name: [\w-]+\n"
+    rb"|        (?:targets|controls|gates):\n|          - (?:\d+|target: \d+|name: [\w-]+)\n"
+    rb"|            state: '[^'\n]*'\n|            targets:\n|              - \d+\n"
+    rb"|(?:    )?        (?:theta|phi|lambda): " + ANGLE + rb"\n|(?:    )?        root: " + ROOT + rb"\n"
+    rb"|        (?:bit|circuit_id): \d+\n|        circuit_power: '[^'\n]*'\n"
+)
+COMPOSER_LAYOUT = re.compile(rb"(?:" + COMPOSER_LINE + rb")*")
+
+
+def read_circuit_id(path):
+    """Get the id of the circuit in a yaml circuit file without parsing it,
+    reading the file only up to its top level circuit_id line. Returns None
+    when the file has no such line."""
+    with open(path, "rb") as stream:
+        for line in stream:
+            if line.startswith(b"circuit_id:"):
+                return (yaml.safe_load(line) or {}).get("circuit_id")
+    return None
+
+
+class StepIndex:
+    """Byte offsets of each step in a yaml circuit file.
+
+    The file is kept open, so steps can still be read after the file was
+    replaced, e.g. by exporting the loaded circuit over it."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        content = self._file.read()
+
+        steps = re.search(rb"^steps:[^\n]*\n", content, re.MULTILINE)
+        if steps is None:
+            raise Exception(f"No steps found in circuit file {path}.")
+        first_step = re.compile(rb"^( *)- ", re.MULTILINE).search(content, steps.end())
+        end = TOP_LEVEL_KEY.search(content, steps.end() - 1)
+        end = end.start() + 1 if end else len(content)
+        if first_step is None or first_step.start() >= end:
+            indent, starts = b"  ", []
+        else:
+            indent = first_step.group(1)
+            starts = [first_step.start()]
+            step_start = b"\n" + indent + b"- "
+            position = content.find(step_start, first_step.start(), end)
+            while position != -1:
+                starts.append(position + 1)
+                position = content.find(step_start, position + 1, end)
+
+        self._offsets = list(zip(starts, starts[1:] + [end]))
+        self.header = yaml.safe_load(content[:steps.start()] + content[end:]) or {}
+        # steps written by QuantumCircuit.export can be copied as they are,
+        # any other layout is left to the yaml parser
+        self.composer_layout = COMPOSER_LAYOUT.fullmatch(content, starts[0] if starts else end, end) is not None
+        qbits = QUBIT_INDEX.findall(content, steps.end(), end)
+        for targets in FLOW_TARGETS.findall(content, steps.end(), end):
+            qbits += [qbit for qbit in targets.split(b",") if qbit.strip()]
+        self.no_qbits = max(map(int, qbits), default=-1) + 1
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def read(self, step):
+        """Get the yaml text of a step, starting with its list item marker."""
+        start, end = self._offsets[step]
+        self._file.seek(start)
+        return self._file.read(end - start).decode("utf-8")
+
+    def read_step(self, step):
+        """Get a parsed step."""
+        return yaml.safe_load(self.read(step))[0] or {}
+
+    def read_gates(self, step):
+        """Get the parsed gates of a step."""
+        return self.read_step(step).get("gates") or []
+
+    def read_body(self, step):
+        """Get the yaml text of a step without its index line, only
+        available for files in the layout written by QuantumCircuit.export."""
+        assert self.composer_layout, "Only steps written by QuantumCircuit.export can be copied."
+        text = self.read(step)
+        return text[text.index("\n") + 1:]
+
+    def close(self):
+        self._file.close()
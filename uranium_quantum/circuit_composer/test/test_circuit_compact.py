@@ -0,0 +1,168 @@
+"""Tests moving the gates of circuits to as few steps as possible."""
+
+import importlib
+import random
+
+import numpy as np
+import yaml
+from click.testing import CliRunner
+
+from ..circuit_composer import QuantumCircuit, Control
+from ..scheduling import schedule_gates
+
+CircuitCompact = importlib.import_module("..circuit-compact", __package__)
+
+
+def build_circuit(steps, no_qbits=4):
+    quantum_circuit = QuantumCircuit(no_qbits)
+    for index, step in enumerate(steps):
+        if index:
+            quantum_circuit.increment_step()
+        step(quantum_circuit)
+    return quantum_circuit
+
+
+def step_names(quantum_circuit):
+    return [sorted(gate["name"] for gate in gates) for _, gates in quantum_circuit.iter_steps()]
+
+
+def test_asap_and_alap():
+    quantum_circuit = build_circuit([
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [1]),
+        lambda quantum_circuit: quantum_circuit.gate_t([], [3]),
+        lambda quantum_circuit: quantum_circuit.gate_s([], [1]),
+    ])
+
+    assert step_names(quantum_circuit.compact()) == [["hadamard", "t"], ["pauli-x"], ["s"]]
+    assert step_names(quantum_circuit.compact("alap")) == [["hadamard"], ["pauli-x"], ["s", "t"]]
+    # the original circuit is unchanged
+    assert quantum_circuit.current_step() == 3
+
+
+def test_gates_reserve_the_qbits_in_between():
+    quantum_circuit = build_circuit([
+        lambda quantum_circuit: quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [2]),
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [1]),
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [3]),
+    ])
+
+    compacted = quantum_circuit.compact()
+
+    assert step_names(compacted) == [["hadamard", "pauli-x"], ["hadamard"]]
+    # gates can be added to the compacted circuit with the same rule
+    compacted.gate_s([], [0])
+    assert step_names(compacted)[-1] == ["hadamard", "s"]
+
+
+def test_commuting_gates():
+    quantum_circuit = build_circuit([
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [1]),
+        lambda quantum_circuit: quantum_circuit.gate_rx_theta([], [1], 0.5),
+        lambda quantum_circuit: quantum_circuit.gate_t([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_measure_z([1], 0),
+        lambda quantum_circuit: quantum_circuit.gate_measure_z([2], 0),
+    ])
+
+    assert step_names(quantum_circuit.compact()) == [["hadamard"], ["hadamard"], ["pauli-x"], ["rx-theta", "t"], ["measure-z"], ["measure-z"]]
+    # the rotation around x commutes with the target of the controlled x,
+    # the t gate with its control, measurements writing the same bit keep their order
+    assert step_names(quantum_circuit.compact(commute=True)) == [["hadamard", "rx-theta"], ["hadamard"], ["pauli-x"], ["measure-z", "t"], ["measure-z"]]
+
+
+MATRICES = {
+    "hadamard": np.array([[1, 1], [1, -1]]) / np.sqrt(2),
+    "pauli-x": np.array([[0, 1], [1, 0]]),
+    "pauli-y": np.array([[0, -1j], [1j, 0]]),
+    "pauli-z": np.diag([1, -1]),
+    "s": np.diag([1, 1j]),
+    "rx-theta": np.array([[np.cos(0.3), -1j * np.sin(0.3)], [-1j * np.sin(0.3), np.cos(0.3)]]),
+    "ry-theta": np.array([[np.cos(0.4), -np.sin(0.4)], [np.sin(0.4), np.cos(0.4)]]),
+    "rz-theta": np.diag([np.exp(-0.2j), np.exp(0.2j)]),
+}
+# rotations the exporters apply before a control, mapping its state to 1
+CONTROL_ROTATIONS = {
+    "1": np.eye(2), "0": MATRICES["pauli-x"],
+    "-": MATRICES["hadamard"], "+": MATRICES["pauli-x"] @ MATRICES["hadamard"],
+    "-i": np.array([[1, 1], [1j, -1j]]) / np.sqrt(2), "+i": MATRICES["pauli-x"] @ np.array([[1, 1], [1j, -1j]]) / np.sqrt(2),
+}
+
+
+def on_qubit(matrix, qubit, no_qbits):
+    return np.kron(np.kron(np.eye(2 ** (no_qbits - 1 - qubit)), matrix), np.eye(2 ** qubit))
+
+
+def circuit_unitary(gates, no_qbits):
+    """Get the unitary of gates on one target, controls rotated to state 1
+    before the gate and back after it, as in the exported circuits."""
+    unitary = np.eye(2 ** no_qbits, dtype=complex)
+    for gate in gates:
+        target = gate["targets"][0]
+        matrix = on_qubit(MATRICES[gate["name"]], target, no_qbits)
+        rotations = np.eye(2 ** no_qbits)
+        for control in gate.get("controls") or []:
+            rotations = on_qubit(CONTROL_ROTATIONS[control["state"]], control["target"], no_qbits) @ rotations
+            one = on_qubit(np.diag([0, 1]), control["target"], no_qbits)
+            matrix = one @ matrix + (np.eye(2 ** no_qbits) - one)
+        unitary = rotations.conj().T @ matrix @ rotations @ unitary
+    return unitary
+
+
+def test_commuting_gates_keep_the_unitary():
+    no_qbits = 3
+    repro = [
+        {"name": "ry-theta", "targets": [0]}, {"name": "hadamard", "targets": [0]}, {"name": "ry-theta", "targets": [1]},
+        {"name": "pauli-x", "targets": [0], "controls": [{"target": 1, "state": "+i"}]}, {"name": "ry-theta", "targets": [1]},
+    ]
+    random_generator = random.Random(11)
+    circuits = [repro]
+    for _ in range(100):
+        gates = []
+        for _ in range(12):
+            target, control = random_generator.sample(range(no_qbits), 2)
+            gate = {"name": random_generator.choice(list(MATRICES)), "targets": [target]}
+            if random_generator.random() < 0.4:
+                gate["controls"] = [{"target": control, "state": random_generator.choice(list(CONTROL_ROTATIONS))}]
+            gates.append(gate)
+        circuits.append(gates)
+    for gates in circuits:
+        for schedule in ("asap", "alap"):
+            scheduled = [gate for step_gates in schedule_gates(gates, schedule, True) for gate in step_gates]
+            assert np.allclose(circuit_unitary(scheduled, no_qbits), circuit_unitary(gates, no_qbits))
+
+
+def test_command_line(tmp_path):
+    quantum_circuit = build_circuit([
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [1]),
+        lambda quantum_circuit: quantum_circuit.gate_zz([], [2, 3], 0.25),
+        lambda quantum_circuit: quantum_circuit.gate_pauli_x([Control(target=1, state='1')], [2]),
+    ])
+    path = quantum_circuit.export(str(tmp_path / "circuit"))[0]
+    output = str(tmp_path / "compacted.yaml")
+
+    result = CliRunner().invoke(CircuitCompact.main, [path, "-o", output, "--schedule", "alap"])
+
+    assert result.exit_code == 0
+    assert result.output == "Depth: 4 -> 2 steps.\n"
+    assert step_names(QuantumCircuit.load(output)) == [["hadamard", "zz"], ["hadamard", "pauli-x"]]
+    assert CircuitCompact.compact_circuit(output) == (2, 2)
+
+
+def test_other_keys_are_kept(tmp_path):
+    quantum_circuit = build_circuit([
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_hadamard([], [1]),
+    ])
+    path = quantum_circuit.export(str(tmp_path / "circuit.yaml"))[0]
+    with open(path, "a") as yaml_file:
+        yaml_file.write("global_phase: 0.785\nauthor: someone\n")
+
+    assert CircuitCompact.compact_circuit(path) == (2, 1)
+
+    with open(path) as yaml_file:
+        content = yaml.safe_load(yaml_file)
+    assert content["global_phase"] == 0.785 and content["author"] == "someone"
+    assert [gate["name"] for gate in content["steps"][0]["gates"]] == ["hadamard", "hadamard"]
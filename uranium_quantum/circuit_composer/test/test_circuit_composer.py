@@ -2,13 +2,16 @@
 creating quantum circuits in yaml format."""
 
 import filecmp
+import numpy as np
 import pytest
+import yaml
 
 from ..circuit_composer import (
     QuantumCircuit,
     QbitAleadyTaken,
     QbitIndexLargerThanCircuitSize,
-    Control
+    Control,
+    Parameter
 )
 
 TEST_DATA_SET_COUNT = 47
@@ -358,5 +361,260 @@ def test_full():
     ), "The output tmp.yaml file is different from reference all_my_gates.yaml file."
 
 
+def test_gate_layer_adds_the_same_gates_as_single_gate_calls():
+    thetas = np.array([0.1, 0.2, 0.3, 0.4])
+    layers = QuantumCircuit(8)
+    layers.gate_layer("rz-theta", [0, 2, 4, 6], theta=thetas)
+    layers.gate_layer("pauli-x", [3, 5], controls=[1, 7], control_states=["1", "+i"])
+    layers.increment_step().gate_layer("u3", [0, 1], theta=[1.0, 2.0], phi=0.5, lambda_radians=0.25)
+    layers.gate_layer("swap-root", [[2, 3], [5, 7]], t=7)
+    layers.increment_step().gate_layer("pauli-y-root", [4], k=3)
+    layers.gate_layer("identity", np.arange(5, 8))
+
+    gates = QuantumCircuit(8)
+    for qbit, theta in zip([0, 2, 4, 6], thetas.tolist()):
+        gates.gate_rz_theta([], [qbit], theta)
+    gates.gate_pauli_x([Control(target=1, state='1')], [3])
+    gates.gate_pauli_x([Control(target=7, state='+i')], [5])
+    gates.increment_step().gate_u3([], [0], 1.0, 0.5, 0.25).gate_u3([], [1], 2.0, 0.5, 0.25)
+    gates.gate_swap_root([], [2, 3], 7).gate_swap_root([], [5, 7], 7)
+    gates.increment_step().gate_pauli_y_root([], [4], k=3)
+    gates.gate_identity([5]).gate_identity([6]).gate_identity([7])
+
+    assert layers._gates == gates._gates
+    assert layers._qbits_taken == gates._qbits_taken
+
+
+
+def test_gate_layer_takes_one_root_per_gate():
+    layers = QuantumCircuit(4)
+    layers.gate_layer("pauli-x-root", [0, 1, 2], k=np.array([1, 2, 0]))
+    layers.gate_layer("pauli-z-root", [3], k=0)
+    assert [gate["root-k"] for gate in layers._gates[0]] == [1, 2, 0, 0]
+    assert not any("root-t" in gate for gate in layers._gates[0])
+    with pytest.raises(AssertionError, match="One value of root per gate"):
+        QuantumCircuit(4).gate_layer("pauli-x-root", [0, 1, 2], k=np.array([1, 2]))
+
+
+@pytest.mark.parametrize("name, targets, controls", [
+    ("hadamard", [1, 2, 1], None),
+    ("xx", [[0, 2], [1, 3]], None),
+    ("pauli-x", [4], [0]),
+])
+def test_gate_layer_throws_when_qbits_overlap(name, targets, controls):
+    quantum_circuit = QuantumCircuit(5).gate_hadamard([], [4])
+    with pytest.raises(QbitAleadyTaken):
+        quantum_circuit.gate_layer(name, targets, controls=controls, theta=0.1)
+    # nothing is added when the layer is rejected
+    assert len(quantum_circuit._gates[0]) == 1
+
+
+def test_gate_layer_validates_qbits():
+    with pytest.raises(QbitIndexLargerThanCircuitSize):
+        QuantumCircuit(3).gate_layer("hadamard", [0, 3])
+    with pytest.raises(AssertionError):
+        QuantumCircuit(3).gate_layer("pauli-x", [0, 1], controls=[0, 2])
+
+
+def get_trotter_block():
+    block = QuantumCircuit(2, circuit_id=2, circuit_name="trotter")
+    block.gate_hadamard([], [0]).increment_step()
+    block.gate_rz_theta([Control(target=1, state='1')], [0], 0.3).increment_step()
+    block.gate_xx([], [0, 1], 0.2)
+    return block
+
+
+def test_block_is_expanded_lazily():
+    quantum_circuit = QuantumCircuit(3)
+    quantum_circuit.append_block(get_trotter_block(), [2, 1], repetitions=2).gate_t([], [0])
+    quantum_circuit.increment_step().gate_s([], [1])
+    assert len(quantum_circuit._gates[0]) == 2
+
+    flat = QuantumCircuit(3).gate_t([], [0])
+    for _ in range(2):
+        flat.gate_hadamard([], [2]).increment_step()
+        flat.gate_rz_theta([Control(target=1, state='1')], [2], 0.3).increment_step()
+        flat.gate_xx([], [2, 1], 0.2).increment_step()
+    flat.gate_s([], [1])
+
+    assert list(quantum_circuit.iter_steps(expand=True)) == list(flat.iter_steps())
+    # blocks are not changed by expanding them
+    assert quantum_circuit._gates[0][0]["circuit"]._gates[0][0]["targets"] == [0]
+
+
+def test_export_block_references(tmp_path):
+    quantum_circuit = QuantumCircuit(3, circuit_id=1, circuit_name="main")
+    quantum_circuit.append_block(get_trotter_block(), [1, 2], repetitions=500)
+
+    files = quantum_circuit.export(str(tmp_path / "main"))
+
+    assert files == [str(tmp_path / "main.yaml"), str(tmp_path / "main_block_2.yaml")]
+    content = (tmp_path / "main.yaml").read_text()
+    assert "circuit_id: 1\n" in content
+    assert "      - name: circuit\n" in content
+    assert "        circuit_id: 2\n        circuit_power: '500'\n" in content
+    assert "circuit_name: trotter\n" in (tmp_path / "main_block_2.yaml").read_text()
+
+    quantum_circuit.export(str(tmp_path / "flat"), expand=True)
+    assert (tmp_path / "flat.yaml").read_text().count("name: xx") == 500
+
+
+def test_append_block_validates_block():
+    with pytest.raises(AssertionError):
+        QuantumCircuit(3).append_block(QuantumCircuit(2), [0, 1])
+    with pytest.raises(AssertionError):
+        QuantumCircuit(3).append_block(get_trotter_block(), [0])
+    with pytest.raises(QbitAleadyTaken):
+        QuantumCircuit(3).gate_hadamard([], [0]).append_block(get_trotter_block(), [0, 2])
+
+
+def test_load_streams_unchanged_steps(tmp_path):
+    quantum_circuit = QuantumCircuit.load("test/all_my_gates.yaml")
+    assert quantum_circuit.current_step() == 58
+    # only the current step is parsed, gates can be added to it
+    assert list(quantum_circuit._gates) == [58]
+
+    quantum_circuit.export(str(tmp_path / "streamed.yaml"))
+    assert filecmp.cmp("test/all_my_gates.yaml", tmp_path / "streamed.yaml", shallow=False)
+
+    for _ in quantum_circuit.iter_steps():
+        pass
+    quantum_circuit.export(str(tmp_path / "parsed.yaml"))
+    assert filecmp.cmp("test/all_my_gates.yaml", tmp_path / "parsed.yaml", shallow=False)
+
+
+def test_load_rebuilds_occupied_qbits(tmp_path):
+    quantum_circuit = QuantumCircuit(4, circuit_id=3, circuit_name="loaded")
+    quantum_circuit.gate_hadamard([], [0]).increment_step()
+    quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [2]).gate_u3([], [3], 1, 2, 3)
+    quantum_circuit.export(str(tmp_path / "circuit.yaml"))
+
+    loaded = QuantumCircuit.load(str(tmp_path / "circuit.yaml"))
+    assert loaded._no_qbits == 4
+    with pytest.raises(QbitAleadyTaken):
+        loaded.gate_t([], [1])
+    with pytest.raises(QbitIndexLargerThanCircuitSize):
+        loaded.increment_step().gate_t([], [4])
+
+    loaded.get_step(0)[0]["name"] = "pauli-z"
+    loaded.gate_t([], [1])
+    # the circuit can be exported over the file it was loaded from
+    loaded.export(str(tmp_path / "circuit.yaml"))
+    content = yaml.safe_load((tmp_path / "circuit.yaml").read_text())
+    assert content["circuit_id"] == 3
+    assert [[gate["name"] for gate in step["gates"]] for step in content["steps"]] == [["pauli-z"], ["pauli-x", "u3"], ["t"]]
+
+
+def test_load_other_yaml_layouts(tmp_path):
+    with open("test/all_my_gates.yaml") as yaml_file:
+        content = yaml.safe_load(yaml_file)
+    (tmp_path / "dumped.yaml").write_text(yaml.safe_dump(content))
+
+    quantum_circuit = QuantumCircuit.load(str(tmp_path / "dumped.yaml"))
+    quantum_circuit.export(str(tmp_path / "exported.yaml"))
+
+    assert filecmp.cmp("test/all_my_gates.yaml", tmp_path / "exported.yaml", shallow=False)
+
+
+def get_bell_circuit():
+    quantum_circuit = QuantumCircuit(2)
+    quantum_circuit.gate_hadamard([], [0]).increment_step()
+    quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [1]).increment_step()
+    return quantum_circuit
+
+
+def test_append_circuit_shares_steps(tmp_path):
+    bell = get_bell_circuit()
+    quantum_circuit = QuantumCircuit(5).gate_t([], [0])
+    quantum_circuit.append_circuit(bell, 1).append_circuit(bell, [4, 2], step_offset=1)
+    quantum_circuit.gate_s([], [0])
+
+    expected = QuantumCircuit(5).gate_t([], [0]).gate_hadamard([], [1]).increment_step()
+    expected.gate_pauli_x([Control(target=1, state='1')], [2]).gate_hadamard([], [4]).increment_step()
+    expected.gate_s([], [0]).gate_pauli_x([Control(target=4, state='1')], [2])
+
+    assert list(quantum_circuit.iter_steps()) == list(expected.iter_steps())
+    assert quantum_circuit._qbits_taken == expected._qbits_taken
+    # the gates of the appended circuit are not copied
+    assert quantum_circuit._appended[1][0][0] is bell._gates[1]
+
+    quantum_circuit.export(str(tmp_path / "appended.yaml"))
+    expected.export(str(tmp_path / "expected.yaml"))
+    assert filecmp.cmp(tmp_path / "appended.yaml", tmp_path / "expected.yaml", shallow=False)
+
+
+def test_append_circuit_copies_on_write():
+    bell = get_bell_circuit()
+    quantum_circuit = QuantumCircuit(3).append_circuit(bell, 1)
+    parent = QuantumCircuit(4).append_circuit(quantum_circuit, 1)
+
+    bell.get_step(0)[0]["targets"] = [1]
+    bell.gate_t([], [0])
+    quantum_circuit.get_step(1)[0]["name"] = "pauli-y"
+
+    assert bell._read_step(0) == [{"name": "hadamard", "controls": [], "targets": [1]}]
+    assert bell._read_step(1)[0]["name"] == "pauli-x"
+    assert quantum_circuit._read_step(0) == [{"name": "hadamard", "controls": [], "targets": [1]}]
+    assert quantum_circuit._read_step(1)[0]["name"] == "pauli-y"
+    assert parent._read_step(0) == [{"name": "hadamard", "controls": [], "targets": [2]}]
+    assert parent._read_step(1)[0]["name"] == "pauli-x"
+    assert parent._read_step(1)[0]["targets"] == [3]
+    assert parent.current_step() == 1
+
+
+def test_appended_gates_are_not_added_to_shared_steps():
+    inner = QuantumCircuit(2).gate_hadamard([], [0])
+    middle = QuantumCircuit(3).gate_t([], [2]).append_circuit(inner, 0)
+    middle.increment_step().gate_t([], [1])
+    outer = QuantumCircuit(3).append_circuit(middle, 0)
+
+    expected = [{"name": "t", "controls": [], "targets": [2]}, {"name": "hadamard", "controls": [], "targets": [0]}]
+    assert middle.get_step(0) == expected
+    assert outer._read_step(0) == expected
+    assert outer.get_step(0) == expected
+
+def test_append_circuit_checks_occupied_qbits():
+    bell = get_bell_circuit()
+    quantum_circuit = QuantumCircuit(4).gate_t([], [0]).increment_step().gate_hadamard([], [2])
+    with pytest.raises(QbitAleadyTaken):
+        # the controlled gate spans the qbits in between
+        quantum_circuit.append_circuit(bell, [3, 0], step_offset=0)
+    with pytest.raises(QbitIndexLargerThanCircuitSize):
+        quantum_circuit.append_circuit(bell, 3)
+    assert quantum_circuit.current_step() == 1 and not quantum_circuit._appended
+
+    quantum_circuit.append_circuit(bell, [3, 0], step_offset=2)
+    with pytest.raises(QbitAleadyTaken):
+        quantum_circuit.gate_t([], [1])
+
+
+def test_symbolic_parameters(tmp_path):
+    gamma = Parameter("gamma")
+    block = QuantumCircuit(2, 2, "block").gate_zz([], [0, 1], "yes")
+    quantum_circuit = QuantumCircuit(3, 1, "main")
+    quantum_circuit.gate_rx_theta([], [0], gamma).gate_u3([Control(2, '1')], [1], 0.1, gamma, "beta").increment_step()
+    quantum_circuit.gate_layer("ry-theta", [0, 1, 2], theta=[gamma, 0.5, "beta"]).increment_step()
+    quantum_circuit.append_block(block, [1, 2])
+    with pytest.raises(AssertionError):
+        quantum_circuit.gate_rz_theta([], [0], "2*gamma")
+
+    assert quantum_circuit.parameters() == ["beta", "gamma", "yes"]
+    files = quantum_circuit.export(str(tmp_path / "circuit"))
+    with open(files[0]) as stream:
+        steps = yaml.safe_load(stream)["steps"]
+    assert steps[0]["gates"][1]["phi"] == "gamma" and steps[1]["gates"][2]["theta"] == "beta"
+    with open(files[1]) as stream:
+        # parameter names are quoted in yaml
+        assert yaml.safe_load(stream)["steps"][0]["gates"][0]["theta"] == "yes"
+    assert QuantumCircuit.load(files[0]).parameters() == ["beta", "gamma"]
+
+    bound = quantum_circuit.bind_parameters({"gamma": 0.7, "yes": 1})
+    assert bound.parameters() == ["beta"]
+    assert [gate.get("theta") for gate in bound.get_step(1)] == [0.7, 0.5, "beta"]
+    assert bound.get_step(2)[0]["circuit"].get_step(0)[0]["theta"] == 1.0
+    # the circuit itself keeps its parameters
+    assert quantum_circuit.get_step(0)[0]["theta"] == "gamma"
+
+
 if __name__ == "__main__":
     pass
@@ -0,0 +1,158 @@
+"""Tests the structural diff between circuits in yaml format."""
+
+import importlib
+
+import yaml
+from click.testing import CliRunner
+
+from ..circuit_composer import QuantumCircuit, Control
+
+CircuitDiff = importlib.import_module("..circuit-diff", __package__)
+
+
+def write_circuit(tmp_path, name, steps):
+    quantum_circuit = QuantumCircuit(4)
+    for index, step in enumerate(steps):
+        if index:
+            quantum_circuit.increment_step()
+        step(quantum_circuit)
+    return quantum_circuit.export(str(tmp_path / name))[0]
+
+
+def first_step(quantum_circuit):
+    quantum_circuit.gate_hadamard([], [0]).gate_rx_theta([], [1], 0.5)
+
+
+def second_step(quantum_circuit):
+    quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [1]).gate_pauli_y_root([], [3], k=7)
+
+
+def third_step(quantum_circuit):
+    quantum_circuit.gate_t([], [2])
+
+
+def test_identical_circuits(tmp_path):
+    left = write_circuit(tmp_path, "left", [first_step, second_step, third_step])
+    right = write_circuit(tmp_path, "right", [first_step, second_step, third_step])
+    assert CircuitDiff.diff_circuits(left, right) == []
+
+
+def test_gate_order_and_number_format_are_ignored(tmp_path):
+    left = write_circuit(tmp_path, "left", [first_step, second_step, third_step])
+    right = write_circuit(tmp_path, "right", [
+        lambda quantum_circuit: quantum_circuit.gate_rx_theta([], [1], 0.50).gate_hadamard([], [0]),
+        lambda quantum_circuit: quantum_circuit.gate_pauli_y_root([], [3], k=7.0).gate_pauli_x([Control(target=0, state='1')], [1]),
+        third_step,
+    ])
+    assert CircuitDiff.diff_circuits(left, right) == []
+
+    # other yaml layouts are compared by their content as well
+    with open(left) as yaml_file:
+        content = yaml.safe_load(yaml_file)
+    (tmp_path / "dumped.yaml").write_text(yaml.safe_dump(content))
+    assert CircuitDiff.diff_circuits(left, str(tmp_path / "dumped.yaml")) == []
+
+
+FLOW_STYLE = """\
+circuit_id: 1
+steps:
+  - index: 0
+    gates:
+      - {name: hadamard, targets: [0]}
+      - {name: rx-theta, targets: [1], theta: 0.5}
+  - index: 1
+    gates:
+      - name: pauli-x
+        targets: [1]
+        controls: [{target: 0, state: '1'}]
+      - {name: pauli-y-root, targets: [3], root: 1/2^7}
+  - index: 2
+    gates: [{name: t, targets: [2]}]
+"""
+
+FOUR_SPACES = """\
+circuit_id: 1
+steps:
+  - index: 0
+    gates:
+        - name: hadamard
+          targets:
+              - 0
+        - name: rx-theta
+          targets:
+              - 1
+          theta: 0.5
+  - index: 1
+    gates:
+        - name: pauli-x
+          targets:
+              - 1
+          controls:
+              - target: 0
+                state: '1'
+        - name: pauli-y-root
+          targets:
+              - 3
+          root: 1/2^7
+  - index: 2
+    gates:
+        - name: t
+          targets:
+              - 2
+"""
+
+
+def test_other_indentations_are_parsed_as_yaml(tmp_path):
+    left = write_circuit(tmp_path, "left", [first_step, second_step, third_step])
+    assert CircuitDiff.StepIndex(left).composer_layout
+    for name, content in [("flow.yaml", FLOW_STYLE), ("four_spaces.yaml", FOUR_SPACES)]:
+        (tmp_path / name).write_text(content)
+        assert not CircuitDiff.StepIndex(str(tmp_path / name)).composer_layout
+        assert CircuitDiff.diff_circuits(left, str(tmp_path / name)) == []
+        assert CircuitDiff.diff_circuits(str(tmp_path / name), left) == []
+
+def test_steps_are_aligned(tmp_path):
+    fourth_step = lambda quantum_circuit: quantum_circuit.gate_s([], [3])
+    new_step = lambda quantum_circuit: quantum_circuit.gate_pauli_z([], [2])
+    left = write_circuit(tmp_path, "left", [first_step, second_step, third_step, fourth_step])
+    right = write_circuit(tmp_path, "right", [first_step, third_step, new_step, fourth_step])
+
+    differences = CircuitDiff.diff_circuits(left, right)
+
+    assert [(difference["kind"], difference["left_step"], difference["right_step"]) for difference in differences] == [
+        ("removed-step", 1, None),
+        ("inserted-step", None, 2),
+    ]
+    assert [gate[0] for gate in differences[1]["inserted"]] == ["pauli-z"]
+
+
+def test_changed_gates(tmp_path):
+    left = write_circuit(tmp_path, "left", [first_step, second_step])
+    right = write_circuit(tmp_path, "right", [
+        lambda quantum_circuit: quantum_circuit.gate_rx_theta([], [1], 0.25).gate_s([], [2]),
+        second_step,
+    ])
+
+    differences = CircuitDiff.diff_circuits(left, right)
+
+    assert len(differences) == 1
+    difference = differences[0]
+    assert (difference["kind"], difference["left_step"], difference["right_step"]) == ("changed-step", 0, 0)
+    assert [gate[0] for gate in difference["inserted"]] == ["s"]
+    assert [gate[0] for gate in difference["removed"]] == ["hadamard"]
+    [(left_gate, right_gate)] = difference["changed"]
+    assert left_gate[3] == (("theta", 0.5),) and right_gate[3] == (("theta", 0.25),)
+
+
+def test_command_line(tmp_path):
+    left = write_circuit(tmp_path, "left", [first_step, second_step])
+    right = write_circuit(tmp_path, "right", [first_step])
+
+    result = CliRunner().invoke(CircuitDiff.main, [left, right])
+
+    assert result.exit_code == 0
+    assert result.output.splitlines() == [
+        "- step 1 removed",
+        "    - pauli-x [1] controls 0:1",
+        "    - pauli-y-root [3] root=1/2^7.0",
+    ]
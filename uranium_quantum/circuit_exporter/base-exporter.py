@@ -1,14 +1,68 @@
+import keyword
+import re
+
+from uranium_quantum.circuit_exporter.export_profiler import NULL_PROFILER
+
+
 class ExportException(Exception):
     pass
 
 
+def check_identifier(name, kind):
+    """Check a name taken from a yaml circuit can be written in generated
+    code as an identifier, so that it cannot inject code."""
+    if not isinstance(name, str) or not name.isidentifier() or keyword.iskeyword(name):
+        raise ExportException(f"The {kind} name {name!r} is not a valid identifier.")
+    return name
+
+
+# roots of gates, 1/2^k or 1/t, and powers of circuits used as gates
+ROOT = re.compile(r"1/(?:2\^)?\d+(?:\.\d+)?")
+CIRCUIT_POWER = re.compile(r"-?(?:2\^)?\d+")
+
+
+def check_gate_values(gate):
+    """Check the values of a gate taken from a yaml circuit which are written
+    as they are in generated code, qubits, bits, angles, roots and circuit
+    powers, so that they cannot inject code. Angles given as names of
+    symbolic parameters are checked when they are written."""
+    name = gate.get("name")
+    qubits = list(gate.get("targets") or []) + [control.get("target") for control in gate.get("controls") or []]
+    for value in qubits + ([gate["bit"]] if "bit" in gate else []):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ExportException(f"The {name} gate uses {value!r} where an index is expected.")
+    for key in ("theta", "phi", "lambda"):
+        if key in gate and not isinstance(gate[key], (int, float, str)):
+            raise ExportException(f"The {key} angle {gate[key]!r} of the {name} gate is not a number or a parameter name.")
+    if "root" in gate and not ROOT.fullmatch(str(gate["root"])):
+        raise ExportException(f"The root {gate['root']!r} of the {name} gate is not of the form 1/2^k or 1/t.")
+    if "circuit_power" in gate and not CIRCUIT_POWER.fullmatch(str(gate["circuit_power"])):
+        raise ExportException(f"The circuit power {gate['circuit_power']!r} is not an integer or a power of 2.")
+    for aggregated_gate in gate.get("gates") or []:
+        check_gate_values(aggregated_gate)
+
+
+def check_circuit_values(yaml_data):
+    """Check the values of all gates of a yaml circuit before code is
+    generated for it, see check_gate_values."""
+    for step in yaml_data.get("steps") or []:
+        for gate in step.get("gates") or []:
+            check_gate_values(gate)
+
+
 class BaseExporter:
 
     """Base class for exporting circuits from YAML format.
     to Qiskit, OpenQasm, Pyquil, Quil and Cirq."""
 
+    # gates built from numeric matrices, which cannot take symbolic parameters
+    numeric_gates = ()
+
     def __init__(self):
         self._qubits = None
+        self._profiler = NULL_PROFILER
+        self._used_gates = None
+        self._used_parameters = []
 
     def set_number_qubits(self, qubits):
         """Set the number of qubits in this circuit."""
@@ -18,6 +72,52 @@ class BaseExporter:
         """Set the number of classical bits in this circuit."""
         self._bits = bits
 
+    def set_profiler(self, profiler):
+        """Set the profiler collecting export counters."""
+        self._profiler = profiler
+
+    def set_used_gates(self, used_gates):
+        """Set the gate kinds used by the next circuit, gate names prefixed
+        with 'ctrl-' when the gate has controls. None means unknown."""
+        self._used_gates = used_gates
+
+    def uses_gates(self, *gate_kinds):
+        """Check whether the circuit uses any of these gate kinds, so that
+        definitions of gates it does not use can be left out."""
+        if self._used_gates is None:
+            return True
+        return any(gate_kind in self._used_gates for gate_kind in gate_kinds)
+
+    def set_used_parameters(self, used_parameters):
+        """Set the sorted names of the symbolic parameters used by the next circuit."""
+        self._used_parameters = used_parameters
+
+    def parameter_code(self, name):
+        """Code referring to a symbolic parameter in a gate, its name by default."""
+        return name
+
+    def angle_code(self, angle):
+        """Get an angle as it is written in a gate, angles given in yaml as
+        strings are names of symbolic parameters."""
+        if isinstance(angle, str):
+            return self.parameter_code(check_identifier(angle, "parameter"))
+        return angle
+
+    def circuit_alias_code(self, alias, circuit_name):
+        """Code making a circuit name refer to an identical circuit exported
+        under another name, no code by default: gates use the other name."""
+        return ""
+
+    def global_phase_code(self, circuit_name, global_phase):
+        """Code adding a global phase to a circuit, it only matters for
+        circuits used as controlled gates. Ignored by default."""
+        return ""
+
+    def gate_definitions_code(self):
+        """Code defining gate objects shared by the steps of the last
+        processed circuit, placed before the code of its steps."""
+        return ""
+
     def process_step(self, step, circuit_name, circuit_names, add_comments, skip_non_unitary_gates):
         """Export gates present in one step from the input YAML file."""
         output = ""
@@ -42,15 +142,15 @@ class BaseExporter:
                 if "targets" in gate:
                     targets = gate["targets"]
                 if "gates" in gate:
-                    gates = gate["gates"]
+                    gates = [self.angles_code(aggregated_gate) for aggregated_gate in gate["gates"]]
                 if "root" in gate:
                     root = gate["root"]
                 if "theta" in gate:
-                    theta_radians = gate["theta"]
+                    theta_radians = self.angle_code(gate["theta"])
                 if "phi" in gate:
-                    phi_radians = gate["phi"]
+                    phi_radians = self.angle_code(gate["phi"])
                 if "lambda" in gate:
-                    lambda_radians = gate["lambda"]
+                    lambda_radians = self.angle_code(gate["lambda"])
                 if "bit" in gate:
                     bit = gate["bit"]
                 if "circuit_id" in gate:
@@ -60,6 +160,9 @@ class BaseExporter:
                     circuit_power = gate["circuit_power"]
 
                 name = gate["name"]
+                if name in self.numeric_gates and any(isinstance(gate.get(key), str) for key in ("theta", "phi", "lambda")):
+                    raise ExportException(f"The {name} gate does not support symbolic parameters.")
+                self._profiler.count(f"gates.{name}")
                 output += self.process_gate(
                     name,
                     circuit_name,
@@ -80,6 +183,12 @@ class BaseExporter:
                 output += "\n"
         return output
 
+    def angles_code(self, gate):
+        """Get an aggregated gate with its angles as they are written in gates."""
+        if not any(isinstance(gate.get(key), str) for key in ("theta", "phi", "lambda")):
+            return gate
+        return {key: self.angle_code(value) if key in ("theta", "phi", "lambda") else value for key, value in gate.items()}
+
     def process_gate(
         self,
         name,
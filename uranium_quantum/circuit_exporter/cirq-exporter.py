@@ -54,23 +54,18 @@ def cu3(theta_radians, phi_radians, lambda_radians):\n\
 \n"
 
     def start_circuit_code(self, circuit_name):
-        return (
-            self._define_import_code_section()
-            + "\n"
-            + self._define_u3_gates_code_section()
-            + "\n"
-            + self._define_u2_gates_code_section()
-            + "\n"
-            + self._define_u1_gates_code_section()
-            + "\n"
-            + self._define_crtl_u1()
-            + "\n"
-            + self._define_crtl_u2()
-            + "\n"
-            + self._define_crtl_u3()
-            + "\n"
-            + "circuit = cirq.Circuit(\n\n"
-        )
+        code = self._define_import_code_section() + "\n"
+        for define_gate, gate_kinds in [
+            (self._define_u3_gates_code_section, ["u3"]),
+            (self._define_u2_gates_code_section, ["u2"]),
+            (self._define_u1_gates_code_section, ["u1"]),
+            (self._define_crtl_u1, ["ctrl-u1"]),
+            (self._define_crtl_u2, ["ctrl-u2"]),
+            (self._define_crtl_u3, ["ctrl-u3"]),
+        ]:
+            if self.uses_gates(*gate_kinds):
+                code += define_gate() + "\n"
+        return code + "circuit = cirq.Circuit(\n\n"
 
     def end_circuit_code(self):
         return f"\
@@ -1,7 +1,15 @@
 import click
 import importlib
+import json
+import sys
 import yaml
 
+from uranium_quantum.circuit_composer.step_index import StepIndex, read_circuit_id
+from uranium_quantum.circuit_exporter.export_cache import ExportCache, canonical_hash, circuit_cache_key, source_fingerprint
+from uranium_quantum.circuit_exporter.export_profiler import ExportProfiler, NULL_PROFILER
+from uranium_quantum.transpiler import BasisTranspiler
+
+BaseExporter = importlib.import_module("uranium_quantum.circuit_exporter.base-exporter")
 QiskitExporter = importlib.import_module("uranium_quantum.circuit_exporter.qiskit-exporter")
 PyquilExporter = importlib.import_module("uranium_quantum.circuit_exporter.pyquil-exporter")
 QuilExporter = importlib.import_module("uranium_quantum.circuit_exporter.quil-exporter")
@@ -39,26 +47,159 @@ def get_number_bits(yaml):
                         bits = max(bits, gate["bit"] + 1)
     return bits
 
+def get_circuit_children(yaml):
+    """Get the ids of the circuits used as gates in a yaml circuit."""
+    children = []
+    for step in yaml.get("steps") or []:
+        for gate in step.get("gates") or []:
+            if gate["name"] == "circuit" and gate["circuit_id"] not in children:
+                children.append(gate["circuit_id"])
+    return children
+
+
+def get_descendants_from_children(circuit_children, circuit_id, descendants):
+    """Collect all circuits used directly or indirectly by a circuit, given
+    the circuits each circuit uses as gates."""
+    for child_circuit_id in circuit_children[circuit_id]:
+        # the descendants of a circuit already collected are also collected
+        if not child_circuit_id in descendants:
+            descendants.append(child_circuit_id)
+            get_descendants_from_children(circuit_children, child_circuit_id, descendants)
+
+    return descendants
+
 def get_circuit_descendants(circuits, circuit_id, descendants):
-  circuit = circuits[circuit_id]
-  for step in circuit["steps"]:
-      gates = step["gates"]
-      for gate in gates:
-          if gate["name"] == "circuit":
-              gate_circuit_id = gate["circuit_id"]
-              if not gate_circuit_id in descendants: 
-                  descendants.append(gate_circuit_id)
-              get_circuit_descendants(circuits, gate_circuit_id, descendants)
-
-  return descendants
+  circuit_children = {}
+  for child_circuit_id, circuit in circuits.items():
+      circuit_children[child_circuit_id] = get_circuit_children(circuit)
+  return get_descendants_from_children(circuit_children, circuit_id, descendants)
+
+def get_canonical_gate(gate, children):
+    """Get a gate with its controls and aggregated gates sorted, numbers as
+    floats and circuits used as gates identified by their position in the
+    list of children of the circuit."""
+    canonical_gate = {}
+    for key, value in gate.items():
+        if key == "controls":
+            canonical_gate[key] = sorted(([control["target"], str(control["state"])] for control in value))
+        elif key == "gates":
+            canonical_gate[key] = sorted((get_canonical_gate(aggregated_gate, children) for aggregated_gate in value), key=json.dumps)
+        elif key == "circuit_id":
+            canonical_gate[key] = children.index(value)
+        elif key in ("name", "targets"):
+            canonical_gate[key] = value
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            canonical_gate[key] = float(value)
+        else:
+            canonical_gate[key] = str(value)
+    return canonical_gate
+
+def get_circuit_structure(yaml_data, children):
+    """Hash the gates of a yaml circuit, leaving out its id, name, step
+    indices, empty steps and the order of gates within a step. Combined
+    with the structure of the circuits it uses as gates, it identifies
+    circuits doing the same thing."""
+    steps = []
+    for step in yaml_data.get("steps", []):
+        gates = [json.dumps(get_canonical_gate(gate, children), sort_keys=True) for gate in step.get("gates") or []]
+        if gates:
+            steps.append(sorted(gates))
+    return canonical_hash(steps)
+
+def get_circuit_aliases(circuit_ids, circuit_structures, circuit_children):
+    """Map each circuit structurally identical to a circuit coming before it
+    in circuit_ids to that circuit."""
+    structure_keys = {}
+    canonical_circuit_ids = {}
+    aliases = {}
+    for circuit_id in circuit_ids:
+        structure_key = circuit_cache_key(circuit_id, "structure", circuit_structures, circuit_children, structure_keys)
+        canonical_circuit_id = canonical_circuit_ids.setdefault(structure_key, circuit_id)
+        if canonical_circuit_id != circuit_id:
+            aliases[circuit_id] = canonical_circuit_id
+    return aliases
+
+def get_circuit_window(step_index, steps):
+    """Get a circuit with only a range of its steps, given as a (start, stop)
+    pair with the meaning of a python slice. Only these steps are parsed,
+    they are found through the index of the byte offsets of all steps."""
+    selected_steps = range(len(step_index))[slice(*steps)]
+    return {
+        "circuit_id": step_index.header["circuit_id"],
+        "circuit_name": step_index.header["circuit_name"],
+        "steps": [step_index.read_step(step) for step in selected_steps],
+    }
+
+def parse_steps(steps):
+    """Parse a step range written as start:stop, either bound may be left out."""
+    start, _, stop = steps.partition(":")
+    return (int(start) if start else None, int(stop) if stop else None)
+
+def get_circuit_metadata(yaml_data, with_hash):
+    """Extract from a yaml circuit what is needed to decide which circuits to export."""
+    children = get_circuit_children(yaml_data)
+    metadata = {
+        "circuit_id": yaml_data["circuit_id"],
+        "circuit_name": yaml_data["circuit_name"],
+        "children": children,
+        "structure": get_circuit_structure(yaml_data, children),
+    }
+    if with_hash:
+        metadata["hash"] = canonical_hash(yaml_data)
+    return metadata
+
+_exporter_fingerprints = {}
+
+def get_exporter_fingerprint(exporter):
+    """Identify the version of the code generating exported code."""
+    exporter_class = type(exporter)
+    if exporter_class not in _exporter_fingerprints:
+        base_exporter_class = exporter_class.__mro__[-2]
+        _exporter_fingerprints[exporter_class] = source_fingerprint([
+            sys.modules[exporter_class.__module__].__file__,
+            sys.modules[base_exporter_class.__module__].__file__,
+            __file__,
+            # gates are decomposed by the transpiler when a basis is given
+            sys.modules[BasisTranspiler.__module__].__file__,
+            sys.modules["uranium_quantum.transpiler.synthesis"].__file__,
+            sys.modules["uranium_quantum.transpiler.gate_library"].__file__,
+        ])
+    return _exporter_fingerprints[exporter_class]
 
 def get_imports_and_or_headers_section(exporter):
     """ get export circuit header section"""
     return exporter.imports_and_or_headers_section()
 
-def process_circuit_yaml(yaml_data, circuit_name, circuit_names, exporter, export_format, add_comments, skip_non_unitary_gates):
+def get_used_gates(yaml):
+    """Get the kinds of gates used in a yaml circuit, names of gates
+    with controls are prefixed with 'ctrl-'."""
+    used_gates = set()
+    for step in yaml.get("steps", []):
+        for gate in step.get("gates", []):
+            prefix = "ctrl-" if gate.get("controls") else ""
+            used_gates.add(prefix + gate["name"])
+            for aggregated_gate in gate.get("gates", []):
+                used_gates.add(prefix + aggregated_gate["name"])
+    return used_gates
+
+def get_used_parameters(yaml):
+    """Get the sorted names of the symbolic parameters used in a yaml circuit,
+    angles written as strings name parameters."""
+    used_parameters = set()
+    for step in yaml.get("steps", []):
+        for gate in step.get("gates", []):
+            for angle_gate in [gate] + gate.get("gates", []):
+                used_parameters.update(angle_gate[key] for key in ("theta", "phi", "lambda") if isinstance(angle_gate.get(key), str))
+    return sorted(BaseExporter.check_identifier(name, "parameter") for name in used_parameters)
+
+def process_circuit_yaml(yaml_data, circuit_name, circuit_names, exporter, export_format, add_comments, skip_non_unitary_gates, profiler=NULL_PROFILER):
     """Export quantium circuit from YAML format to target language."""
-    code = exporter.start_circuit_code(circuit_name)
+    exporter.set_used_gates(get_used_gates(yaml_data))
+    exporter.set_used_parameters(get_used_parameters(yaml_data))
+    start_code = exporter.start_circuit_code(circuit_name)
+    code = ""
+    if yaml_data.get("global_phase"):
+        code += exporter.global_phase_code(circuit_name, yaml_data["global_phase"])
     if "steps" in yaml_data.keys():
         for step in yaml_data["steps"]:
             step_index = step["index"]
@@ -77,14 +218,38 @@ def process_circuit_yaml(yaml_data, circuit_name, circuit_names, exporter, expor
             elif export_format == "cirq":
                 if add_comments:
                     code += f"\n############ New circuit step no: {step_index} ############\n\n"
-            code += exporter.process_step(step, circuit_name, circuit_names, add_comments, skip_non_unitary_gates)
+            with profiler.span("process_step"):
+                code += exporter.process_step(step, circuit_name, circuit_names, add_comments, skip_non_unitary_gates)
     code += exporter.end_circuit_code()
+    # gate objects shared by steps are known only after all steps were processed
+    code = start_code + exporter.gate_definitions_code() + code
     return code
 
 
-def get_exported_code(files, main_circuit_id, export_format, comments):
-    """Get circuit code in exported format"""
+def get_exported_code(files, main_circuit_id, export_format, comments, profiler=None, cache_dir=None, steps=None, cache=None, basis=None):
+    """Get circuit code in exported format.
+
+    Pass an ExportProfiler to collect per-stage timings and counters. When a
+    cache directory is given, code generated for each circuit is stored there
+    and reused as long as the circuit, the circuits it depends on, the export
+    format, the exporter code and the comments flag are unchanged. A cache
+    object, e.g. a MemoryExportCache, can be passed instead of a directory.
+
+    Sub-circuits with the same gates as a sub-circuit exported before them
+    are not exported again: gates using them use the first circuit and
+    their names are defined as aliases of its name.
+
+    When steps is given as a (start, stop) pair, only this range of steps of
+    the main circuit is exported and parsed, the qubit register still has
+    the size of the whole circuit.
+
+    When a basis of gates such as 'u3,cx' or 'rz,sx,cx' is given, every
+    gate is decomposed into basis gates before it is exported."""
     add_comments = True if comments else False
+    profiler = profiler or NULL_PROFILER
+    transpiler = BasisTranspiler(basis) if basis else None
+    if cache is None and cache_dir:
+        cache = ExportCache(cache_dir)
 
     exporter = None
     if export_format.lower() == "qiskit":
@@ -99,74 +264,231 @@ def get_exported_code(files, main_circuit_id, export_format, comments):
         exporter = CirqExporter.Exporter()
     else:
         raise Exception(f"Export format {export_format} is not supported.")
+    exporter.set_profiler(profiler)
 
-    quantum_code = get_imports_and_or_headers_section(exporter)
+    with profiler.profile(), profiler.span("export"):
+        quantum_code = get_imports_and_or_headers_section(exporter)
 
-    circuit_codes = {}
-    circuit_objects = {}
-    circuit_names = {}
+        circuit_texts = {}
+        circuit_objects = {}
+        circuit_names = {}
+        circuit_children = {}
+        circuit_hashes = {}
+        circuit_structures = {}
+        main_circuit_qubits = None
 
-    # collect circuit_names
-    for file in files:
-        with open(file, "r") as stream:
-            try:
-                yaml_data = yaml.safe_load(stream)
-                circuit_id = yaml_data["circuit_id"]
-                circuit_names[circuit_id] = yaml_data["circuit_name"].lower().replace(" ", "_")
-            except yaml.YAMLError as ex:
-                quantum_code = str(ex)
-                return quantum_code
-
-    # creating a custom circuit gate for each circuit
-    # in case we the circuit is reused in a different one
-    for file in files:
-        with open(file, "r") as stream:
-            try:
-                yaml_data = yaml.safe_load(stream)
-                circuit_id = yaml_data["circuit_id"]
-                circuit_objects[circuit_id] = yaml_data
-                no_qubits = get_number_qubits(yaml_data)
-                exporter.set_number_qubits(no_qubits)
-                # a circuit with classical bits cannot be converted to a gate
-                exporter.set_number_bits(0)
-                circuit_name = yaml_data["circuit_name"].lower().replace(" ", "_")
-                circuit_code = process_circuit_yaml(yaml_data, circuit_name, circuit_names, exporter, export_format, add_comments, True)
-                circuit_codes[circuit_id] = circuit_code
-            except yaml.YAMLError as ex:
-                quantum_code = str(ex)
-                return quantum_code
-
-    main_circuit_descendants = []
-    get_circuit_descendants(circuit_objects, main_circuit_id, main_circuit_descendants)
-    # most elementary circuits should be placed first, circuits
-    # that depend on elementary circuits should be added later:
-    main_circuit_descendants.reverse()
-
-    for circuit_id in main_circuit_descendants:
-        quantum_code += circuit_codes[circuit_id]
-        quantum_code += "\n"
-
-    # process main circuit
-    main_circuit_yaml_data = circuit_objects[main_circuit_id]
-    no_qubits = get_number_qubits(main_circuit_yaml_data)
-    exporter.set_number_qubits(no_qubits)
-    no_bits = get_number_bits(main_circuit_yaml_data)
-    exporter.set_number_bits(no_bits)
-    quantum_code += process_circuit_yaml(main_circuit_yaml_data, "main", circuit_names, exporter, export_format, add_comments, False)
-
-    # openqasm uses QiskitExporter
-    if export_format.lower() == "openqasm":
-        exec(quantum_code)
-        try:
-            quantum_code = eval('qc_main.qasm()')
-        except Exception as ex:
-            quantum_code = "QASM translation exception: \n"
-            quantum_code += str(ex)
+        # collect circuit names and the circuits each circuit uses as gates,
+        # files whose content is known to the cache do not need to be parsed
+        for file in files:
+            text = None
+            metadata = None
+            # only the main circuit is windowed, other files are read whole
+            if steps is not None and read_circuit_id(file) == main_circuit_id:
+                with profiler.span("step index"):
+                    step_index = StepIndex(file)
+                with profiler.span("yaml parsing"):
+                    yaml_data = get_circuit_window(step_index, steps)
+                main_circuit_qubits = step_index.no_qbits
+                metadata = get_circuit_metadata(yaml_data, cache is not None)
+                circuit_objects[main_circuit_id] = yaml_data
+                step_index.close()
+            if metadata is None:
+                with open(file, "r") as stream:
+                    text = stream.read()
+                metadata = cache.get_metadata(text) if cache is not None else None
+            if metadata is None or "structure" not in metadata:
+                try:
+                    with profiler.span("yaml parsing"):
+                        yaml_data = yaml.safe_load(text)
+                except yaml.YAMLError as ex:
+                    quantum_code = str(ex)
+                    return quantum_code
+                metadata = get_circuit_metadata(yaml_data, cache is not None)
+                if cache is not None:
+                    cache.put_metadata(text, metadata)
+                circuit_objects[metadata["circuit_id"]] = yaml_data
+            circuit_id = metadata["circuit_id"]
+            circuit_texts[circuit_id] = text
+            circuit_names[circuit_id] = BaseExporter.check_identifier(metadata["circuit_name"].lower().replace(" ", "_"), "circuit")
+            circuit_children[circuit_id] = metadata["children"]
+            circuit_structures[circuit_id] = metadata["structure"]
+            if cache is not None:
+                circuit_hashes[circuit_id] = metadata["hash"]
+
+        main_circuit_descendants = []
+        with profiler.span("get_circuit_descendants"):
+            get_descendants_from_children(circuit_children, main_circuit_id, main_circuit_descendants)
+        # most elementary circuits should be placed first, circuits
+        # that depend on elementary circuits should be added later:
+        main_circuit_descendants.reverse()
+
+        # gates using a circuit identical to another one use the other circuit
+        aliases = get_circuit_aliases(main_circuit_descendants, circuit_structures, circuit_children)
+        gate_circuit_names = dict(circuit_names)
+        for circuit_id, canonical_circuit_id in aliases.items():
+            gate_circuit_names[circuit_id] = circuit_names[canonical_circuit_id]
+        profiler.count("circuit aliases", len(aliases))
+
+        cache_keys = {}
+        if cache is not None:
+            basis_name = ",".join(sorted(transpiler.basis)) if transpiler else ""
+            cache_context = f"{export_format.lower()}:{get_exporter_fingerprint(exporter)}:{add_comments}:{basis_name}"
+            # gates using a circuit are written with the name of the circuit
+            # it is an alias of, so only the keys of the circuits using it
+            # change with its alias, through the key of the circuit
+            circuit_hashes = {circuit_id: f"{circuit_hash}:{gate_circuit_names[circuit_id]}" for circuit_id, circuit_hash in circuit_hashes.items()}
+
+        def get_circuit_yaml(circuit_id):
+            if circuit_id not in circuit_objects:
+                with profiler.span("yaml parsing"):
+                    circuit_objects[circuit_id] = yaml.safe_load(circuit_texts[circuit_id])
+            return circuit_objects[circuit_id]
+
+        def transpile(yaml_data):
+            if transpiler is None:
+                return yaml_data
+            with profiler.span("transpile"):
+                return transpiler.transpile_circuit(yaml_data)
+
+        # creating a custom circuit gate for each circuit
+        # reused in the main circuit
+        for circuit_id in main_circuit_descendants:
+            circuit_name = circuit_names[circuit_id]
+            if circuit_id in aliases:
+                quantum_code += exporter.circuit_alias_code(circuit_name, gate_circuit_names[circuit_id])
+                continue
+            with profiler.span(f"sub-circuit {circuit_name}"):
+                circuit_code = None
+                if cache is not None:
+                    cache_key = circuit_cache_key(circuit_id, cache_context, circuit_hashes, circuit_children, cache_keys)
+                    circuit_code = cache.get_code(cache_key)
+                if circuit_code is None:
+                    yaml_data = get_circuit_yaml(circuit_id)
+                    BaseExporter.check_circuit_values(yaml_data)
+                    with profiler.span("get_number_qubits"):
+                        no_qubits = get_number_qubits(yaml_data)
+                    exporter.set_number_qubits(no_qubits)
+                    # a circuit with classical bits cannot be converted to a gate
+                    exporter.set_number_bits(0)
+                    circuit_code = process_circuit_yaml(transpile(yaml_data), circuit_name, gate_circuit_names, exporter, export_format, add_comments, True, profiler)
+                    if cache is not None:
+                        cache.put_code(cache_key, circuit_code)
+                        profiler.count("cache misses")
+                else:
+                    profiler.count("cache hits")
+            quantum_code += circuit_code
             quantum_code += "\n"
 
+        # process main circuit
+        with profiler.span("main circuit"):
+            main_circuit_code = None
+            if cache is not None:
+                main_cache_key = circuit_cache_key(main_circuit_id, f"{cache_context}:main:{main_circuit_qubits}", circuit_hashes, circuit_children, {})
+                main_circuit_code = cache.get_code(main_cache_key)
+            if main_circuit_code is None:
+                main_circuit_yaml_data = get_circuit_yaml(main_circuit_id)
+                BaseExporter.check_circuit_values(main_circuit_yaml_data)
+                with profiler.span("get_number_qubits"):
+                    no_qubits = max(get_number_qubits(main_circuit_yaml_data), main_circuit_qubits or 0)
+                exporter.set_number_qubits(no_qubits)
+                no_bits = get_number_bits(main_circuit_yaml_data)
+                exporter.set_number_bits(no_bits)
+                main_circuit_code = process_circuit_yaml(transpile(main_circuit_yaml_data), "main", gate_circuit_names, exporter, export_format, add_comments, False, profiler)
+                if cache is not None:
+                    cache.put_code(main_cache_key, main_circuit_code)
+                    profiler.count("cache misses")
+            else:
+                profiler.count("cache hits")
+            quantum_code += main_circuit_code
+
+        # openqasm uses QiskitExporter
+        if export_format.lower() == "openqasm":
+            with profiler.span("openqasm exec"):
+                exec(quantum_code)
+                try:
+                    quantum_code = eval('qc_main.qasm()')
+                except Exception as ex:
+                    quantum_code = "QASM translation exception: \n"
+                    quantum_code += str(ex)
+                    quantum_code += "\n"
+        profiler.count("bytes emitted", len(quantum_code))
+
     return quantum_code
 
 
+def get_qiskit_circuit(files, main_circuit_id, profiler=None, steps=None, basis=None):
+    """Build the main circuit as a qiskit QuantumCircuit in process,
+    without generating and executing Python code. Circuits used as
+    gates are converted to gates once and reused, identical circuits
+    are built and converted once. A range of steps of the main circuit
+    and a basis of gates can be selected as in get_exported_code."""
+    # qiskit is only needed when circuits are built in process
+    QiskitBuilder = importlib.import_module("uranium_quantum.circuit_exporter.qiskit-builder")
+    profiler = profiler or NULL_PROFILER
+    builder = QiskitBuilder.Exporter()
+    builder.set_profiler(profiler)
+    transpiler = BasisTranspiler(basis) if basis else None
+
+    with profiler.profile(), profiler.span("build"):
+        circuits = {}
+        circuit_names = {}
+        circuit_children = {}
+        main_circuit_qubits = 0
+        for file in files:
+            yaml_data = None
+            if steps is not None and read_circuit_id(file) == main_circuit_id:
+                with profiler.span("step index"):
+                    step_index = StepIndex(file)
+                with profiler.span("yaml parsing"):
+                    yaml_data = get_circuit_window(step_index, steps)
+                main_circuit_qubits = step_index.no_qbits
+                step_index.close()
+            if yaml_data is None:
+                with open(file, "r") as stream:
+                    with profiler.span("yaml parsing"):
+                        yaml_data = yaml.safe_load(stream)
+            circuit_id = yaml_data["circuit_id"]
+            circuits[circuit_id] = yaml_data
+            circuit_names[circuit_id] = BaseExporter.check_identifier(yaml_data["circuit_name"].lower().replace(" ", "_"), "circuit")
+            circuit_children[circuit_id] = get_circuit_children(yaml_data)
+
+        main_circuit_descendants = []
+        with profiler.span("get_circuit_descendants"):
+            get_descendants_from_children(circuit_children, main_circuit_id, main_circuit_descendants)
+        main_circuit_descendants.reverse()
+
+        circuit_structures = {
+            circuit_id: get_circuit_structure(circuits[circuit_id], circuit_children[circuit_id])
+            for circuit_id in main_circuit_descendants
+        }
+        aliases = get_circuit_aliases(main_circuit_descendants, circuit_structures, circuit_children)
+        for circuit_id, canonical_circuit_id in aliases.items():
+            circuit_names[circuit_id] = circuit_names[canonical_circuit_id]
+        profiler.count("circuit aliases", len(aliases))
+
+        if transpiler:
+            with profiler.span("transpile"):
+                for circuit_id in main_circuit_descendants + [main_circuit_id]:
+                    if circuit_id not in aliases:
+                        circuits[circuit_id] = transpiler.transpile_circuit(circuits[circuit_id])
+
+        for circuit_id in main_circuit_descendants:
+            if circuit_id in aliases:
+                continue
+            with profiler.span(f"sub-circuit {circuit_names[circuit_id]}"):
+                builder.set_number_qubits(get_number_qubits(circuits[circuit_id]))
+                # a circuit with classical bits cannot be converted to a gate
+                builder.set_number_bits(0)
+                process_circuit_yaml(circuits[circuit_id], circuit_names[circuit_id], circuit_names, builder, "qiskit", False, True, profiler)
+
+        with profiler.span("main circuit"):
+            builder.set_number_qubits(max(get_number_qubits(circuits[main_circuit_id]), main_circuit_qubits))
+            builder.set_number_bits(get_number_bits(circuits[main_circuit_id]))
+            process_circuit_yaml(circuits[main_circuit_id], "main", circuit_names, builder, "qiskit", False, False, profiler)
+
+    return builder.get_circuit("main")
+
+
 @click.command()
 @click.option(
     "--files",
@@ -193,7 +515,35 @@ def get_exported_code(files, main_circuit_id, export_format, comments):
     required=False,
     help="Add comments with step index gate names in exported code."
 )
-def main(files, export_format, circuit_id, comments = False):
+@click.option(
+    "--profile",
+    "-p",
+    required=False,
+    help="Write a JSON report with per-stage export timings and counters to this file."
+)
+@click.option(
+    "--cprofile",
+    required=False,
+    help="Write cProfile statistics of the export to this file, can be used together with --profile."
+)
+@click.option(
+    "--cache_dir",
+    required=False,
+    help="Directory where generated code is cached, only circuits that changed since a previous export are regenerated."
+)
+@click.option(
+    "--steps",
+    "-s",
+    required=False,
+    help="Export only a range of steps of the main circuit, written as start:stop like a python slice, e.g. 5000:5100."
+)
+@click.option(
+    "--basis",
+    "-b",
+    required=False,
+    help="Decompose every gate into a basis of gates before exporting, either 'u3,cx' or 'rz,sx,cx'."
+)
+def main(files, export_format, circuit_id, comments = False, profile = None, cprofile = None, cache_dir = None, steps = None, basis = None):
 
     output_file = f"exported_circuit_{export_format}.py"
 
@@ -213,20 +563,19 @@ def main(files, export_format, circuit_id, comments = False):
     elif export_format.lower() == "cirq":
         raise Exception("The cirq exporter is not yet implemented.")
 
-    quantum_code = get_exported_code(files, int(circuit_id), export_format, comments and comments.lower() in ['true', '1', 't', 'y', 'yes'])
+    profiler = ExportProfiler(cprofile=bool(cprofile)) if profile or cprofile else None
 
-    if export_format.lower() == "openqasm":
-        exec(quantum_code)
-        try:
-            quantum_code = eval('qc_main.qasm()')
-        except Exception as ex:
-            quantum_code = "QASM translation exception: \n"
-            quantum_code += str(ex)
-            quantum_code += "\n"
+    # get_exported_code already translates the circuit to OpenQASM
+    quantum_code = get_exported_code(files, int(circuit_id), export_format, comments and comments.lower() in ['true', '1', 't', 'y', 'yes'], profiler, cache_dir, parse_steps(steps) if steps else None, basis=basis)
 
     with open(output_file, "w") as outfile:
         outfile.write(quantum_code)
 
+    if profile:
+        profiler.write_report(profile)
+    if cprofile:
+        profiler.dump_cprofile(cprofile)
+
 
 if __name__ == "__main__":
     main()
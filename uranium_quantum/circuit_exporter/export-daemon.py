@@ -0,0 +1,359 @@
+"""Local daemon exporting circuits on request. Editors exporting circuits
+many times per hour pay the cost of starting python and importing the
+exporters, numpy and qiskit only once, and code generated for each circuit
+is cached in memory between exports.
+
+Requests are served over HTTP/1.1, on a Unix socket, on a localhost port
+or on both. The Unix socket is only accessible to the user running the
+daemon. Any local process, or a web page, can connect to a localhost port,
+so requests on a port must carry a shared token in an
+"Authorization: Bearer <token>" header:
+
+    POST /export   {"files": [...], "circuit_id": 1, "export_format": "qiskit",
+                    "comments": false, "steps": "5:8", "basis": "rz,sx,cx",
+                    "profile": false}
+                   -> {"code": "...", "seconds": 0.002}
+    GET /metrics   -> request counts, latencies and export counters
+
+Exports run in a pool of threads, requests beyond the number of exports
+allowed to wait for a thread are rejected with status 503."""
+
+import asyncio
+import collections
+import concurrent.futures
+import http
+import hmac
+import http.client
+import importlib
+import json
+import os
+import socket
+import statistics
+import time
+
+import click
+
+from uranium_quantum.circuit_exporter.export_cache import MemoryExportCache
+from uranium_quantum.circuit_exporter.export_profiler import ExportProfiler
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+# requests only hold file names and options
+MAX_REQUEST_SIZE = 1 << 20
+# number of recent exports latency percentiles are computed from
+LATENCY_WINDOW = 1000
+
+
+class RequestError(Exception):
+    """An invalid request, answered with the given HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_export_request(request):
+    """Get the arguments of get_exported_code from an export request."""
+    if not isinstance(request, dict):
+        raise RequestError(400, "The request must be a JSON object.")
+    try:
+        files = request["files"]
+        circuit_id = int(request["circuit_id"])
+        export_format = request["export_format"]
+    except KeyError as ex:
+        raise RequestError(400, f"Missing request field {ex}.")
+    except (TypeError, ValueError):
+        raise RequestError(400, "The circuit_id must be an integer.")
+    if not isinstance(files, list) or not all(isinstance(file, str) for file in files):
+        raise RequestError(400, "The files must be a list of file names.")
+    steps = request.get("steps")
+    try:
+        if isinstance(steps, str):
+            steps = ExportCircuit.parse_steps(steps)
+        elif steps is not None:
+            start, stop = steps
+            steps = (start, stop)
+    except (TypeError, ValueError):
+        raise RequestError(400, "The steps must be written as start:stop or given as a [start, stop] pair.")
+    return files, circuit_id, str(export_format), bool(request.get("comments")), steps, request.get("basis")
+
+
+class ExportDaemon:
+    """Serves export requests, keeping exporters and generated code warm.
+
+    max_concurrency exports run at the same time, up to max_pending more
+    wait for a free thread before requests are rejected. With a token, every
+    request must carry it, a token is required to listen on a port."""
+
+    def __init__(self, max_concurrency=4, max_pending=64, cache_entries=10000, token=None):
+        self._token = token
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_concurrency)
+        self._max_concurrency = max_concurrency
+        self._max_pending = max_pending
+        self._accepted = 0
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._started = time.monotonic()
+        self._servers = []
+        self.cache = MemoryExportCache(cache_entries)
+        self.metrics = {
+            "requests": 0,
+            "exports": 0,
+            "failures": 0,
+            "rejected": 0,
+            "export_seconds": 0.0,
+            "formats": {},
+            "counters": {},
+        }
+
+    def warm_up(self):
+        """Import what the first export would otherwise wait for."""
+        try:
+            # the openqasm format executes generated qiskit code
+            importlib.import_module("qiskit")
+        except ImportError:
+            pass
+        for exporter_module in (ExportCircuit.QiskitExporter, ExportCircuit.PyquilExporter, ExportCircuit.QuilExporter, ExportCircuit.CirqExporter):
+            ExportCircuit.get_exporter_fingerprint(exporter_module.Exporter())
+
+    def export(self, request):
+        """Export a circuit, runs in a thread of the pool."""
+        files, circuit_id, export_format, comments, steps, basis = parse_export_request(request)
+        profiler = ExportProfiler()
+        start = time.perf_counter()
+        code = ExportCircuit.get_exported_code(files, circuit_id, export_format, comments, profiler, steps=steps, cache=self.cache, basis=basis)
+        return code, time.perf_counter() - start, profiler.report()
+
+    async def handle_export(self, request):
+        """Run an export in the thread pool, returns the response payload."""
+        if self._accepted >= self._max_concurrency + self._max_pending:
+            self.metrics["rejected"] += 1
+            raise RequestError(503, "Too many export requests, try again later.")
+        self._accepted += 1
+        try:
+            loop = asyncio.get_running_loop()
+            code, seconds, report = await loop.run_in_executor(self._executor, self.export, request)
+        except RequestError:
+            self.metrics["failures"] += 1
+            raise
+        except Exception as ex:
+            self.metrics["failures"] += 1
+            raise RequestError(500, str(ex))
+        finally:
+            self._accepted -= 1
+
+        self.metrics["exports"] += 1
+        self.metrics["export_seconds"] += seconds
+        export_format = request["export_format"].lower()
+        self.metrics["formats"][export_format] = self.metrics["formats"].get(export_format, 0) + 1
+        for name, amount in report["counters"].items():
+            self.metrics["counters"][name] = self.metrics["counters"].get(name, 0) + amount
+        self._latencies.append(seconds)
+
+        response = {"code": code, "seconds": seconds}
+        if request.get("profile"):
+            response["profile"] = report
+        return response
+
+    def report(self):
+        """Get the daemon metrics as a dictionary ready for JSON serialization."""
+        report = dict(self.metrics, formats=dict(self.metrics["formats"]), counters=dict(self.metrics["counters"]))
+        report["uptime_seconds"] = time.monotonic() - self._started
+        report["accepted"] = self._accepted
+        report["cache_entries"] = len(self.cache)
+        if self._latencies:
+            latencies = sorted(self._latencies)
+            report["latency_seconds"] = {
+                "median": statistics.median(latencies),
+                "p99": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+                "max": latencies[-1],
+            }
+        return report
+
+    async def handle_request(self, method, path, body):
+        """Route a request, returns the response payload."""
+        if path == "/export":
+            if method != "POST":
+                raise RequestError(405, "Exports are requested with POST.")
+            try:
+                request = json.loads(body)
+            except ValueError as ex:
+                raise RequestError(400, f"Invalid JSON request: {ex}")
+            return await self.handle_export(request)
+        if path == "/metrics":
+            if method != "GET":
+                raise RequestError(405, "Metrics are requested with GET.")
+            return self.report()
+        raise RequestError(404, f"Unknown path {path}.")
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of a connection, kept open between requests
+        unless the client asks otherwise."""
+        try:
+            keep_alive = True
+            while keep_alive:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                self.metrics["requests"] += 1
+                try:
+                    try:
+                        method, path, version = request_line.decode("latin-1").split()
+                    except ValueError:
+                        keep_alive = False
+                        raise RequestError(400, "Invalid HTTP request line.")
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                    if self._token is not None and not hmac.compare_digest(headers.get("authorization", "").encode(), f"Bearer {self._token}".encode()):
+                        keep_alive = False
+                        raise RequestError(401, "A valid token is required.")
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_REQUEST_SIZE:
+                        keep_alive = False
+                        raise RequestError(413, "The request is too large.")
+                    body = await reader.readexactly(length)
+                    status, payload = 200, await self.handle_request(method, path, body)
+                except RequestError as ex:
+                    status, payload = ex.status, {"error": str(ex)}
+                except ValueError:
+                    keep_alive = False
+                    status, payload = 400, {"error": "Invalid Content-Length header."}
+
+                content = json.dumps(payload).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {http.HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + content
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, socket_path=None, port=None, host="127.0.0.1"):
+        """Start listening on a Unix socket, on a TCP port or on both, port 0
+        picks a free port. Returns the started servers."""
+        if socket_path is None and port is None:
+            raise Exception("A socket path or a port is required.")
+        if port is not None and self._token is None:
+            raise Exception("A token is required to listen on a port.")
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            # only the user running the daemon can request exports, the socket
+            # is created without permissions for other users
+            umask = os.umask(0o077)
+            try:
+                server = await asyncio.start_unix_server(self.handle_connection, socket_path)
+            finally:
+                os.umask(umask)
+            self._servers.append(server)
+        if port is not None:
+            self._servers.append(await asyncio.start_server(self.handle_connection, host, port))
+        return self._servers
+
+    async def serve(self, socket_path=None, port=None, host="127.0.0.1"):
+        """Serve requests until cancelled."""
+        await self.start(socket_path, port, host)
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in self._servers))
+        finally:
+            await self.close()
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        self._executor.shutdown(wait=False)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket."""
+
+    def __init__(self, socket_path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def send_request(connection, method, path, request=None, token=None):
+    """Send a request to a running daemon over an http.client connection,
+    returns the HTTP status and the decoded JSON response."""
+    body = json.dumps(request) if request is not None else None
+    headers = {"Content-Type": "application/json"}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    connection.request(method, path, body=body, headers=headers)
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+@click.command()
+@click.option(
+    "--socket",
+    "socket_path",
+    required=False,
+    help="Unix socket to listen on."
+)
+@click.option(
+    "--port",
+    "-p",
+    required=False,
+    type=int,
+    help="Localhost port to listen on, requires a token."
+)
+@click.option(
+    "--token",
+    envvar="URANIUM_EXPORT_TOKEN",
+    required=False,
+    help="Shared token requests must carry, read from URANIUM_EXPORT_TOKEN when not given."
+)
+@click.option(
+    "--max_concurrency",
+    default=4,
+    show_default=True,
+    help="Number of exports running at the same time."
+)
+@click.option(
+    "--max_pending",
+    default=64,
+    show_default=True,
+    help="Number of exports waiting for a free thread before requests are rejected."
+)
+@click.option(
+    "--cache_entries",
+    default=10000,
+    show_default=True,
+    help="Number of generated code and metadata entries kept in memory."
+)
+def main(socket_path = None, port = None, token = None, max_concurrency = 4, max_pending = 64, cache_entries = 10000):
+    """Serve circuit export requests on a Unix socket and/or a localhost port."""
+    if socket_path is None and port is None:
+        raise click.UsageError("Either --socket or --port is required.")
+    if port is not None and not token:
+        raise click.UsageError("--port requires a --token or URANIUM_EXPORT_TOKEN.")
+    daemon = ExportDaemon(max_concurrency, max_pending, cache_entries, token or None)
+    daemon.warm_up()
+    try:
+        asyncio.run(daemon.serve(socket_path, port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""On-disk cache for code generated from yaml circuits, used to re-export
+only the circuits that changed since a previous export."""
+
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+def canonical_hash(yaml_data):
+    """Hash a parsed yaml circuit independently of key order and formatting."""
+    canonical = json.dumps(yaml_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def text_hash(text):
+    """Hash the raw content of a yaml file."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def source_fingerprint(paths):
+    """Hash the source files of the code generators, so that cached code is
+    invalidated whenever an exporter changes."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+class ExportCache:
+    """Stores generated code per circuit and the metadata extracted from
+    each yaml file, both addressed by content hashes."""
+
+    def __init__(self, directory):
+        self._directory = directory
+        os.makedirs(os.path.join(directory, "code"), exist_ok=True)
+        os.makedirs(os.path.join(directory, "metadata"), exist_ok=True)
+
+    def _path(self, kind, key, extension):
+        return os.path.join(self._directory, kind, f"{key}.{extension}")
+
+    def _write(self, path, content):
+        # write to a temporary file first so that concurrent
+        # exports never read a partially written entry
+        handle, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, "w") as outfile:
+            outfile.write(content)
+        os.replace(temporary_path, path)
+
+    def get_code(self, key):
+        """Get cached code for a cache key, None on a cache miss."""
+        try:
+            with open(self._path("code", key, "txt"), "r") as infile:
+                return infile.read()
+        except FileNotFoundError:
+            return None
+
+    def put_code(self, key, code):
+        """Store generated code under a cache key."""
+        self._write(self._path("code", key, "txt"), code)
+
+    def get_metadata(self, text):
+        """Get the metadata stored for a yaml file content, None on a cache miss."""
+        try:
+            with open(self._path("metadata", text_hash(text), "json"), "r") as infile:
+                return json.load(infile)
+        except FileNotFoundError:
+            return None
+
+    def put_metadata(self, text, metadata):
+        """Store the metadata extracted from a yaml file content."""
+        self._write(self._path("metadata", text_hash(text), "json"), json.dumps(metadata))
+
+
+class MemoryExportCache:
+    """In-memory version of ExportCache for long running processes, the
+    least recently used entries are dropped once max_entries is reached.
+    It can be shared by exports running in several threads."""
+
+    def __init__(self, max_entries=10000):
+        self._max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def _put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def get_code(self, key):
+        """Get cached code for a cache key, None on a cache miss."""
+        return self._get(("code", key))
+
+    def put_code(self, key, code):
+        """Store generated code under a cache key."""
+        self._put(("code", key), code)
+
+    def get_metadata(self, text):
+        """Get the metadata stored for a yaml file content, None on a cache miss."""
+        metadata = self._get(("metadata", text_hash(text)))
+        # callers may modify the metadata they get
+        return json.loads(metadata) if metadata is not None else None
+
+    def put_metadata(self, text, metadata):
+        """Store the metadata extracted from a yaml file content."""
+        self._put(("metadata", text_hash(text)), json.dumps(metadata))
+
+
+def circuit_cache_key(circuit_id, context, circuit_hashes, circuit_children, keys):
+    """Get the cache key of a circuit: it covers the circuit content, the keys of
+    all circuits it uses as gates and the export context (format, exporter
+    version, comments flag)."""
+    if circuit_id not in keys:
+        digest = hashlib.sha256()
+        digest.update(context.encode("utf-8"))
+        digest.update(circuit_hashes[circuit_id].encode("utf-8"))
+        for child_circuit_id in circuit_children[circuit_id]:
+            digest.update(circuit_cache_key(child_circuit_id, context, circuit_hashes, circuit_children, keys).encode("utf-8"))
+        keys[circuit_id] = digest.hexdigest()
+    return keys[circuit_id]
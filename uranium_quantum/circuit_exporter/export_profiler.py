@@ -0,0 +1,80 @@
+"""Lightweight timing spans and counters for the circuit export pipeline."""
+
+import contextlib
+import cProfile
+import json
+import time
+
+
+class ExportProfiler:
+    """Collects named timing spans and counters while a circuit is exported.
+
+    Spans with the same name are accumulated, so a span opened once per
+    sub-circuit or once per step reports its total time and number of calls."""
+
+    def __init__(self, cprofile=False):
+        self._spans = {}
+        self._counters = {}
+        self._cprofile = cProfile.Profile() if cprofile else None
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time the enclosed block and add it to the span with this name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            span = self._spans.setdefault(name, {"calls": 0, "seconds": 0.0})
+            span["calls"] += 1
+            span["seconds"] += elapsed
+
+    def count(self, name, amount=1):
+        """Increase the counter with this name."""
+        self._counters[name] = self._counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def profile(self):
+        """Run the enclosed block under cProfile when it was requested."""
+        if self._cprofile is None:
+            yield
+            return
+        self._cprofile.enable()
+        try:
+            yield
+        finally:
+            self._cprofile.disable()
+
+    def report(self):
+        """Get spans and counters as a dictionary ready for JSON serialization."""
+        return {
+            "spans": {name: dict(span) for name, span in self._spans.items()},
+            "counters": dict(self._counters),
+        }
+
+    def write_report(self, path):
+        """Write the report to a JSON file."""
+        with open(path, "w") as outfile:
+            json.dump(self.report(), outfile, indent=2, sort_keys=True)
+
+    def dump_cprofile(self, path):
+        """Write the collected cProfile statistics, they can be read with pstats."""
+        if self._cprofile is None:
+            raise Exception("The profiler was created without cProfile support.")
+        self._cprofile.dump_stats(path)
+
+
+class NullProfiler:
+    """Profiler used when instrumentation is disabled, all calls are no-ops."""
+
+    def span(self, name):
+        return contextlib.nullcontext()
+
+    def count(self, name, amount=1):
+        pass
+
+    def profile(self):
+        return contextlib.nullcontext()
+
+
+NULL_PROFILER = NullProfiler()
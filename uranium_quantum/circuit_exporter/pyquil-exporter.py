@@ -58,25 +58,29 @@ p.inst(sqrt_swap_defgate)\n"
 # define the ctrl-hadamard gate\n\
 ch_array = np.array([[1, 0, 0, 0], [0, 1, 0, 0],  [0, 0, 1/np.sqrt(2), 1/np.sqrt(2)], [0, 0, 1/np.sqrt(2), -1/np.sqrt(2)]])\n\
 ch_defgate = DefGate('ch', ch_array)\n\
-ch = ch_defgate.get_constructor()\n"
+ch = ch_defgate.get_constructor()\n\
+p.inst(ch_defgate)\n"
 
     def _define_crtl_y(self):
         return "\
 # define ctrl-y gate\n\
 cy_array = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, -1j], [0, 0, 1j, 0]])\n\
 cy_defgate = DefGate('cy', cy_array)\n\
-cy = cy_defgate.get_constructor()\n"
+cy = cy_defgate.get_constructor()\n\
+p.inst(cy_defgate)\n"
 
     def _define_crtl_sqrt_not(self):
         return "\
 # define ctrl-sqrt-not gate\n\
 csqrt_not_array = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0.5+0.5j, 0.5-0.5j], [0, 0, 0.5-0.5j, 0.5+0.5j]])\n\
 csqrt_not_defgate = DefGate('csqrt_not', csqrt_not_array)\n\
-csqrt_not = csqrt_not_defgate.get_constructor()\n"
+csqrt_not = csqrt_not_defgate.get_constructor()\n\
+p.inst(csqrt_not_defgate)\n"
 
     def _define_crtl_rx(self):
         return "\
 # define ctrl-rx-theta gate\n\
+theta_radians = Parameter('theta')\n\
 crx_array = np.array([[ 1, 0, 0, 0 ], [ 0, 1, 0, 0 ], [ 0, 0, quil_cos(theta_radians / 2), -1j * quil_sin(theta_radians / 2) ], [ 0, 0, -1j * quil_sin(theta_radians / 2), quil_cos(theta_radians / 2) ]])\n\
 crx_defgate = DefGate('crx', crx_array, [theta_radians])\n\
 crx = crx_defgate.get_constructor()\n\
@@ -85,13 +89,16 @@ p.inst(crx_defgate)\n"
     def _define_crtl_ry(self):
         return "\
 # define ctrl-ry-theta gate\n\
+theta_radians = Parameter('theta')\n\
 cry_array = np.array([[ 1, 0, 0, 0 ],[ 0, 1, 0, 0 ],[ 0, 0, quil_cos(theta_radians / 2), -1 * quil_sin(theta_radians / 2) ], [ 0, 0, quil_sin(theta_radians / 2), quil_cos(theta_radians / 2) ]])\n\
 cry_defgate = DefGate('cry', cry_array, [theta_radians])\n\
-cry = cry_defgate.get_constructor()\n"
+cry = cry_defgate.get_constructor()\n\
+p.inst(cry_defgate)\n"
 
     def _define_crtl_rz(self):
         return "\
 # define ctrl-rz-theta gate\n\
+phi_radians = Parameter('phi')\n\
 crz_array = np.array([[1, 0, 0, 0], [0, 1, 0, 0], [0, 0, quil_cos(phi_radians / 2) - 1j * quil_sin(phi_radians / 2), 0], [0, 0, 0, quil_cos(phi_radians / 2) + 1j * quil_sin(phi_radians / 2)]])\n\
 crz_defgate = DefGate('crz', crz_array, [phi_radians])\n\
 crz = crz_defgate.get_constructor()\n\
@@ -119,34 +126,24 @@ cu3 = cu3_defgate.get_constructor()\n\
 p.inst(cu3_defgate)\n"
 
     def start_circuit_code(self, circuit_name):
-        return (
-            self._define_import_code_section()
-            + "\n"
-            + self._define_sqrt_not_gate_code_section()
-            + "\n"
-            + self._define_u3_gates_code_section()
-            + "\n"
-            + self._define_u2_gates_code_section()
-            + "\n"
-            + self._define_sqrt_swap_code_section()
-            + "\n"
-            + self._define_crtl_hadamard()
-            + "\n"
-            + self._define_crtl_y()
-            + "\n"
-            + self._define_crtl_sqrt_not()
-            + "\n"
-            + self._define_crtl_rx()
-            + "\n"
-            + self._define_crtl_ry()
-            + "\n"
-            + self._define_crtl_rz()
-            + "\n"
-            + self._define_crtl_u2()
-            + "\n"
-            + self._define_crtl_u3()
-            + "\n"
-        )
+        code = self._define_import_code_section() + "\n"
+        for define_gate, gate_kinds in [
+            (self._define_sqrt_not_gate_code_section, ["v"]),
+            (self._define_u3_gates_code_section, ["u3"]),
+            (self._define_u2_gates_code_section, ["u2"]),
+            (self._define_sqrt_swap_code_section, ["sqrt-swap"]),
+            (self._define_crtl_hadamard, ["ctrl-hadamard"]),
+            (self._define_crtl_y, ["ctrl-pauli-y"]),
+            (self._define_crtl_sqrt_not, ["ctrl-v"]),
+            (self._define_crtl_rx, ["ctrl-rx-theta"]),
+            (self._define_crtl_ry, ["ctrl-ry-theta"]),
+            (self._define_crtl_rz, ["ctrl-rz-theta"]),
+            (self._define_crtl_u2, ["ctrl-u2"]),
+            (self._define_crtl_u3, ["ctrl-u3"]),
+        ]:
+            if self.uses_gates(*gate_kinds):
+                code += define_gate() + "\n"
+        return code
 
     def end_circuit_code(self):
         return f'\
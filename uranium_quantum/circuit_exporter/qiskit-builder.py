@@ -0,0 +1,408 @@
+import importlib
+import numpy as np
+
+from qiskit import QuantumRegister
+from qiskit.circuit import ClassicalRegister
+from qiskit import QuantumCircuit
+
+from qiskit.circuit.library.standard_gates import XGate, YGate, ZGate, HGate
+from qiskit.circuit.library import RXGate, RYGate, RZGate
+from qiskit.circuit.library import RXXGate, RYYGate, RZZGate
+from qiskit.circuit.library import RZXGate
+from qiskit.circuit.library import SXGate, SXdgGate
+from qiskit.circuit.library import SGate, SdgGate, TGate, TdgGate
+from qiskit.circuit.library import UGate, U1Gate, U3Gate
+from qiskit.circuit import ParameterExpression
+from qiskit.circuit.library import SwapGate, iSwapGate
+from qiskit.circuit.library import QFT
+from uranium_quantum.circuit_exporter.qiskit_custom_gates import *
+
+BaseExporter = importlib.import_module("uranium_quantum.circuit_exporter.base-exporter")
+QiskitExporter = importlib.import_module("uranium_quantum.circuit_exporter.qiskit-exporter")
+
+
+class Exporter(BaseExporter.BaseExporter):
+
+    """Builds qiskit QuantumCircuit objects in process instead of generating
+    Python code. Handlers append gates to the circuit being built and return
+    no code. Gate objects are built once and reused by every occurrence."""
+
+    numeric_gates = QiskitExporter.Exporter.numeric_gates
+
+    def __init__(self):
+        super().__init__()
+        self._circuits = {}
+        self._circuit_gates = {}
+        self._gate_objects = {}
+        self._circuit = None
+
+    def imports_and_or_headers_section(self):
+        return ""
+
+    def start_circuit_code(self, circuit_name):
+        if self._bits:
+            self._circuit = QuantumCircuit(QuantumRegister(self._qubits), ClassicalRegister(self._bits))
+        else:
+            self._circuit = QuantumCircuit(QuantumRegister(self._qubits))
+        self._circuits[circuit_name] = self._circuit
+        return ""
+
+    def end_circuit_code(self):
+        return ""
+
+    def global_phase_code(self, circuit_name, global_phase):
+        self._circuit.global_phase += global_phase
+        return ""
+
+    def parameter_code(self, name):
+        return parameter(name)
+
+    def get_circuit(self, circuit_name):
+        """Get a circuit built by this exporter."""
+        return self._circuits[circuit_name]
+
+    def get_circuit_gate(self, circuit_name):
+        """Get a circuit built by this exporter as a gate, converted only once."""
+        if circuit_name not in self._circuit_gates:
+            self._circuit_gates[circuit_name] = self._circuits[circuit_name].to_gate(label=circuit_name)
+        return self._circuit_gates[circuit_name]
+
+    def get_gate(self, key, build):
+        """Get the gate object identified by key, built on first use."""
+        gate = self._gate_objects.get(key)
+        if gate is None:
+            gate = build()
+            self._gate_objects[key] = gate
+        return gate
+
+    @staticmethod
+    def get_root(root):
+        """Get the root degree from a root written as 1/2^k or 1/t."""
+        degree = root[4:] if '^' in root else root[2:]
+        degree = float(degree) if '.' in degree else int(degree)
+        return 2 ** degree if '^' in root else degree
+
+    def rotate_controls(self, controls, undo):
+        for control in controls:
+            if '+i' in control['state'] or '-i' in control['state']:
+                if undo:
+                    gate = self.get_gate(("undo-rotation-to-y-basis",), gate_undo_rotation_to_y_basis)
+                else:
+                    gate = self.get_gate(("rotation-to-y-basis",), gate_rotation_to_y_basis)
+                self._circuit.append(gate, [control['target']])
+            elif '+' in control['state'] or '-' in control['state']:
+                self._circuit.h(control['target'])
+
+    def append_controlled_gate(self, controls, targets, key, build, label=None, inverse=False, power=1, native=None, params=()):
+        """Append a controlled gate, a gate with a single control and a
+        native QuantumCircuit method (e.g. 'cx') is appended through that method."""
+        controlstates = QiskitExporter.Exporter.get_control_states(controls)
+        qubits = [control['target'] for control in controls] + targets
+
+        self.rotate_controls(controls, undo=False)
+        if native and len(controls) == 1 and not inverse:
+            append_gate = getattr(self._circuit, native)
+            for _ in range(abs(power)):
+                append_gate(*params, *qubits, ctrl_state=controlstates)
+        else:
+            def build_controlled_gate():
+                controlled_gate = build().control(num_ctrl_qubits=len(controls), ctrl_state=controlstates, label=label)
+                return controlled_gate.inverse() if inverse else controlled_gate
+            gate = self.get_gate(("controlled", key, controlstates, label, inverse), build_controlled_gate)
+            for _ in range(abs(power)):
+                self._circuit.append(gate, qubits)
+        self.rotate_controls(controls, undo=True)
+        return ""
+
+    def append_plain_gate(self, targets, key, build, inverse=False, power=1):
+        """Append a gate without controls."""
+        if inverse:
+            gate = self.get_gate(("inverse", key), lambda: build().inverse())
+        else:
+            gate = self.get_gate(key, build)
+        for _ in range(abs(power)):
+            self._circuit.append(gate, targets)
+        return ""
+
+    def _gate_u3(
+        self, circuit_name, controls, targets, theta_radians, phi_radians, lambda_radians, add_comments=True
+    ):
+        if controls:
+            # qiskit does not bind the parameters of controlled UGates,
+            # U3Gate is the same gate and is used with symbolic parameters
+            if any(isinstance(angle, ParameterExpression) for angle in (theta_radians, phi_radians, lambda_radians)):
+                return self.append_controlled_gate(controls, targets, ("u3", theta_radians, phi_radians, lambda_radians), lambda: U3Gate(theta_radians, phi_radians, lambda_radians))
+            return self.append_controlled_gate(controls, targets, ("u3", theta_radians, phi_radians, lambda_radians), lambda: UGate(theta_radians, phi_radians, lambda_radians), native='cu', params=(theta_radians, phi_radians, lambda_radians, 0))
+        self._circuit.u(theta_radians, phi_radians, lambda_radians, targets[0])
+        return ""
+
+    def _gate_u2(self, circuit_name, controls, targets, phi_radians, lambda_radians, add_comments=True):
+        return self._gate_u3(circuit_name, controls, targets, np.pi/2, phi_radians, lambda_radians, add_comments)
+
+    def _gate_u1(self, circuit_name, controls, targets, lambda_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("u1", lambda_radians), lambda: U1Gate(lambda_radians), native='cp', params=(lambda_radians,))
+        self._circuit.p(lambda_radians, targets[0])
+        return ""
+
+    def _gate_identity(self, circuit_name, targets, add_comments=True):
+        self._circuit.id(targets[0])
+        return ""
+
+    def _gate_hadamard(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("hadamard",), HGate, native='ch')
+        self._circuit.h(targets[0])
+        return ""
+
+    def _gate_hadamard_xy(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, hadamard_xy, 'hadamard-xy')
+
+    def _gate_hadamard_yz(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, hadamard_yz, 'hadamard-yz')
+
+    def _gate_hadamard_zx(self, circuit_name, controls, targets, add_comments=True):
+        return self._gate_hadamard(circuit_name, controls, targets, add_comments)
+
+    def _gate_pauli_x(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("pauli-x",), XGate, native='cx')
+        self._circuit.x(targets[0])
+        return ""
+
+    def _gate_pauli_y(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("pauli-y",), YGate, native='cy')
+        self._circuit.y(targets[0])
+        return ""
+
+    def _gate_pauli_z(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("pauli-z",), ZGate, native='cz')
+        self._circuit.z(targets[0])
+        return ""
+
+    def append_custom_gate(self, controls, targets, factory, label, *params):
+        """Append one of the gates defined in qiskit_custom_gates."""
+        key = (label,) + params
+        if controls:
+            return self.append_controlled_gate(controls, targets, key, lambda: factory(*params), label=label)
+        return self.append_plain_gate(targets, key, lambda: factory(*params, label=label))
+
+    def _gate_pauli_x_root(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, pauli_x_root, 'pauli-x-root', Exporter.get_root(root))
+
+    def _gate_pauli_y_root(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, pauli_y_root, 'pauli-y-root', Exporter.get_root(root))
+
+    def _gate_pauli_z_root(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, pauli_z_root, 'pauli-z-root', Exporter.get_root(root))
+
+    def _gate_pauli_x_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, pauli_x_root_dagger, 'pauli-x-root-dagger', Exporter.get_root(root))
+
+    def _gate_pauli_y_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, pauli_y_root_dagger, 'pauli-y-root-dagger', Exporter.get_root(root))
+
+    def _gate_pauli_z_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, pauli_z_root_dagger, 'pauli-z-root-dagger', Exporter.get_root(root))
+
+    def _gate_t(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("t",), TGate)
+        self._circuit.t(targets[0])
+        return ""
+
+    def _gate_t_dagger(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("t-dagger",), TdgGate)
+        self._circuit.tdg(targets[0])
+        return ""
+
+    def _gate_rx_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("rx-theta", theta_radians), lambda: RXGate(theta_radians), native='crx', params=(theta_radians,))
+        self._circuit.rx(theta_radians, targets[0])
+        return ""
+
+    def _gate_ry_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("ry-theta", theta_radians), lambda: RYGate(theta_radians), native='cry', params=(theta_radians,))
+        self._circuit.ry(theta_radians, targets[0])
+        return ""
+
+    def _gate_rz_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("rz-theta", theta_radians), lambda: RZGate(theta_radians), native='crz', params=(theta_radians,))
+        self._circuit.rz(theta_radians, targets[0])
+        return ""
+
+    def _gate_v(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("v",), SXGate, native='csx')
+        self._circuit.sx(targets[0])
+        return ""
+
+    def _gate_v_dagger(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("v-dagger",), SXdgGate)
+        self._circuit.sxdg(targets[0])
+        return ""
+
+    def _gate_h(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, h, 'h')
+
+    def _gate_h_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, h_dagger, 'h-dagger')
+
+    def _gate_c(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, c, 'c')
+
+    def _gate_c_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, c_dagger, 'c-dagger')
+
+    def _gate_p(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        return self._gate_u1(circuit_name, controls, targets, theta_radians, add_comments)
+
+    def _gate_s(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("s",), SGate)
+        self._circuit.s(targets[0])
+        return ""
+
+    def _gate_s_dagger(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("s-dagger",), SdgGate)
+        self._circuit.sdg(targets[0])
+        return ""
+
+    def _gate_swap(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("swap",), SwapGate, native='cswap')
+        self._circuit.swap(targets[0], targets[1])
+        return ""
+
+    def _gate_swap_root(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, swap_root, 'swap-root', Exporter.get_root(root))
+
+    def _gate_swap_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
+        return self.append_custom_gate(controls, targets, swap_root_dagger, 'swap-root-dagger', Exporter.get_root(root))
+
+    def _gate_iswap(self, circuit_name, controls, targets, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("iswap",), iSwapGate)
+        self._circuit.iswap(targets[0], targets[1])
+        return ""
+
+    def _gate_fswap(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, fswap, 'fswap')
+
+    def _gate_swap_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        return self.append_custom_gate(controls, targets, swap_theta, 'swap-theta', theta_radians)
+
+    def _gate_sqrt_swap(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, sqrt_swap, 'sqrt-swap')
+
+    def _gate_sqrt_swap_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, sqrt_swap_dagger, 'sqrt-swap-dagger')
+
+    def _gate_xx(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("xx", theta_radians), lambda: RXXGate(theta_radians))
+        self._circuit.rxx(theta_radians, targets[0], targets[1])
+        return ""
+
+    def _gate_yy(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("yy", theta_radians), lambda: RYYGate(theta_radians))
+        self._circuit.ryy(theta_radians, targets[0], targets[1])
+        return ""
+
+    def _gate_zz(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("zz", theta_radians), lambda: RZZGate(theta_radians))
+        self._circuit.rzz(theta_radians, targets[0], targets[1])
+        return ""
+
+    def _gate_xy(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        return self.append_custom_gate(controls, targets, xy, 'xy', theta_radians)
+
+    def _gate_givens(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        return self.append_custom_gate(controls, targets, givens, 'givens', theta_radians)
+
+    def _gate_a(self, circuit_name, controls, targets, theta_radians, phi_radians, add_comments=True):
+        return self.append_custom_gate(controls, targets, a, 'a', theta_radians, phi_radians)
+
+    def _gate_cross_resonance(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("cross-resonance", theta_radians), lambda: RZXGate(theta_radians), label='cross-resonance')
+        self._circuit.rzx(theta_radians, targets[0], targets[1])
+        return ""
+
+    def _gate_cross_resonance_dagger(self, circuit_name, controls, targets, theta_radians, add_comments=True):
+        if controls:
+            return self.append_controlled_gate(controls, targets, ("cross-resonance", -theta_radians), lambda: RZXGate(-theta_radians), label='cross-resonance-dg')
+        self._circuit.rzx(-theta_radians, targets[0], targets[1])
+        return ""
+
+    def _gate_molmer_sorensen(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, molmer_sorensen, 'molmer-sorensen')
+
+    def _gate_molmer_sorensen_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, molmer_sorensen_dagger, 'molmer-sorensen-dagger')
+
+    def _gate_berkeley(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, berkeley, 'berkeley')
+
+    def _gate_berkeley_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, berkeley_dagger, 'berkeley-dagger')
+
+    def _gate_ecp(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, ecp, 'ecp')
+
+    def _gate_ecp_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, ecp_dagger, 'ecp-dagger')
+
+    def _gate_magic(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, magic, 'magic')
+
+    def _gate_magic_dagger(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, magic_dagger, 'magic-dagger')
+
+    def _gate_w(self, circuit_name, controls, targets, add_comments=True):
+        return self.append_custom_gate(controls, targets, w, 'w')
+
+    def _gate_circuit(
+        self, circuit_name, controls, targets, circuit_id, circuit_gate_name, circuit_power, add_comments
+    ):
+        circuit_power = QiskitExporter.Exporter.get_circuit_power(circuit_power)
+        take_inverse = circuit_power < 0
+        key = ("circuit", circuit_gate_name)
+        build = lambda: self.get_circuit_gate(circuit_gate_name)
+        if controls:
+            return self.append_controlled_gate(controls, targets, key, build, label=circuit_gate_name, inverse=take_inverse, power=abs(circuit_power))
+        return self.append_plain_gate(targets, key, build, inverse=take_inverse, power=abs(circuit_power))
+
+    def _gate_qft(self, circuit_name, controls, targets, add_comments=True):
+        key = ("qft", len(targets))
+        build = lambda: QFT(len(targets)).to_gate()
+        if controls:
+            return self.append_controlled_gate(controls, targets, key, build)
+        return self.append_plain_gate(targets, key, build)
+
+    def _gate_qft_dagger(self, circuit_name, controls, targets, add_comments=True):
+        key = ("qft", len(targets))
+        build = lambda: QFT(len(targets)).to_gate()
+        if controls:
+            return self.append_controlled_gate(controls, targets, key, build, inverse=True)
+        return self.append_plain_gate(targets, key, build, inverse=True)
+
+    def _gate_measure_x(self, circuit_name, targets, classic_bit, add_comments=True):
+        raise BaseExporter.ExportException("The measure-x gate is not implemented.")
+
+    def _gate_measure_y(self, circuit_name, targets, classic_bit, add_comments=True):
+        raise BaseExporter.ExportException("The measure-y gate is not implemented.")
+
+    def _gate_measure_z(self, circuit_name, targets, classic_bit, add_comments=True):
+        self._circuit.measure(targets[0], classic_bit)
+        return ""
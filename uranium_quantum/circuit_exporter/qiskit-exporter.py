@@ -3,6 +3,15 @@ import numpy as np
 
 BaseExporter = importlib.import_module("uranium_quantum.circuit_exporter.base-exporter")
 class Exporter(BaseExporter.BaseExporter):
+    numeric_gates = ("swap-theta", "xy", "givens", "a")
+
+    def __init__(self):
+        super().__init__()
+        # gate object expressions used by the current circuit and their constant names
+        self._gate_constants = {}
+        # basis ('x' or 'y') each control qubit is currently rotated to
+        self._frames = {}
+
     def imports_and_or_headers_section(self):
         return f"\
 import numpy as np\n\
@@ -16,12 +25,15 @@ from qiskit.circuit.library import RXXGate, RYYGate, RZZGate\n\
 from qiskit.circuit.library import RZXGate\n\
 from qiskit.circuit.library import SXGate, SXdgGate\n\
 from qiskit.circuit.library import SGate, SdgGate, TGate, TdgGate\n\
-from qiskit.circuit.library import UGate, U1Gate\n\
+from qiskit.circuit.library import UGate, U1Gate, U3Gate\n\
 from qiskit.circuit.library import SwapGate, iSwapGate\n\
 from qiskit.circuit.library import QFT\n\
 from uranium_quantum.circuit_exporter.qiskit_custom_gates import *\n\
 \n\n"
     def start_circuit_code(self, circuit_name):
+        self._gate_constants = {}
+        self._frames = {}
+        self._circuit_name = circuit_name
         if self._bits:
             return f"\
 cr_{circuit_name} = ClassicalRegister({self._bits})\n\
@@ -33,8 +45,42 @@ qr_{circuit_name} = QuantumRegister({self._qubits})\n\
 qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
 
 
+    def parameter_code(self, name):
+        return f"parameter('{name}')"
+
+    @staticmethod
+    def negated_angle(angle):
+        return f"-{angle}" if isinstance(angle, str) else -angle
+
+    def gate_definitions_code(self):
+        code = ""
+        for gate, constant in self._gate_constants.items():
+            code += f"{constant} = {gate}\n"
+        if code:
+            code += "\n\n"
+        return code
+
+    def global_phase_code(self, circuit_name, global_phase):
+        return f"qc_{circuit_name}.global_phase += {global_phase}\n\n"
+
+    def circuit_alias_code(self, alias, circuit_name):
+        return f"qc_{alias} = qc_{circuit_name}\n\n"
+
     def end_circuit_code(self):
-        return f""
+        return self.set_frames(self._circuit_name, sorted(self._frames), None)
+
+    def process_gate(self, name, circuit_name, controls, targets, gates, *args):
+        # controlled gates rotate their controls as needed, any other
+        # gate needs the qubits it acts on back in the computational basis
+        code = ""
+        if name == "barrier":
+            code += self.set_frames(circuit_name, sorted(self._frames), None)
+        elif not controls:
+            qubits = list(targets)
+            for gate in gates:
+                qubits += gate["targets"]
+            code += self.set_frames(circuit_name, qubits, None)
+        return code + super().process_gate(name, circuit_name, controls, targets, gates, *args)
 
     @staticmethod
     def get_control_states(controls):
@@ -61,7 +107,7 @@ qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
         return sign * int(power)
 
     @staticmethod
-    def get_plain_gate(name, targets, label, theta_radians=None, phi_radians=None, lambda_radians=None, root=None):
+    def get_gate_params(theta_radians=None, phi_radians=None, lambda_radians=None, root=None):
         params = ""
         if theta_radians != None:
           params += f"{theta_radians}"
@@ -80,6 +126,11 @@ qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
             params += f", {root}"
           else:
             params += f"{root}"
+        return params
+
+    @staticmethod
+    def get_plain_gate(name, targets, label, theta_radians=None, phi_radians=None, lambda_radians=None, root=None):
+        params = Exporter.get_gate_params(theta_radians, phi_radians, lambda_radians, root)
 
         if name == "QFT":
             params = len(targets)
@@ -98,24 +149,7 @@ qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
     @staticmethod
     def get_controlled_gate(name, controls, targets, label, theta_radians=None, phi_radians=None, lambda_radians=None, root=None):
         controlstates = Exporter.get_control_states(controls)
-        params = ""
-        if theta_radians != None:
-            params += f"{theta_radians}"
-        if phi_radians != None:
-            if params:
-                params += f", {phi_radians}"
-            else:
-                params += f"{phi_radians}"
-        if lambda_radians != None:
-            if params:
-                params += f", {lambda_radians}"
-            else:
-                params += f"{lambda_radians}"
-        if root != None:
-            if params:
-                params += f", {root}"
-            else:
-                params += f"{root}"
+        params = Exporter.get_gate_params(theta_radians, phi_radians, lambda_radians, root)
 
         if name == "QFT":
             params = len(targets)
@@ -126,31 +160,63 @@ qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
             return f"{name}({params}).control(num_ctrl_qubits={len(controls)}, ctrl_state='{controlstates}')"
 
 
-    @staticmethod
-    def rotate_state_to_x_basis(circuit_name, target):
+    def gate_constant(self, circuit_name, gate):
+        """Get the name of a constant holding a gate object, so that each distinct
+        gate is built once per circuit instead of once per occurrence."""
+        if gate not in self._gate_constants:
+            self._gate_constants[gate] = f"gate_{circuit_name}_{len(self._gate_constants)}"
+        return self._gate_constants[gate]
+
+    def rotate_state_to_x_basis(self, circuit_name, target):
         return f"qc_{circuit_name}.h(qr_{circuit_name}[{target}])\n"
 
-    @staticmethod
-    def rotate_state_to_y_basis(circuit_name, target):
-        return f"qc_{circuit_name}.unitary(gate_rotation_to_y_basis(), [{target}])\n"
+    def rotate_state_to_y_basis(self, circuit_name, target):
+        gate = self.gate_constant(circuit_name, "gate_rotation_to_y_basis()")
+        return f"qc_{circuit_name}.append({gate}, [qr_{circuit_name}[{target}]])\n"
 
-    @staticmethod
-    def undo_rotate_state_to_x_basis(circuit_name, target):
+    def undo_rotate_state_to_x_basis(self, circuit_name, target):
         return f"qc_{circuit_name}.h(qr_{circuit_name}[{target}])\n"
 
-    @staticmethod
-    def undo_rotate_state_to_y_basis(circuit_name, target):
-        return f"qc_{circuit_name}.unitary(gate_undo_rotation_to_y_basis(), [{target}])\n"
+    def undo_rotate_state_to_y_basis(self, circuit_name, target):
+        gate = self.gate_constant(circuit_name, "gate_undo_rotation_to_y_basis()")
+        return f"qc_{circuit_name}.append({gate}, [qr_{circuit_name}[{target}]])\n"
 
     @staticmethod
-    def controlled_gate_code(name, circuit_name, controls, targets, label=None, theta_radians=None, phi_radians=None, root=None, lambda_radians=None, inverse=False, power=1):
+    def get_control_frame(control):
+        if '+i' in control['state'] or '-i' in control['state']:
+            return 'y'
+        elif '+' in control['state'] or '-' in control['state']:
+            return 'x'
+        return None
+
+    def set_frames(self, circuit_name, qubits, frame):
+        """Rotate qubits to the x or y basis, or back to the computational basis
+        when frame is None, emitting rotations only for qubits not already there."""
+        code = ""
+        for qubit in qubits:
+            current_frame = self._frames.get(qubit)
+            if current_frame == frame:
+                continue
+            if current_frame == 'x':
+                code += self.undo_rotate_state_to_x_basis(circuit_name, qubit)
+            elif current_frame == 'y':
+                code += self.undo_rotate_state_to_y_basis(circuit_name, qubit)
+            if frame == 'x':
+                code += self.rotate_state_to_x_basis(circuit_name, qubit)
+            elif frame == 'y':
+                code += self.rotate_state_to_y_basis(circuit_name, qubit)
+            if frame:
+                self._frames[qubit] = frame
+            else:
+                del self._frames[qubit]
+        return code
+
+    def controlled_gate_code(self, name, circuit_name, controls, targets, label=None, theta_radians=None, phi_radians=None, root=None, lambda_radians=None, inverse=False, power=1, native=None):
+        """Code appending a controlled gate, a gate with a single control and a
+        native QuantumCircuit method (e.g. 'cx') is appended through that method."""
         assert isinstance(circuit_name, str)
         assert isinstance(controls, list)
         assert isinstance(targets, list)
-        if inverse:
-            controlled_gate = Exporter.get_controlled_gate(name, controls, targets, label, theta_radians, phi_radians, lambda_radians, root) + ".inverse()"
-        else:
-            controlled_gate = Exporter.get_controlled_gate(name, controls, targets, label, theta_radians, phi_radians, lambda_radians, root)
 
         qubits = ""
         for control in controls:
@@ -162,33 +228,43 @@ qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
                 qubits += ", "
             qubits += f"qr_{circuit_name}[{target}]"
 
-        code = ""
+        if native and len(controls) == 1 and not inverse:
+            params = Exporter.get_gate_params(theta_radians, phi_radians, lambda_radians, root)
+            if native == "cu":
+                # the global phase of the target gate
+                params += ", 0"
+            if params:
+                params += ", "
+            controlstates = Exporter.get_control_states(controls)
+            append_gate = f"qc_{circuit_name}.{native}({params}{qubits}, ctrl_state='{controlstates}')\n"
+        else:
+            if inverse:
+                controlled_gate = Exporter.get_controlled_gate(name, controls, targets, label, theta_radians, phi_radians, lambda_radians, root) + ".inverse()"
+            else:
+                controlled_gate = Exporter.get_controlled_gate(name, controls, targets, label, theta_radians, phi_radians, lambda_radians, root)
+            gate = self.gate_constant(circuit_name, controlled_gate)
+            append_gate = f"qc_{circuit_name}.append({gate}, [{qubits}])\n"
+
+        # controls stay rotated after the gate, the rotation is undone
+        # only when a later gate needs a different basis on that qubit
+        code = self.set_frames(circuit_name, targets, None)
         for control in controls:
-            if '+i' in control['state'] or '-i' in control['state']:
-                code += Exporter.rotate_state_to_y_basis(circuit_name, control['target'])
-            elif '+' in control['state'] or '-' in control['state']:
-                code += Exporter.rotate_state_to_x_basis(circuit_name, control['target'])
+            code += self.set_frames(circuit_name, [control['target']], Exporter.get_control_frame(control))
 
         for _ in range(abs(power)):
-            code += f"qc_{circuit_name}.append({controlled_gate}, [{qubits}])\n"
-
-        for control in controls:
-            if '+i' in control['state'] or '-i' in control['state']:
-                code += Exporter.undo_rotate_state_to_y_basis(circuit_name, control['target'])
-            elif '+' in control['state'] or '-' in control['state']:
-                code += Exporter.undo_rotate_state_to_x_basis(circuit_name, control['target'])
+            code += append_gate
 
         return code
 
 
-    @staticmethod
-    def plain_gate_code(name, circuit_name, targets, label=None, theta_radians=None, phi_radians=None, root=None, lambda_radians=None, inverse=False, power=1):
+    def plain_gate_code(self, name, circuit_name, targets, label=None, theta_radians=None, phi_radians=None, root=None, lambda_radians=None, inverse=False, power=1):
         assert isinstance(circuit_name, str)
         assert isinstance(targets, list)
         if inverse:
           plain_gate = Exporter.get_plain_gate(name, targets, label, theta_radians, phi_radians, lambda_radians, root) + ".inverse()"
         else:
           plain_gate = Exporter.get_plain_gate(name, targets, label, theta_radians, phi_radians, lambda_radians, root)
+        gate = self.gate_constant(circuit_name, plain_gate)
         qubits = ""
         for target in targets:
             if qubits:
@@ -196,658 +272,606 @@ qc_{circuit_name} = QuantumCircuit(qr_{circuit_name})\n\n\n"
             qubits += f"qr_{circuit_name}[{target}]"
         out = ""
         for _ in range(abs(power)):
-            out += f"qc_{circuit_name}.append({plain_gate}, [{qubits}])\n"
+            out += f"qc_{circuit_name}.append({gate}, [{qubits}])\n"
         return out
 
-    @staticmethod
     def _gate_u3(
-        circuit_name, controls, targets, theta_radians, phi_radians, lambda_radians, add_comments=True
+        self, circuit_name, controls, targets, theta_radians, phi_radians, lambda_radians, add_comments=True
     ):
         out = "# u3 gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('UGate', circuit_name, controls, targets, theta_radians=theta_radians, phi_radians=phi_radians, lambda_radians=lambda_radians)
-            out += f"{code}"
+            out += self.controlled_u_code(circuit_name, controls, targets, theta_radians, phi_radians, lambda_radians)
         else:
             out += f"qc_{circuit_name}.u({theta_radians}, {phi_radians}, {lambda_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_u2(circuit_name, controls, targets, phi_radians, lambda_radians, add_comments=True):
+    def controlled_u_code(self, circuit_name, controls, targets, theta_radians, phi_radians, lambda_radians):
+        # qiskit does not bind the parameters of controlled UGates,
+        # U3Gate is the same gate and is used with symbolic parameters
+        if any(isinstance(angle, str) for angle in (theta_radians, phi_radians, lambda_radians)):
+            return self.controlled_gate_code('U3Gate', circuit_name, controls, targets, theta_radians=theta_radians, phi_radians=phi_radians, lambda_radians=lambda_radians)
+        return self.controlled_gate_code('UGate', circuit_name, controls, targets, theta_radians=theta_radians, phi_radians=phi_radians, lambda_radians=lambda_radians, native='cu')
+
+    def _gate_u2(self, circuit_name, controls, targets, phi_radians, lambda_radians, add_comments=True):
         out = "# u2 gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('UGate', circuit_name, controls, targets, theta_radians=(np.pi/2), phi_radians=phi_radians, lambda_radians=lambda_radians)
-            out += f"{code}"
+            out += self.controlled_u_code(circuit_name, controls, targets, np.pi/2, phi_radians, lambda_radians)
         else:
             out += f"qc_{circuit_name}.u(np.pi/2, {phi_radians}, {lambda_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_u1(circuit_name, controls, targets, lambda_radians, add_comments=True):
+    def _gate_u1(self, circuit_name, controls, targets, lambda_radians, add_comments=True):
         out = "# u1 gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('U1Gate', circuit_name, controls, targets, lambda_radians=lambda_radians)
+            code = self.controlled_gate_code('U1Gate', circuit_name, controls, targets, lambda_radians=lambda_radians, native='cp')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.p({lambda_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
 
-    @staticmethod
-    def _gate_identity(circuit_name, targets, add_comments=True):
+    def _gate_identity(self, circuit_name, targets, add_comments=True):
         out = "# identity gate\n" if add_comments else ""
         out += f"qc_{circuit_name}.id(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_hadamard(circuit_name, controls, targets, add_comments=True):
+    def _gate_hadamard(self, circuit_name, controls, targets, add_comments=True):
         out = "# hadamard gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('HGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('HGate', circuit_name, controls, targets, native='ch')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.h(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_hadamard_xy(circuit_name, controls, targets, add_comments=True):
+    def _gate_hadamard_xy(self, circuit_name, controls, targets, add_comments=True):
         out = "# hadamard-xy gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('hadamard_xy', circuit_name, controls, targets, label='hadamard-xy')
+            code = self.controlled_gate_code('hadamard_xy', circuit_name, controls, targets, label='hadamard-xy')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(hadamard_xy(), [{targets[0]}], label='hadamard-xy')\n"
+            code = self.plain_gate_code('hadamard_xy', circuit_name, targets, label='hadamard-xy')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_hadamard_yz(circuit_name, controls, targets, add_comments=True):
+    def _gate_hadamard_yz(self, circuit_name, controls, targets, add_comments=True):
         out = "# hadamard-yz gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('hadamard_yz', circuit_name, controls, targets, label='hadamard-yz')
+            code = self.controlled_gate_code('hadamard_yz', circuit_name, controls, targets, label='hadamard-yz')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(hadamard_yz(), [{targets[0]}], label='hadamard-yz')\n"
+            code = self.plain_gate_code('hadamard_yz', circuit_name, targets, label='hadamard-yz')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_hadamard_zx(circuit_name, controls, targets, add_comments=True):
+    def _gate_hadamard_zx(self, circuit_name, controls, targets, add_comments=True):
         out = "# hadamard-zx gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('HGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('HGate', circuit_name, controls, targets, native='ch')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.h(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_pauli_x(circuit_name, controls, targets, add_comments=True):
+    def _gate_pauli_x(self, circuit_name, controls, targets, add_comments=True):
         out = "# pauli-x gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('XGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('XGate', circuit_name, controls, targets, native='cx')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.x(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_pauli_y(circuit_name, controls, targets, add_comments=True):
+    def _gate_pauli_y(self, circuit_name, controls, targets, add_comments=True):
         out = "# pauli-y gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('YGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('YGate', circuit_name, controls, targets, native='cy')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.y(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_pauli_z(circuit_name, controls, targets, add_comments=True):
+    def _gate_pauli_z(self, circuit_name, controls, targets, add_comments=True):
         out = "# pauli-z gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('ZGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('ZGate', circuit_name, controls, targets, native='cz')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.z(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_pauli_x_root(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_pauli_x_root(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# pauli-x-root gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('pauli_x_root', circuit_name, controls, targets, root=root, label='pauli-x-root')
+            code = self.controlled_gate_code('pauli_x_root', circuit_name, controls, targets, root=root, label='pauli-x-root')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(pauli_x_root({root}), [{targets[0]}], label='pauli-x-root')\n"
+            code = self.plain_gate_code('pauli_x_root', circuit_name, targets, root=root, label='pauli-x-root')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_pauli_y_root(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_pauli_y_root(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# pauli-y-root gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('pauli_y_root', circuit_name, controls, targets, root=root, label='pauli-y-root')
+            code = self.controlled_gate_code('pauli_y_root', circuit_name, controls, targets, root=root, label='pauli-y-root')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(pauli_y_root({root}), [{targets[0]}], label='pauli-y-root')\n"
+            code = self.plain_gate_code('pauli_y_root', circuit_name, targets, root=root, label='pauli-y-root')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_pauli_z_root(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_pauli_z_root(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# pauli-z-root gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('pauli_z_root', circuit_name, controls, targets, root=root, label='pauli-z-root')
+            code = self.controlled_gate_code('pauli_z_root', circuit_name, controls, targets, root=root, label='pauli-z-root')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(pauli_z_root({root}), [{targets[0]}], label='pauli-z-root')\n"
+            code = self.plain_gate_code('pauli_z_root', circuit_name, targets, root=root, label='pauli-z-root')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_pauli_x_root_dagger(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_pauli_x_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# pauli-x-root-dagger gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('pauli_x_root_dagger', circuit_name, controls, targets, root=root, label='pauli-x-root-dagger')
+            code = self.controlled_gate_code('pauli_x_root_dagger', circuit_name, controls, targets, root=root, label='pauli-x-root-dagger')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(pauli_x_root_dagger({root}), [{targets[0]}], label='pauli-x-root-dagger')\n"
+            code = self.plain_gate_code('pauli_x_root_dagger', circuit_name, targets, root=root, label='pauli-x-root-dagger')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_pauli_y_root_dagger(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_pauli_y_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# pauli-y-root-dagger gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('pauli_y_root_dagger', circuit_name, controls, targets, root=root, label='pauli-y-root-dagger')
+            code = self.controlled_gate_code('pauli_y_root_dagger', circuit_name, controls, targets, root=root, label='pauli-y-root-dagger')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(pauli_y_root_dagger({root}), [{targets[0]}], label='pauli-y-root-dagger')\n"
+            code = self.plain_gate_code('pauli_y_root_dagger', circuit_name, targets, root=root, label='pauli-y-root-dagger')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_pauli_z_root_dagger(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_pauli_z_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# pauli-z-root-dagger gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('pauli_z_root_dagger', circuit_name, controls, targets, root=root, label='pauli-z-root-dagger')
+            code = self.controlled_gate_code('pauli_z_root_dagger', circuit_name, controls, targets, root=root, label='pauli-z-root-dagger')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(pauli_z_root_dagger({root}), [{targets[0]}], label='pauli-z-root-dagger')\n"
+            code = self.plain_gate_code('pauli_z_root_dagger', circuit_name, targets, root=root, label='pauli-z-root-dagger')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_t(circuit_name, controls, targets, add_comments=True):
+    def _gate_t(self, circuit_name, controls, targets, add_comments=True):
         out = "# t gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('TGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('TGate', circuit_name, controls, targets)
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.t(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
 
-    @staticmethod
-    def _gate_t_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_t_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# t-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('TdgGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('TdgGate', circuit_name, controls, targets)
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.tdg(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_rx_theta(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_rx_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# rx-theta gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RXGate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('RXGate', circuit_name, controls, targets, theta_radians=theta_radians, native='crx')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.rx({theta_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_ry_theta(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_ry_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# ry-theta gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RYGate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('RYGate', circuit_name, controls, targets, theta_radians=theta_radians, native='cry')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.ry({theta_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_rz_theta(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_rz_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# rz-theta gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RZGate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('RZGate', circuit_name, controls, targets, theta_radians=theta_radians, native='crz')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.rz({theta_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_v(circuit_name, controls, targets, add_comments=True):
+    def _gate_v(self, circuit_name, controls, targets, add_comments=True):
         out = "# v gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('SXGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('SXGate', circuit_name, controls, targets, native='csx')
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('SXGate', circuit_name, targets)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.sx(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_v_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_v_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# v-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('SXdgGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('SXdgGate', circuit_name, controls, targets)
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('SXdgGate', circuit_name, targets)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.sxdg(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_h(circuit_name, controls, targets, add_comments=True):
+    def _gate_h(self, circuit_name, controls, targets, add_comments=True):
         out = "# h gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('h', circuit_name, controls, targets, label='h')
+            code = self.controlled_gate_code('h', circuit_name, controls, targets, label='h')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(h(), [{targets[0]}], label='h')\n"
+            code = self.plain_gate_code('h', circuit_name, targets, label='h')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_h_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_h_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# h-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('h_dagger', circuit_name, controls, targets, label='h-dagger')
+            code = self.controlled_gate_code('h_dagger', circuit_name, controls, targets, label='h-dagger')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(h_dagger(), [{targets[0]}], label='h-dagger')\n"
+            code = self.plain_gate_code('h_dagger', circuit_name, targets, label='h-dagger')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_c(circuit_name, controls, targets, add_comments=True):
+    def _gate_c(self, circuit_name, controls, targets, add_comments=True):
         out = "# c gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('c', circuit_name, controls, targets, label='c')
+            code = self.controlled_gate_code('c', circuit_name, controls, targets, label='c')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(c(), [{targets[0]}], label='c')\n"
+            code = self.plain_gate_code('c', circuit_name, targets, label='c')
+            out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_c_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_c_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# c-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('c_dagger', circuit_name, controls, targets, label='c-dagger')
+            code = self.controlled_gate_code('c_dagger', circuit_name, controls, targets, label='c-dagger')
             out += f"{code}"
         else:
-            out += f"qc_{circuit_name}.unitary(c_dagger(), [{targets[0]}], label='c-dagger')\n"
+            code = self.plain_gate_code('c_dagger', circuit_name, targets, label='c-dagger')
+            out += f"{code}"
         return out
 
 
-    @staticmethod
-    def _gate_p(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_p(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# p gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('U1Gate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('U1Gate', circuit_name, controls, targets, theta_radians=theta_radians, native='cp')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.p({theta_radians}, qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_s(circuit_name, controls, targets, add_comments=True):
+    def _gate_s(self, circuit_name, controls, targets, add_comments=True):
         out = "# s gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('SGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('SGate', circuit_name, controls, targets)
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.s(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_s_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_s_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# s-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('SdgGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('SdgGate', circuit_name, controls, targets)
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.sdg(qr_{circuit_name}[{targets[0]}])\n"
         return out
 
-    @staticmethod
-    def _gate_swap(circuit_name, controls, targets, add_comments=True):
+    def _gate_swap(self, circuit_name, controls, targets, add_comments=True):
         out = "# swap gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('SwapGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('SwapGate', circuit_name, controls, targets, native='cswap')
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.swap(qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_swap_root(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_swap_root(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# swap root gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('swap_root', circuit_name, controls, targets, root=root, label="swap-root")
+            code = self.controlled_gate_code('swap_root', circuit_name, controls, targets, root=root, label="swap-root")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('swap_root', circuit_name, targets, root=root, label="swap-root")
+            code = self.plain_gate_code('swap_root', circuit_name, targets, root=root, label="swap-root")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_swap_root_dagger(circuit_name, controls, targets, root, add_comments=True):
+    def _gate_swap_root_dagger(self, circuit_name, controls, targets, root, add_comments=True):
         out = "# swap root dagger gate\n" if add_comments else ""
         root = f"(2**{root[4:]})" if '^' in root else root[2:]
         if controls:
-            code = Exporter.controlled_gate_code('swap_root_dagger', circuit_name, controls, targets, root=root, label="swap-root-dagger")
+            code = self.controlled_gate_code('swap_root_dagger', circuit_name, controls, targets, root=root, label="swap-root-dagger")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('swap_root_dagger', circuit_name, targets, root=root, label="swap-root-dagger")
+            code = self.plain_gate_code('swap_root_dagger', circuit_name, targets, root=root, label="swap-root-dagger")
             out += f"{code}\n"
         return out
 
   
-    @staticmethod
-    def _gate_iswap(circuit_name, controls, targets, add_comments=True):
+    def _gate_iswap(self, circuit_name, controls, targets, add_comments=True):
         out = "# iswap gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('iSwapGate', circuit_name, controls, targets)
+            code = self.controlled_gate_code('iSwapGate', circuit_name, controls, targets)
             out += f"{code}"
         else:
             out += f"qc_{circuit_name}.iswap(qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_fswap(circuit_name, controls, targets, add_comments=True):
+    def _gate_fswap(self, circuit_name, controls, targets, add_comments=True):
         out = "# fswap gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('fswap', circuit_name, controls, targets, label="fswap")
+            code = self.controlled_gate_code('fswap', circuit_name, controls, targets, label="fswap")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('fswap', circuit_name, targets, label="fswap")
+            code = self.plain_gate_code('fswap', circuit_name, targets, label="fswap")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_swap_theta(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_swap_theta(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# swap theta gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('swap_theta', circuit_name, controls, targets, theta_radians=theta_radians, label="swap-theta")
+            code = self.controlled_gate_code('swap_theta', circuit_name, controls, targets, theta_radians=theta_radians, label="swap-theta")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('swap_theta', circuit_name, targets, theta_radians=theta_radians, label="swap-theta")
+            code = self.plain_gate_code('swap_theta', circuit_name, targets, theta_radians=theta_radians, label="swap-theta")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_sqrt_swap(circuit_name, controls, targets, add_comments=True):
+    def _gate_sqrt_swap(self, circuit_name, controls, targets, add_comments=True):
         out = "# sqrt-swap gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('sqrt_swap', circuit_name, controls, targets, label="sqrt-swap")
+            code = self.controlled_gate_code('sqrt_swap', circuit_name, controls, targets, label="sqrt-swap")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('sqrt_swap', circuit_name, targets, label="sqrt-swap")
+            code = self.plain_gate_code('sqrt_swap', circuit_name, targets, label="sqrt-swap")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_sqrt_swap_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_sqrt_swap_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# sqrt-swap-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('sqrt_swap_dagger', circuit_name, controls, targets, label="sqrt-swap-dagger")
+            code = self.controlled_gate_code('sqrt_swap_dagger', circuit_name, controls, targets, label="sqrt-swap-dagger")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('sqrt_swap_dagger', circuit_name, targets, label="sqrt-swap-dagger")
+            code = self.plain_gate_code('sqrt_swap_dagger', circuit_name, targets, label="sqrt-swap-dagger")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_xx(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_xx(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# xx gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RXXGate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('RXXGate', circuit_name, controls, targets, theta_radians=theta_radians)
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('RXXGate', circuit_name, targets, theta_radians=theta_radians)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.rxx({theta_radians}, qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_yy(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_yy(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# yy gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RYYGate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('RYYGate', circuit_name, controls, targets, theta_radians=theta_radians)
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('RYYGate', circuit_name, targets, theta_radians=theta_radians)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.ryy({theta_radians}, qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_zz(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_zz(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# zz gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RZZGate', circuit_name, controls, targets, theta_radians=theta_radians)
+            code = self.controlled_gate_code('RZZGate', circuit_name, controls, targets, theta_radians=theta_radians)
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('RZZGate', circuit_name, targets, theta_radians=theta_radians)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.rzz({theta_radians}, qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_xy(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_xy(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# xy gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('xy', circuit_name, controls, targets, theta_radians=theta_radians, label="xy")
+            code = self.controlled_gate_code('xy', circuit_name, controls, targets, theta_radians=theta_radians, label="xy")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('xy', circuit_name, targets, theta_radians=theta_radians, label="xy")
+            code = self.plain_gate_code('xy', circuit_name, targets, theta_radians=theta_radians, label="xy")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_givens(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_givens(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# givens gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('givens', circuit_name, controls, targets, theta_radians=theta_radians, label="givens")
+            code = self.controlled_gate_code('givens', circuit_name, controls, targets, theta_radians=theta_radians, label="givens")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('givens', circuit_name, targets, theta_radians=theta_radians, label="givens")
+            code = self.plain_gate_code('givens', circuit_name, targets, theta_radians=theta_radians, label="givens")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_a(circuit_name, controls, targets, theta_radians, phi_radians, add_comments=True):
+    def _gate_a(self, circuit_name, controls, targets, theta_radians, phi_radians, add_comments=True):
         out = "# a gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('a', circuit_name, controls, targets, theta_radians=theta_radians, phi_radians=phi_radians, label="a")
+            code = self.controlled_gate_code('a', circuit_name, controls, targets, theta_radians=theta_radians, phi_radians=phi_radians, label="a")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('a', circuit_name, targets, theta_radians=theta_radians, phi_radians=phi_radians, label="a")
+            code = self.plain_gate_code('a', circuit_name, targets, theta_radians=theta_radians, phi_radians=phi_radians, label="a")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_cross_resonance(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_cross_resonance(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# crosss-resonance gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RZXGate', circuit_name, controls, targets, theta_radians=theta_radians, label='cross-resonance')
+            code = self.controlled_gate_code('RZXGate', circuit_name, controls, targets, theta_radians=theta_radians, label='cross-resonance')
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('RZXGate', circuit_name, targets, theta_radians=theta_radians)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.rzx({theta_radians}, qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_cross_resonance_dagger(circuit_name, controls, targets, theta_radians, add_comments=True):
+    def _gate_cross_resonance_dagger(self, circuit_name, controls, targets, theta_radians, add_comments=True):
         out = "# crosss-resonance-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('RZXGate', circuit_name, controls, targets, theta_radians=-theta_radians, label='cross-resonance-dg')
+            code = self.controlled_gate_code('RZXGate', circuit_name, controls, targets, theta_radians=self.negated_angle(theta_radians), label='cross-resonance-dg')
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('RZXGate', circuit_name, targets, theta_radians=-theta_radians)
-            out += f"{code}\n"
+            out += f"qc_{circuit_name}.rzx({self.negated_angle(theta_radians)}, qr_{circuit_name}[{targets[0]}], qr_{circuit_name}[{targets[1]}])\n"
         return out
 
-    @staticmethod
-    def _gate_molmer_sorensen(circuit_name, controls, targets, add_comments=True):
+    def _gate_molmer_sorensen(self, circuit_name, controls, targets, add_comments=True):
         out = "# molmer-sorensen gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('molmer_sorensen', circuit_name, controls, targets, label="molmer-sorensen")
+            code = self.controlled_gate_code('molmer_sorensen', circuit_name, controls, targets, label="molmer-sorensen")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('molmer_sorensen', circuit_name, targets, label="molmer-sorensen")
+            code = self.plain_gate_code('molmer_sorensen', circuit_name, targets, label="molmer-sorensen")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_molmer_sorensen_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_molmer_sorensen_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# molmer-sorensen-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('molmer_sorensen_dagger', circuit_name, controls, targets, label="molmer-sorensen-dagger")
+            code = self.controlled_gate_code('molmer_sorensen_dagger', circuit_name, controls, targets, label="molmer-sorensen-dagger")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('molmer_sorensen_dagger', circuit_name, targets, label="molmer-sorensen-dagger")
+            code = self.plain_gate_code('molmer_sorensen_dagger', circuit_name, targets, label="molmer-sorensen-dagger")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_berkeley(circuit_name, controls, targets, add_comments=True):
+    def _gate_berkeley(self, circuit_name, controls, targets, add_comments=True):
         out = "# berkeley gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('berkeley', circuit_name, controls, targets, label="berkeley")
+            code = self.controlled_gate_code('berkeley', circuit_name, controls, targets, label="berkeley")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('berkeley', circuit_name, targets, label="berkeley")
+            code = self.plain_gate_code('berkeley', circuit_name, targets, label="berkeley")
             out += f"{code}\n"
         return out
 
 
-    @staticmethod
-    def _gate_berkeley_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_berkeley_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# berkeley-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('berkeley_dagger', circuit_name, controls, targets, label="berkeley-dagger")
+            code = self.controlled_gate_code('berkeley_dagger', circuit_name, controls, targets, label="berkeley-dagger")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('berkeley_dagger', circuit_name, targets, label="berkeley-dagger")
+            code = self.plain_gate_code('berkeley_dagger', circuit_name, targets, label="berkeley-dagger")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_ecp(circuit_name, controls, targets, add_comments=True):
+    def _gate_ecp(self, circuit_name, controls, targets, add_comments=True):
         out = "# ecp gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('ecp', circuit_name, controls, targets, label="ecp")
+            code = self.controlled_gate_code('ecp', circuit_name, controls, targets, label="ecp")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('ecp', circuit_name, targets, label="ecp")
+            code = self.plain_gate_code('ecp', circuit_name, targets, label="ecp")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_ecp_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_ecp_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# ecp-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('ecp_dagger', circuit_name, controls, targets, label="ecp-dagger")
+            code = self.controlled_gate_code('ecp_dagger', circuit_name, controls, targets, label="ecp-dagger")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('ecp_dagger', circuit_name, targets, label="ecp-dagger")
+            code = self.plain_gate_code('ecp_dagger', circuit_name, targets, label="ecp-dagger")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_magic(circuit_name, controls, targets, add_comments=True):
+    def _gate_magic(self, circuit_name, controls, targets, add_comments=True):
         out = "# magic gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('magic', circuit_name, controls, targets, label="magic")
+            code = self.controlled_gate_code('magic', circuit_name, controls, targets, label="magic")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('magic', circuit_name, targets, label="magic")
+            code = self.plain_gate_code('magic', circuit_name, targets, label="magic")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_magic_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_magic_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# magic-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('magic_dagger', circuit_name, controls, targets, label="magic-dagger")
+            code = self.controlled_gate_code('magic_dagger', circuit_name, controls, targets, label="magic-dagger")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('magic_dagger', circuit_name, targets, label="magic-dagger")
+            code = self.plain_gate_code('magic_dagger', circuit_name, targets, label="magic-dagger")
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_w(circuit_name, controls, targets, add_comments=True):
+    def _gate_w(self, circuit_name, controls, targets, add_comments=True):
         out = "# w gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('w', circuit_name, controls, targets, label="w")
+            code = self.controlled_gate_code('w', circuit_name, controls, targets, label="w")
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('w', circuit_name, targets, label="w")
+            code = self.plain_gate_code('w', circuit_name, targets, label="w")
             out += f"{code}\n"
         return out
 
-    @staticmethod
     def _gate_circuit(
-        circuit_name, controls, targets, circuit_id, circuit_gate_name, circuit_power, add_comments
+        self, circuit_name, controls, targets, circuit_id, circuit_gate_name, circuit_power, add_comments
     ):
         out = "# circuit gate\n" if add_comments else ""
         circuit_power = Exporter.get_circuit_power(circuit_power)
         take_inverse = circuit_power < 0
         if controls:
-            code = Exporter.controlled_gate_code(f'qc_{circuit_gate_name}.to_gate', circuit_name, controls, targets, label=circuit_gate_name, inverse=take_inverse, power=abs(circuit_power))
+            code = self.controlled_gate_code(f'qc_{circuit_gate_name}.to_gate', circuit_name, controls, targets, label=circuit_gate_name, inverse=take_inverse, power=abs(circuit_power))
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code(f'qc_{circuit_gate_name}.to_gate', circuit_name, targets, label=circuit_gate_name, inverse=take_inverse, power=abs(circuit_power))
+            code = self.plain_gate_code(f'qc_{circuit_gate_name}.to_gate', circuit_name, targets, label=circuit_gate_name, inverse=take_inverse, power=abs(circuit_power))
             out += f"{code}"
         return out
 
-    @staticmethod
-    def _gate_qft(circuit_name, controls, targets, add_comments=True):
+    def _gate_qft(self, circuit_name, controls, targets, add_comments=True):
         out = "# qft gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('QFT', circuit_name, controls, targets)
+            code = self.controlled_gate_code('QFT', circuit_name, controls, targets)
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('QFT', circuit_name, targets)
+            code = self.plain_gate_code('QFT', circuit_name, targets)
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_qft_dagger(circuit_name, controls, targets, add_comments=True):
+    def _gate_qft_dagger(self, circuit_name, controls, targets, add_comments=True):
         out = "# qft-dagger gate\n" if add_comments else ""
         if controls:
-            code = Exporter.controlled_gate_code('QFT', circuit_name, controls, targets, inverse=True)
+            code = self.controlled_gate_code('QFT', circuit_name, controls, targets, inverse=True)
             out += f"{code}"
         else:
-            code = Exporter.plain_gate_code('QFT', circuit_name, targets, inverse=True)
+            code = self.plain_gate_code('QFT', circuit_name, targets, inverse=True)
             out += f"{code}\n"
         return out
 
-    @staticmethod
-    def _gate_measure_x(circuit_name, targets, classic_bit, add_comments=True):
+    def _gate_measure_x(self, circuit_name, targets, classic_bit, add_comments=True):
         raise BaseExporter.ExportException("The measure-x gate is not implemented.")
 
-    @staticmethod
-    def _gate_measure_y(circuit_name, targets, classic_bit, add_comments=True):
+    def _gate_measure_y(self, circuit_name, targets, classic_bit, add_comments=True):
         raise BaseExporter.ExportException("The measure-y gate is not implemented.")
 
-    @staticmethod
-    def _gate_measure_z(circuit_name, targets, classic_bit, add_comments=True):
+    def _gate_measure_z(self, circuit_name, targets, classic_bit, add_comments=True):
         out = "# measure-z gate\n" if add_comments else ""
         out += f"qc_{circuit_name}.measure({targets[0]}, {classic_bit})\n"
         return out
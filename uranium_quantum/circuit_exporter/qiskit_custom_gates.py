@@ -1,8 +1,18 @@
 import math
 import numpy as np
+from qiskit.circuit import Parameter
 from qiskit.quantum_info.operators import Operator
 from qiskit.extensions import UnitaryGate
 
+_parameters = {}
+
+def parameter(name):
+  """Get the qiskit Parameter with a name, the same object for each use of
+  the name, so that circuits and gates sharing a parameter can be combined."""
+  if name not in _parameters:
+    _parameters[name] = Parameter(name)
+  return _parameters[name]
+
 def gate_rotation_to_y_basis():
   return UnitaryGate(1/math.sqrt(2) * Operator([
     [1, 1],
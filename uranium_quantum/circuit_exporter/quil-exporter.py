@@ -110,37 +110,27 @@ DEFGATE cu3(%theta, %phi, %lambda):\n\
     0, 0, EXP(i*%phi)*SIN(%theta/2), EXP(i*%lambda + i*%phi)*COS(%theta/2)\n"
 
     def start_circuit_code(self, circuit_name):
-        return (
-            self._define_initial_code_section()
-            + "\n"
-            + self._define_sqrt_not_gate_code_section()
-            + "\n"
-            + self._define_u3_gates_code_section()
-            + "\n"
-            + self._define_u2_gates_code_section()
-            + "\n"
-            + self._define_sqrt_swap_code_section()
-            + "\n"
-            + self._define_crtl_hadamard()
-            + "\n"
-            + self._define_crtl_y()
-            + "\n"
-            + self._define_crtl_sqrt_not()
-            + "\n"
-            + self._define_crtl_rx()
-            + "\n"
-            + self._define_crtl_ry()
-            + "\n"
-            + self._define_crtl_rz()
-            + "\n"
-            + self._define_crtl_u2()
-            + "\n"
-            + self._define_crtl_u3()
-            + "\n"
-        )
+        code = self._define_initial_code_section() + "\n"
+        for define_gate, gate_kinds in [
+            (self._define_sqrt_not_gate_code_section, ["v"]),
+            (self._define_u3_gates_code_section, ["u3"]),
+            (self._define_u2_gates_code_section, ["u2"]),
+            (self._define_sqrt_swap_code_section, ["sqrt-swap"]),
+            (self._define_crtl_hadamard, ["ctrl-hadamard"]),
+            (self._define_crtl_y, ["ctrl-pauli-y"]),
+            (self._define_crtl_sqrt_not, ["ctrl-v"]),
+            (self._define_crtl_rx, ["ctrl-rx-theta"]),
+            (self._define_crtl_ry, ["ctrl-ry-theta"]),
+            (self._define_crtl_rz, ["ctrl-rz-theta"]),
+            (self._define_crtl_u2, ["ctrl-u2"]),
+            (self._define_crtl_u3, ["ctrl-u3"]),
+        ]:
+            if self.uses_gates(*gate_kinds):
+                code += define_gate() + "\n"
+        return code
 
     def end_circuit_code(self):
-        return out
+        return ""
 
     @staticmethod
     def _gate_u3(
@@ -0,0 +1,84 @@
+"""Tests exporting circuits decomposed into a basis of gates."""
+
+import importlib
+
+import numpy as np
+import yaml
+from qiskit.quantum_info import Operator
+
+from uranium_quantum.transpiler.gate_library import FIXED_GATES, PARAMETRIC_GATES
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+PARAMETERS = {
+    "u3": {"theta": 0.3, "phi": 0.2, "lambda": 0.1},
+    "u2": {"phi": 0.2, "lambda": 0.4},
+    "u1": {"lambda": 0.7},
+    "a": {"theta": 0.3, "phi": 0.9},
+    "pauli-x-root": {"root": "1/2^3"},
+    "pauli-y-root": {"root": "1/2^3"},
+    "pauli-z-root": {"root": "1/2^3"},
+    "pauli-x-root-dagger": {"root": "1/2^3"},
+    "pauli-y-root-dagger": {"root": "1/2^3"},
+    "pauli-z-root-dagger": {"root": "1/2^3"},
+    "swap-root": {"root": "1/3"},
+    "swap-root-dagger": {"root": "1/3"},
+    "qft": {},
+    "qft-dagger": {},
+}
+
+
+def catalogue_gates():
+    for name in list(FIXED_GATES) + list(PARAMETRIC_GATES):
+        gate = {"name": name}
+        gate.update(PARAMETERS.get(name, {} if name in FIXED_GATES else {"theta": 0.37}))
+        if name.startswith("qft"):
+            no_targets = 3
+        elif name in FIXED_GATES:
+            no_targets = len(FIXED_GATES[name]) // 2
+        else:
+            no_targets = len(PARAMETRIC_GATES[name](dict(gate, targets=[0]))) // 2
+        gate["targets"] = [2, 0, 1][:no_targets]
+        yield gate
+
+
+def write_circuit(path, circuit_id, name, gates):
+    circuit = {"circuit_id": circuit_id, "circuit_name": name, "steps": [{"index": index, "gates": [gate]} for index, gate in enumerate(gates)]}
+    path.write_text(yaml.safe_dump(circuit))
+    return str(path)
+
+
+def test_catalogue_gates_are_decomposed_exactly(tmp_path):
+    controls = [[], [{"target": 3, "state": "0"}, {"target": 4, "state": "-i"}], [{"target": 4, "state": "+"}]]
+    for index, gate in enumerate(catalogue_gates()):
+        for gate_controls in (controls[0], controls[1 + index % 2]):
+            # the last qubit keeps the size of the register the same
+            files = [write_circuit(tmp_path / "main.yaml", 1, "Main", [dict(gate, controls=gate_controls), {"name": "identity", "targets": [4]}])]
+            expected = Operator(ExportCircuit.get_qiskit_circuit(files, 1)).data
+            for basis in ("u3,cx", "rz,sx,cx"):
+                circuit = ExportCircuit.get_qiskit_circuit(files, 1, basis=basis)
+                assert {instruction.operation.name for instruction in circuit.data} <= {"u", "rz", "sx", "cx", "id"}
+                # the global phase is kept as well
+                assert np.allclose(Operator(circuit).data, expected), (gate, gate_controls, basis)
+
+
+def test_exported_code_uses_basis_gates(tmp_path):
+    files = [
+        write_circuit(tmp_path / "main.yaml", 1, "Main", [
+            {"name": "hadamard", "targets": [0]},
+            {"name": "circuit", "circuit_id": 2, "circuit_power": "1", "targets": [1, 2], "controls": [{"target": 0, "state": "1"}]},
+        ]),
+        write_circuit(tmp_path / "exotic.yaml", 2, "Exotic", [{"name": "ecp", "targets": [0, 1]}, {"name": "t", "targets": [1]}]),
+    ]
+
+    code = ExportCircuit.get_exported_code(files, 1, "qiskit", False, basis="rz,sx,cx")
+
+    assert "ecp(" not in code and "qc_exotic.global_phase += " in code
+    namespace = {}
+    exec(code, namespace)
+    # the sub-circuit is controlled, so its global phase matters
+    assert np.allclose(Operator(namespace["qc_main"]).data, Operator(ExportCircuit.get_qiskit_circuit(files, 1)).data)
+
+    cache_dir = str(tmp_path / "cache")
+    assert ExportCircuit.get_exported_code(files, 1, "qiskit", False, cache_dir=cache_dir, basis="rz,sx,cx") == code
+    assert ExportCircuit.get_exported_code(files, 1, "qiskit", False, cache_dir=cache_dir) == ExportCircuit.get_exported_code(files, 1, "qiskit", False)
@@ -0,0 +1,143 @@
+"""Tests exporting structurally identical sub-circuits once."""
+
+import importlib
+
+from qiskit.quantum_info import Operator
+
+from ..export_cache import MemoryExportCache
+from ..export_profiler import ExportProfiler
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+BELL = """\
+circuit_id: 2
+circuit_name: Bell
+steps:
+  - index: 0
+    gates:
+      - name: hadamard
+        targets: [0]
+      - name: rx-theta
+        targets: [2]
+        theta: 0.5
+  - index: 1
+    gates:
+      - name: pauli-x
+        targets: [1]
+        controls:
+          - target: 0
+            state: '1'
+"""
+
+# the same gates as Bell, written differently
+BELL_COPY = """\
+circuit_id: 3
+circuit_name: Bell Copy
+steps:
+  - index: 0
+    gates:
+      - name: rx-theta
+        theta: 0.50
+        targets: [2]
+      - name: hadamard
+        targets: [0]
+  - index: 1
+    gates: []
+  - index: 2
+    gates:
+      - name: pauli-x
+        targets: [1]
+        controls:
+          - target: 0
+            state: '1'
+"""
+
+# circuits using identical circuits are identical as well
+LAYER = """\
+circuit_id: 4
+circuit_name: Layer
+steps:
+  - index: 0
+    gates:
+      - name: circuit
+        circuit_id: 2
+        circuit_power: '1'
+        targets: [0, 1, 2]
+"""
+
+LAYER_COPY = LAYER.replace("circuit_id: 4", "circuit_id: 5").replace("Layer", "Layer Copy").replace("circuit_id: 2", "circuit_id: 3")
+
+MAIN = """\
+circuit_id: 1
+circuit_name: Main
+steps:
+  - index: 0
+    gates:
+      - name: circuit
+        circuit_id: 4
+        circuit_power: '1'
+        targets: [0, 1, 2]
+  - index: 1
+    gates:
+      - name: circuit
+        circuit_id: 5
+        circuit_power: '1'
+        targets: [0, 1, 2]
+  - index: 2
+    gates:
+      - name: circuit
+        circuit_id: 3
+        circuit_power: '-1'
+        targets: [0, 1, 2]
+"""
+
+
+def write_files(tmp_path):
+    files = []
+    for name, content in [("main", MAIN), ("bell", BELL), ("bell_copy", BELL_COPY), ("layer", LAYER), ("layer_copy", LAYER_COPY)]:
+        files.append(str(tmp_path / f"{name}.yaml"))
+        (tmp_path / f"{name}.yaml").write_text(content)
+    return files
+
+
+def test_identical_circuits_are_exported_once(tmp_path):
+    files = write_files(tmp_path)
+    profiler = ExportProfiler()
+
+    code = ExportCircuit.get_exported_code(files, 1, "qiskit", False, profiler)
+
+    # one of bell and layer, and main
+    assert code.count(" = QuantumCircuit(") == 3
+    assert ("qc_bell_copy = qc_bell\n" in code) != ("qc_bell = qc_bell_copy\n" in code)
+    assert ("qc_layer_copy = qc_layer\n" in code) != ("qc_layer = qc_layer_copy\n" in code)
+    assert profiler.report()["counters"]["circuit aliases"] == 2
+
+    namespace = {}
+    exec(code, namespace)
+    built = ExportCircuit.get_qiskit_circuit(files, 1)
+    assert Operator(namespace["qc_main"]).equiv(Operator(built))
+
+
+def test_different_circuits_are_not_aliased(tmp_path):
+    files = write_files(tmp_path)
+    (tmp_path / "bell_copy.yaml").write_text(BELL_COPY.replace("theta: 0.50", "theta: 0.25"))
+
+    code = ExportCircuit.get_exported_code(files, 1, "qiskit", False)
+
+    assert code.count(" = QuantumCircuit(") == 5
+
+
+def test_alias_changes_only_invalidate_the_circuits_using_them(tmp_path):
+    files = write_files(tmp_path)
+    cache = MemoryExportCache()
+    ExportCircuit.get_exported_code(files, 1, "qiskit", False, cache=cache)
+    # bell and layer are no longer copies, the other circuits are unchanged
+    (tmp_path / "bell.yaml").write_text(BELL.replace("theta: 0.5", "theta: 0.25"))
+    profiler = ExportProfiler()
+
+    code = ExportCircuit.get_exported_code(files, 1, "qiskit", False, profiler, cache=cache)
+
+    counters = profiler.report()["counters"]
+    assert counters["circuit aliases"] == 0
+    assert counters["cache hits"] == 2 and counters["cache misses"] == 3
+    assert code == ExportCircuit.get_exported_code(files, 1, "qiskit", False)
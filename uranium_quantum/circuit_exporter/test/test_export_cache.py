@@ -0,0 +1,75 @@
+"""Tests re-exporting circuits with a cache of generated code."""
+
+import importlib
+
+from ..export_profiler import ExportProfiler
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+
+def circuit_yaml(circuit_id, circuit_name, gates):
+    text = f"circuit_id: {circuit_id}\ncircuit_name: {circuit_name}\nsteps:\n"
+    for index, gate in enumerate(gates):
+        text += f"  - index: {index}\n    gates:\n      - {gate}\n"
+    return text
+
+
+def write_library(directory, leaf_gate="name: hadamard\n        targets: [0]"):
+    files = {
+        "leaf": circuit_yaml(3, "Leaf", [leaf_gate]),
+        "middle": circuit_yaml(2, "Middle", ["name: circuit\n        circuit_id: 3\n        circuit_power: '1'\n        targets: [0]"]),
+        "other": circuit_yaml(4, "Other", ["name: pauli-x\n        targets: [0]"]),
+        "main": circuit_yaml(1, "Main", [
+            "name: circuit\n        circuit_id: 2\n        circuit_power: '1'\n        targets: [0]",
+            "name: circuit\n        circuit_id: 4\n        circuit_power: '1'\n        targets: [1]",
+        ]),
+    }
+    paths = []
+    for name, text in files.items():
+        path = directory / f"{name}.yaml"
+        path.write_text(text)
+        paths.append(str(path))
+    return paths
+
+
+def export(paths, cache_dir):
+    profiler = ExportProfiler()
+    code = ExportCircuit.get_exported_code(paths, 1, "qiskit", False, profiler, cache_dir)
+    return code, profiler.report()["counters"]
+
+
+def test_cached_export_is_unchanged(tmp_path):
+    paths = write_library(tmp_path)
+    plain = ExportCircuit.get_exported_code(paths, 1, "qiskit", False)
+
+    first, first_counters = export(paths, str(tmp_path / "cache"))
+    second, second_counters = export(paths, str(tmp_path / "cache"))
+
+    assert first == plain
+    assert second == plain
+    assert first_counters["cache misses"] == 4
+    assert second_counters["cache hits"] == 4
+    assert "gates.hadamard" not in second_counters
+
+
+def test_only_changed_circuits_are_regenerated(tmp_path):
+    paths = write_library(tmp_path)
+    export(paths, str(tmp_path / "cache"))
+
+    paths = write_library(tmp_path, leaf_gate="name: pauli-z\n        targets: [0]")
+    code, counters = export(paths, str(tmp_path / "cache"))
+
+    # the leaf and the circuits using it are regenerated, the unrelated circuit is not
+    assert counters["cache misses"] == 3
+    assert counters["cache hits"] == 1
+    assert code == ExportCircuit.get_exported_code(paths, 1, "qiskit", False)
+
+
+def test_unused_circuits_are_not_exported(tmp_path):
+    paths = write_library(tmp_path)
+    unused = tmp_path / "unused.yaml"
+    unused.write_text(circuit_yaml(5, "Unused", ["name: pauli-y\n        targets: [0]"]))
+
+    code = ExportCircuit.get_exported_code(paths + [str(unused)], 1, "qiskit", False)
+
+    assert "unused" not in code
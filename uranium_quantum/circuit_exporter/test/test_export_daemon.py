@@ -0,0 +1,117 @@
+"""Tests the local export daemon."""
+
+import asyncio
+import http.client
+import importlib
+import os
+import stat
+import threading
+
+import pytest
+
+from .test_export_cache import write_library
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+ExportDaemon = importlib.import_module("uranium_quantum.circuit_exporter.export-daemon")
+
+
+def run_with_daemon(scenario, daemon=None, **start_options):
+    """Start a daemon, run a blocking client scenario in a thread and
+    return its result."""
+    daemon = daemon or ExportDaemon.ExportDaemon()
+
+    async def run():
+        servers = await daemon.start(**start_options)
+        try:
+            port = servers[-1].sockets[0].getsockname()[1] if "port" in start_options else None
+            return await asyncio.get_running_loop().run_in_executor(None, scenario, port)
+        finally:
+            await daemon.close()
+
+    return asyncio.run(run())
+
+
+def test_export_over_unix_socket(tmp_path):
+    paths = write_library(tmp_path)
+    socket_path = str(tmp_path / "daemon.sock")
+    request = {"files": paths, "circuit_id": 1, "export_format": "qiskit"}
+
+    def scenario(_):
+        connection = ExportDaemon.UnixHTTPConnection(socket_path, timeout=10)
+        # the connection is kept open between requests
+        responses = [ExportDaemon.send_request(connection, "POST", "/export", request) for _ in range(3)]
+        responses.append(ExportDaemon.send_request(connection, "GET", "/metrics"))
+        connection.close()
+        return responses
+
+    def scenario_and_mode(port):
+        mode = os.stat(socket_path).st_mode
+        return scenario(port) + [mode]
+
+    *exports, (status, metrics), mode = run_with_daemon(scenario_and_mode, socket_path=socket_path)
+
+    assert stat.S_ISSOCK(mode) and mode & 0o077 == 0
+
+    expected = ExportCircuit.get_exported_code(paths, 1, "qiskit", False)
+    assert [(status, response["code"]) for status, response in exports] == [(200, expected)] * 3
+    assert status == 200
+    assert (metrics["requests"], metrics["exports"], metrics["failures"]) == (4, 3, 0)
+    assert metrics["formats"] == {"qiskit": 3}
+    # generated code is reused after the first export
+    assert metrics["counters"]["cache misses"] == 4
+    assert metrics["counters"]["cache hits"] == 8
+    assert metrics["latency_seconds"]["max"] > 0
+
+
+def test_export_over_http(tmp_path):
+    paths = write_library(tmp_path)
+
+    def scenario(port):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+        responses = [
+            ExportDaemon.send_request(connection, "POST", "/export", {"files": paths, "circuit_id": 1, "export_format": "qiskit", "steps": "1:", "profile": True}, "secret"),
+            ExportDaemon.send_request(connection, "POST", "/export", {"files": paths, "export_format": "qiskit"}, "secret"),
+            ExportDaemon.send_request(connection, "POST", "/export", {"files": paths, "circuit_id": 1, "export_format": "fortran"}, "secret"),
+            ExportDaemon.send_request(connection, "GET", "/export", token="secret"),
+            ExportDaemon.send_request(connection, "GET", "/unknown", token="secret"),
+        ]
+        for token in (None, "guess"):
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            responses.append(ExportDaemon.send_request(connection, "POST", "/export", {"files": paths, "circuit_id": 1, "export_format": "qiskit"}, token))
+        connection.close()
+        return responses
+
+    (status, response), *errors = run_with_daemon(scenario, ExportDaemon.ExportDaemon(token="secret"), port=0)
+
+    assert status == 200
+    assert response["code"] == ExportCircuit.get_exported_code(paths, 1, "qiskit", False, steps=(1, None))
+    assert "export" in response["profile"]["spans"]
+    assert [status for status, _ in errors] == [400, 500, 405, 404, 401, 401]
+    assert errors[0][1]["error"] == "Missing request field 'circuit_id'."
+    assert errors[1][1]["error"] == "Export format fortran is not supported."
+
+
+def test_requests_beyond_the_limit_are_rejected(tmp_path):
+    paths = write_library(tmp_path)
+    daemon = ExportDaemon.ExportDaemon(max_concurrency=1, max_pending=0)
+    release = threading.Event()
+    export = daemon.export
+    daemon.export = lambda request: release.wait(10) and export(request)
+
+    async def run():
+        first = asyncio.ensure_future(daemon.handle_export({"files": paths, "circuit_id": 1, "export_format": "qiskit"}))
+        await asyncio.sleep(0)
+        with pytest.raises(ExportDaemon.RequestError) as rejection:
+            await daemon.handle_export({"files": paths, "circuit_id": 1, "export_format": "qiskit"})
+        release.set()
+        await first
+        await daemon.close()
+        return rejection.value.status
+
+    assert asyncio.run(run()) == 503
+    assert (daemon.metrics["exports"], daemon.metrics["rejected"]) == (1, 1)
+
+
+def test_ports_require_a_token():
+    with pytest.raises(Exception, match="token"):
+        asyncio.run(ExportDaemon.ExportDaemon().start(port=0))
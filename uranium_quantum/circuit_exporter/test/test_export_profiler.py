@@ -0,0 +1,69 @@
+"""Tests the instrumentation collected while exporting circuits."""
+
+import importlib
+import json
+
+from ..export_profiler import ExportProfiler
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+CIRCUIT = """\
+circuit_id: 1
+circuit_name: Main Circuit
+steps:
+  - index: 0
+    gates:
+      - name: hadamard
+        targets:
+          - 0
+      - name: rx-theta
+        targets:
+          - 1
+        theta: 0.5
+  - index: 1
+    gates:
+      - name: hadamard
+        targets:
+          - 1
+"""
+
+
+def test_spans_and_counters_are_accumulated():
+    profiler = ExportProfiler()
+    for _ in range(3):
+        with profiler.span("stage"):
+            profiler.count("items", 2)
+    report = profiler.report()
+    assert report["spans"]["stage"]["calls"] == 3
+    assert report["spans"]["stage"]["seconds"] >= 0
+    assert report["counters"]["items"] == 6
+
+
+def test_export_report(tmp_path):
+    circuit_file = tmp_path / "main.yaml"
+    circuit_file.write_text(CIRCUIT)
+    profiler = ExportProfiler(cprofile=True)
+
+    code = ExportCircuit.get_exported_code([str(circuit_file)], 1, "qiskit", False, profiler)
+
+    report = profiler.report()
+    for stage in ["export", "yaml parsing", "get_number_qubits", "get_circuit_descendants", "process_step", "main circuit"]:
+        assert stage in report["spans"], f"Missing span {stage}."
+    assert report["counters"]["gates.hadamard"] == 2
+    assert report["counters"]["gates.rx-theta"] == 1
+    assert report["counters"]["bytes emitted"] == len(code)
+
+    profiler.write_report(tmp_path / "report.json")
+    assert json.loads((tmp_path / "report.json").read_text()) == report
+    profiler.dump_cprofile(str(tmp_path / "export.prof"))
+    assert (tmp_path / "export.prof").stat().st_size > 0
+
+
+def test_export_without_profiler_is_unchanged(tmp_path):
+    circuit_file = tmp_path / "main.yaml"
+    circuit_file.write_text(CIRCUIT)
+
+    plain = ExportCircuit.get_exported_code([str(circuit_file)], 1, "qiskit", True)
+    profiled = ExportCircuit.get_exported_code([str(circuit_file)], 1, "qiskit", True, ExportProfiler())
+
+    assert plain == profiled
@@ -0,0 +1,53 @@
+"""Tests that exporters only define the gates a circuit uses."""
+
+import importlib
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+CirqExporter = importlib.import_module("uranium_quantum.circuit_exporter.cirq-exporter")
+QuilExporter = importlib.import_module("uranium_quantum.circuit_exporter.quil-exporter")
+PyquilExporter = importlib.import_module("uranium_quantum.circuit_exporter.pyquil-exporter")
+
+CIRCUIT = {
+    "steps": [
+        {"index": 0, "gates": [{"name": "u3", "targets": [0], "theta": 0.1, "phi": 0.2, "lambda": 0.3}]},
+        {"index": 1, "gates": [{"name": "rx-theta", "targets": [1], "theta": 0.1, "controls": [{"target": 0, "state": "1"}]}]},
+        {"index": 2, "gates": [{"name": "aggregate", "gates": [{"name": "pauli-x", "targets": [0]}, {"name": "v", "targets": [1]}]}]},
+    ]
+}
+
+
+def start_circuit_code(exporter, used_gates):
+    exporter.set_number_qubits(2)
+    exporter.set_number_bits(0)
+    exporter.set_used_gates(used_gates)
+    return exporter.start_circuit_code("main")
+
+
+def test_used_gates():
+    assert ExportCircuit.get_used_gates(CIRCUIT) == {"u3", "ctrl-rx-theta", "aggregate", "pauli-x", "v"}
+
+
+def test_cirq_defines_only_used_gates():
+    code = start_circuit_code(CirqExporter.Exporter(), ExportCircuit.get_used_gates(CIRCUIT))
+    assert "def u3(" in code
+    for gate in ["u2", "u1", "cu1", "cu2", "cu3"]:
+        assert f"def {gate}(" not in code
+
+
+def test_quil_defines_only_used_gates():
+    code = start_circuit_code(QuilExporter.Exporter(), ExportCircuit.get_used_gates(CIRCUIT))
+    assert code.count("DEFGATE") == 3
+    for gate in ["srn:", "u3(", "crx("]:
+        assert f"DEFGATE {gate}" in code
+
+
+def test_pyquil_defines_only_used_gates():
+    code = start_circuit_code(PyquilExporter.Exporter(), ExportCircuit.get_used_gates(CIRCUIT))
+    assert code.count("DefGate(") == 3
+    for gate in ["srn", "u3", "crx"]:
+        assert f"DefGate('{gate}'" in code
+
+
+def test_all_gates_are_defined_when_used_gates_are_unknown():
+    code = start_circuit_code(QuilExporter.Exporter(), None)
+    assert code.count("DEFGATE") == 12
@@ -0,0 +1,120 @@
+"""Tests exporting circuits with symbolic parameters."""
+
+import importlib
+
+import pytest
+import yaml
+from qiskit.quantum_info import Operator
+
+from uranium_quantum.circuit_composer.circuit_composer import LAYER_GATES
+
+BaseExporter = importlib.import_module("uranium_quantum.circuit_exporter.base-exporter")
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+VALUES = {"gamma": 0.7, "beta": -0.4, "delta": 1.1}
+
+
+def parametric_circuit(bind):
+    """A circuit with every gate taking angles, with and without a control,
+    angles given as parameters or bound to their values."""
+    numeric_gates = ("swap-theta", "xy", "givens", "a")
+    gates = []
+    for name, (no_targets, parameters) in LAYER_GATES.items():
+        if "root" in parameters or not parameters or name in numeric_gates:
+            continue
+        for controls in ([], [{"target": 2, "state": "1"}], [{"target": 2, "state": "-"}]):
+            gate = {"name": name, "targets": list(range(no_targets)), "controls": controls}
+            for parameter, parameter_name in zip(parameters, VALUES):
+                gate[parameter] = VALUES[parameter_name] if bind else parameter_name
+            gates.append(gate)
+    aggregate = {"name": "u3", "targets": [0], "theta": "gamma", "phi": 0.1, "lambda": "beta"}
+    if bind:
+        aggregate["theta"], aggregate["lambda"] = VALUES["gamma"], VALUES["beta"]
+    gates.append({"name": "aggregate", "controls": [{"target": 2, "state": "0"}], "gates": [aggregate]})
+    return {"circuit_id": 1, "circuit_name": "main", "steps": [{"index": index, "gates": [gate]} for index, gate in enumerate(gates)]}
+
+
+def write_circuit(tmp_path, name, yaml_data):
+    path = tmp_path / f"{name}.yaml"
+    path.write_text(yaml.safe_dump(yaml_data))
+    return str(path)
+
+
+def bound_operator(circuit):
+    values = {parameter: VALUES[parameter.name] for parameter in circuit.parameters}
+    return Operator(circuit.assign_parameters(values))
+
+
+def test_qiskit_export_binds_parameters(tmp_path):
+    symbolic = write_circuit(tmp_path, "symbolic", parametric_circuit(False))
+    numeric = write_circuit(tmp_path, "numeric", parametric_circuit(True))
+
+    code = ExportCircuit.get_exported_code([symbolic], 1, "qiskit", False)
+    assert "parameter('gamma')" in code
+    namespace = {}
+    exec(code, namespace)
+    assert sorted(parameter.name for parameter in namespace["qc_main"].parameters) == ["beta", "delta", "gamma"]
+
+    expected = Operator(ExportCircuit.get_qiskit_circuit([numeric], 1))
+    assert bound_operator(namespace["qc_main"]).equiv(expected)
+    assert bound_operator(ExportCircuit.get_qiskit_circuit([symbolic], 1)).equiv(expected)
+
+
+def test_sub_circuits_share_parameters(tmp_path):
+    block = {"circuit_id": 2, "circuit_name": "block", "steps": [{"index": 0, "gates": [{"name": "zz", "targets": [0, 1], "theta": "gamma"}]}]}
+    main = {"circuit_id": 1, "circuit_name": "main", "steps": [
+        {"index": 0, "gates": [{"name": "rx-theta", "targets": [0], "theta": "gamma"}]},
+        {"index": 1, "gates": [{"name": "circuit", "circuit_id": 2, "circuit_power": "1", "targets": [0, 1]}]},
+    ]}
+    files = [write_circuit(tmp_path, "main", main), write_circuit(tmp_path, "block", block)]
+    namespace = {}
+    exec(ExportCircuit.get_exported_code(files, 1, "qiskit", False), namespace)
+    assert [parameter.name for parameter in namespace["qc_main"].parameters] == ["gamma"]
+    assert [parameter.name for parameter in ExportCircuit.get_qiskit_circuit(files, 1).parameters] == ["gamma"]
+
+
+def test_matrix_gates_need_numbers(tmp_path):
+    main = {"circuit_id": 1, "circuit_name": "main", "steps": [{"index": 0, "gates": [{"name": "xy", "targets": [0, 1], "theta": "gamma"}]}]}
+    with pytest.raises(BaseExporter.ExportException):
+        ExportCircuit.get_exported_code([write_circuit(tmp_path, "main", main)], 1, "qiskit", False)
+
+
+def test_parameters_are_listed():
+    assert ExportCircuit.get_used_parameters(parametric_circuit(False)) == ["beta", "delta", "gamma"]
+    assert ExportCircuit.get_used_parameters(parametric_circuit(True)) == []
+
+
+def test_names_must_be_identifiers(tmp_path):
+    injection = "x'); import os; ('"
+    gate = {"name": "rx-theta", "targets": [0], "theta": "gamma"}
+    for circuit_name, parameter in [(injection, "gamma"), ("main", injection), ("main", "lambda")]:
+        main = {"circuit_id": 1, "circuit_name": circuit_name, "steps": [{"index": 0, "gates": [dict(gate, theta=parameter)]}]}
+        for export_format in ("qiskit", "openqasm"):
+            with pytest.raises(BaseExporter.ExportException, match="not a valid identifier"):
+                ExportCircuit.get_exported_code([write_circuit(tmp_path, "main", main)], 1, export_format, False)
+
+
+def test_values_written_as_they_are_are_checked(tmp_path):
+    payload = f"1/2) and open({str(tmp_path / 'pwned')!r}, 'w').write('x') and dict(a=2"
+    bell = {"circuit_id": 2, "circuit_name": "bell", "steps": [{"index": 0, "gates": [{"name": "hadamard", "targets": [0]}]}]}
+    for gate, message in [
+        ({"name": "pauli-x-root", "targets": [0], "root": payload}, "root"),
+        ({"name": "pauli-x-root", "targets": [0], "gates": [{"name": "pauli-y-root", "targets": [0], "root": payload}]}, "root"),
+        ({"name": "measure-z", "targets": [0], "bit": "0) or print(1"}, "index"),
+        ({"name": "hadamard", "targets": ["0]); print(1); (qr_main[0"]}, "index"),
+        ({"name": "pauli-x", "targets": [0], "controls": [{"target": "1, 2", "state": "1"}]}, "index"),
+        ({"name": "circuit", "targets": [0], "circuit_id": 2, "circuit_power": "1) or print(1"}, "power"),
+    ]:
+        main = {"circuit_id": 1, "circuit_name": "main", "steps": [{"index": 0, "gates": [gate]}]}
+        files = [write_circuit(tmp_path, "main", main), write_circuit(tmp_path, "bell", bell)]
+        with pytest.raises(BaseExporter.ExportException, match=message):
+            ExportCircuit.get_exported_code(files, 1, "openqasm", False)
+    assert not (tmp_path / "pwned").exists()
+
+    main = {"circuit_id": 1, "circuit_name": "main", "steps": [{"index": 0, "gates": [
+        {"name": "pauli-x-root", "targets": [0], "root": "1/2^3"},
+        {"name": "pauli-y-root", "targets": [1], "root": "1/7.0"},
+        {"name": "circuit", "targets": [2], "circuit_id": 2, "circuit_power": "-2^2"},
+    ]}]}
+    files = [write_circuit(tmp_path, "main", main), write_circuit(tmp_path, "bell", bell)]
+    assert "OPENQASM" in ExportCircuit.get_exported_code(files, 1, "openqasm", False)
@@ -0,0 +1,90 @@
+"""Tests building qiskit circuits in process."""
+
+import importlib
+
+import numpy as np
+from qiskit.quantum_info import Operator
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+SUB_CIRCUIT = """\
+circuit_id: 2
+circuit_name: Bell
+steps:
+  - index: 0
+    gates:
+      - name: hadamard
+        targets: [0]
+  - index: 1
+    gates:
+      - name: pauli-x
+        targets: [1]
+        controls:
+          - target: 0
+            state: '1'
+"""
+
+MAIN_CIRCUIT = """\
+circuit_id: 1
+circuit_name: Main Circuit
+steps:
+  - index: 0
+    gates:
+      - name: circuit
+        circuit_id: 2
+        circuit_power: '1'
+        targets: [0, 1]
+  - index: 1
+    gates:
+      - name: pauli-y-root
+        targets: [2]
+        root: 1/2^3
+      - name: circuit
+        circuit_id: 2
+        circuit_power: '-1'
+        targets: [0, 1]
+  - index: 2
+    gates:
+      - name: rx-theta
+        targets: [2]
+        theta: 0.4
+        controls:
+          - target: 0
+            state: '-i'
+          - target: 1
+            state: '0'
+  - index: 3
+    gates:
+      - name: swap-theta
+        targets: [1, 2]
+        theta: 0.7
+        controls:
+          - target: 0
+            state: '+'
+"""
+
+
+def write_circuits(tmp_path):
+    (tmp_path / "main.yaml").write_text(MAIN_CIRCUIT)
+    (tmp_path / "sub.yaml").write_text(SUB_CIRCUIT)
+    return [str(tmp_path / "main.yaml"), str(tmp_path / "sub.yaml")]
+
+
+def test_built_circuit_matches_exported_code(tmp_path):
+    files = write_circuits(tmp_path)
+
+    quantum_circuit = ExportCircuit.get_qiskit_circuit(files, 1)
+
+    namespace = {}
+    exec(ExportCircuit.get_exported_code(files, 1, "qiskit", False), namespace)
+    assert np.allclose(Operator(quantum_circuit).data, Operator(namespace["qc_main"]).data)
+
+
+def test_sub_circuits_are_converted_to_gates_once(tmp_path):
+    files = write_circuits(tmp_path)
+
+    quantum_circuit = ExportCircuit.get_qiskit_circuit(files, 1)
+
+    circuit_gates = [gate for gate, _, _ in quantum_circuit.data if gate.label == "bell"]
+    assert len(circuit_gates) == 1
+    assert quantum_circuit.data[0][0] is circuit_gates[0]
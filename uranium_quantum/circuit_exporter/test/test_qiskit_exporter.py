@@ -0,0 +1,122 @@
+"""Tests the code generated by the Qiskit exporter."""
+
+import importlib
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+CIRCUIT = """\
+circuit_id: 1
+circuit_name: Main Circuit
+steps:
+  - index: 0
+    gates:
+      - name: pauli-x-root
+        targets: [0]
+        root: 1/2^2
+  - index: 1
+    gates:
+      - name: pauli-x-root
+        targets: [1]
+        root: 1/2^2
+  - index: 2
+    gates:
+      - name: pauli-x
+        targets: [1]
+        controls:
+          - target: 0
+            state: '0'
+  - index: 3
+    gates:
+      - name: hadamard
+        targets: [2]
+        controls:
+          - target: 0
+            state: '1'
+          - target: 1
+            state: '+i'
+  - index: 4
+    gates:
+      - name: hadamard
+        targets: [2]
+        controls:
+          - target: 0
+            state: '1'
+          - target: 1
+            state: '+i'
+"""
+
+
+def export(tmp_path):
+    circuit_file = tmp_path / "main.yaml"
+    circuit_file.write_text(CIRCUIT)
+    return ExportCircuit.get_exported_code([str(circuit_file)], 1, "qiskit", False)
+
+
+def test_gate_objects_are_defined_once(tmp_path):
+    code = export(tmp_path)
+
+    assert code.count("pauli_x_root((2**2), label='pauli-x-root')") == 1
+    assert code.count("HGate().control(num_ctrl_qubits=2") == 1
+    assert code.count("gate_rotation_to_y_basis()") == 1
+    assert code.count("qc_main.append(gate_main_0, ") == 2
+    # constants are defined before the steps using them
+    assert code.index("gate_main_0 = ") < code.index("qc_main.append(gate_main_0, ")
+
+
+def test_single_control_gates_use_native_methods(tmp_path):
+    code = export(tmp_path)
+
+    assert "qc_main.cx(qr_main[0], qr_main[1], ctrl_state='0')" in code
+    assert "XGate()" not in code
+
+
+BASIS_CIRCUIT = """\
+circuit_id: 1
+circuit_name: Main Circuit
+steps:
+  - index: 0
+    gates:
+      - name: pauli-x
+        targets: [1]
+        controls:
+          - target: 0
+            state: '+i'
+  - index: 1
+    gates:
+      - name: pauli-z
+        targets: [2]
+        controls:
+          - target: 0
+            state: '-i'
+  - index: 2
+    gates:
+      - name: hadamard
+        targets: [1]
+        controls:
+          - target: 0
+            state: '+'
+  - index: 3
+    gates:
+      - name: t
+        targets: [0]
+"""
+
+
+def test_control_basis_rotations_are_not_repeated(tmp_path):
+    circuit_file = tmp_path / "main.yaml"
+    circuit_file.write_text(BASIS_CIRCUIT)
+
+    code = ExportCircuit.get_exported_code([str(circuit_file)], 1, "qiskit", False)
+
+    steps = code[code.index("qc_main.append"):]
+    lines = [line for line in steps.splitlines() if line]
+    assert lines == [
+        "qc_main.append(gate_main_0, [qr_main[0]])",
+        "qc_main.cx(qr_main[0], qr_main[1], ctrl_state='0')",
+        "qc_main.cz(qr_main[0], qr_main[2], ctrl_state='1')",
+        "qc_main.append(gate_main_1, [qr_main[0]])",
+        "qc_main.h(qr_main[0])",
+        "qc_main.ch(qr_main[0], qr_main[1], ctrl_state='0')",
+        "qc_main.h(qr_main[0])",
+        "qc_main.t(qr_main[0])",
+    ]
@@ -0,0 +1,78 @@
+"""Tests exporting a range of steps of the main circuit."""
+
+import importlib
+
+from qiskit import QuantumCircuit as QiskitCircuit
+from qiskit.quantum_info import Operator
+
+from uranium_quantum.circuit_composer.circuit_composer import QuantumCircuit
+
+from ..export_profiler import ExportProfiler
+
+ExportCircuit = importlib.import_module("uranium_quantum.circuit_exporter.export-circuit")
+
+
+def write_circuits(tmp_path):
+    bell = QuantumCircuit(2, circuit_id=2, circuit_name="Bell")
+    bell.gate_hadamard([], [0]).increment_step().gate_pauli_x([], [1])
+    main = QuantumCircuit(4, circuit_id=1, circuit_name="Main")
+    main.append_block(bell, [0, 1])
+    for step in range(1, 20):
+        main.increment_step().gate_rx_theta([], [step % 3], 0.1 * step)
+    main.increment_step().gate_t([], [3])
+    return main.export(str(tmp_path / "main.yaml"))
+
+
+def test_export_step_range(tmp_path):
+    files = write_circuits(tmp_path)
+    profiler = ExportProfiler()
+
+    code = ExportCircuit.get_exported_code(files, 1, "qiskit", True, profiler, steps=(5, 8))
+
+    assert "New circuit step no: 5 " in code and "New circuit step no: 7 " in code
+    assert "New circuit step no: 4 " not in code and "New circuit step no: 8 " not in code
+    # circuits only used outside of the range are not exported
+    assert "qc_bell" not in code
+    # the register has the size of the whole circuit
+    assert "qr_main = QuantumRegister(4)" in code
+    assert profiler.report()["spans"]["step index"]["calls"] == 1
+
+    expected = QuantumCircuit(4, circuit_id=1, circuit_name="Main")
+    for step in range(5, 8):
+        if step > 5:
+            expected.increment_step()
+        expected.gate_rx_theta([], [step % 3], 0.1 * step)
+    expected_files = expected.export(str(tmp_path / "expected.yaml"))
+    namespace = {}
+    exec(code, namespace)
+    # the expected circuit does not use the last qubit
+    expected_circuit = QiskitCircuit(4).compose(ExportCircuit.get_qiskit_circuit(expected_files, 1), qubits=[0, 1, 2])
+    assert Operator(namespace["qc_main"]).equiv(Operator(expected_circuit))
+    assert Operator(ExportCircuit.get_qiskit_circuit(files, 1, steps=(5, 8))).equiv(Operator(namespace["qc_main"]))
+
+
+def test_open_step_ranges(tmp_path):
+    files = write_circuits(tmp_path)
+
+    assert ExportCircuit.parse_steps("18:") == (18, None)
+    code = ExportCircuit.get_exported_code(files, 1, "qiskit", True, steps=ExportCircuit.parse_steps(":1"))
+
+    assert "qc_bell = QuantumCircuit(" in code
+    main_code = code[code.index("qr_main = "):]
+    assert "New circuit step no: 0 " in main_code and "New circuit step no: 1 " not in main_code
+    assert ExportCircuit.get_exported_code(files, 1, "qiskit", True, steps=(None, None)) == ExportCircuit.get_exported_code(files, 1, "qiskit", True)
+
+
+def test_only_the_main_circuit_is_indexed(tmp_path):
+    files = write_circuits(tmp_path)
+    # a circuit used as a gate needs no steps
+    empty = tmp_path / "empty.yaml"
+    empty.write_text("circuit_id: 3\ncircuit_name: Empty\n")
+
+    code = ExportCircuit.get_exported_code(files + [str(empty)], 1, "qiskit", True, steps=(5, 8))
+    assert "New circuit step no: 5 " in code
+    assert ExportCircuit.get_qiskit_circuit(files + [str(empty)], 1, steps=(5, 8)).num_qubits == 4
+
+    broken = tmp_path / "broken.yaml"
+    broken.write_text("circuit_id: 3\nsteps: [\n")
+    assert "while parsing" in ExportCircuit.get_exported_code(files + [str(broken)], 1, "qiskit", True, steps=(5, 8))
@@ -0,0 +1,9 @@
+"""This module simulates quantum circuits in yaml format."""
+
+__all__ = ["MPSSimulator", "PauliSum", "StatevectorSimulator", "TableauSimulator", "adjoint_gradient", "is_clifford_circuit"]
+
+from uranium_quantum.simulator.clifford import TableauSimulator, is_clifford_circuit
+from uranium_quantum.simulator.gradients import adjoint_gradient
+from uranium_quantum.simulator.mps import MPSSimulator
+from uranium_quantum.simulator.observables import PauliSum
+from uranium_quantum.simulator.statevector import StatevectorSimulator
@@ -0,0 +1,251 @@
+"""Stabilizer simulation of Clifford circuits (Aaronson and Gottesman, 2004).
+
+A state of n qubits is kept as a tableau of n destabilizers and n
+stabilizers, Pauli operators whose X and Z parts are packed as bits in
+unsigned 64 bit words. A gate costs O(n) and a measurement O(n^2 / 64) word
+operations, so circuits of thousands of qubits are simulated in polynomial
+time where a statevector would need 2^n amplitudes.
+
+Gates are recognized as Clifford gates from their unitaries: a gate is a
+Clifford gate when it maps Pauli operators to Pauli operators. This finds the
+Hadamard, S, Pauli, swap and iswap gates, controlled Pauli gates and also
+rotations by multiples of pi/2."""
+
+import collections
+import functools
+import itertools
+
+import numpy as np
+
+from uranium_quantum.transpiler.basis_transpiler import gate_key
+from .gates import MEASUREMENTS, SKIPPED_GATES, circuit_gates, count_qubits, gate_qubits, gate_unitary
+
+PAULIS = {
+    (0, 0): np.eye(2, dtype=complex),
+    (1, 0): np.array([[0, 1], [1, 0]], dtype=complex),
+    (0, 1): np.array([[1, 0], [0, -1]], dtype=complex),
+    (1, 1): np.array([[0, -1j], [1j, 0]], dtype=complex),
+}
+# Clifford gates are only looked for among gates on at most two qubits
+MAX_CLIFFORD_QUBITS = 2
+WORD_BITS = 64
+
+
+def pauli_matrix(bits):
+    """Get the matrix of a Pauli operator given as (x, z) bits per local qubit,
+    the first qubit being the least significant."""
+    matrix = np.ones((1, 1), dtype=complex)
+    for x, z in bits:
+        matrix = np.kron(PAULIS[(x, z)], matrix)
+    return matrix
+
+
+@functools.lru_cache(maxsize=4096)
+def clifford_table(key):
+    """Get how a gate identified by gate_key conjugates Pauli operators: for
+    each local Pauli, indexed by the bits x0 + 2 z0 + 4 x1 + 8 z1, the bits
+    of its image and whether the image has a minus sign. None when the gate
+    is not a Clifford gate."""
+    name, no_targets, control_states = key[:3]
+    no_qubits = no_targets + len(control_states)
+    if name in SKIPPED_GATES + MEASUREMENTS or not 1 <= no_qubits <= MAX_CLIFFORD_QUBITS:
+        return None
+    gate = {"name": name, "targets": list(range(no_targets))}
+    gate["controls"] = [{"target": no_targets + index, "state": state} for index, state in enumerate(control_states)]
+    gate.update((parameter, value) for parameter, value in zip(("theta", "phi", "lambda", "root"), key[3:]) if value is not None)
+    try:
+        unitary = gate_unitary(gate)
+    except Exception:
+        return None
+
+    all_bits = list(itertools.product(*[[(0, 0), (1, 0), (0, 1), (1, 1)]] * no_qubits))
+    table = np.zeros((4 ** no_qubits, 2 * no_qubits + 1), dtype=np.uint64)
+    for bits in all_bits:
+        image = unitary @ pauli_matrix(bits) @ unitary.conj().T
+        for image_bits in all_bits:
+            overlap = np.trace(pauli_matrix(image_bits).conj().T @ image) / 2 ** no_qubits
+            if abs(abs(overlap) - 1) < 1e-9:
+                break
+        else:
+            return None
+        if abs(overlap.imag) > 1e-9:
+            return None
+        index = sum((x + 2 * z) << (2 * qubit) for qubit, (x, z) in enumerate(bits))
+        table[index] = [bit for x, z in image_bits for bit in (x, z)] + [overlap.real < 0]
+    return table
+
+
+def is_clifford_gate(gate):
+    """Check whether a gate can be simulated by the tableau simulator."""
+    if gate["name"] in SKIPPED_GATES:
+        return True
+    if gate["name"] in MEASUREMENTS:
+        return not gate.get("controls")
+    return clifford_table(gate_key(gate)) is not None
+
+
+def is_clifford_circuit(circuit):
+    """Check whether all the gates of a circuit, given as yaml data or as a
+    QuantumCircuit, can be simulated by the tableau simulator."""
+    return all(is_clifford_gate(gate) for gate in circuit_gates(circuit))
+
+
+def popcount(words):
+    """Count the bits set in each word of an array of unsigned 64 bit words."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    return np.unpackbits(words.view(np.uint8), axis=-1).reshape(words.shape + (WORD_BITS,)).sum(axis=-1)
+
+
+def multiply_rows(x, z, r, source_x, source_z, source_r):
+    """Multiply Pauli operators, rows of x, z and r, by a source operator,
+    returns the products. Products of commuting operators have real phases."""
+    # exponent of i collected on each qubit, +1 and -1 counted separately
+    plus = (source_x & source_z & z & ~x) | (source_x & ~source_z & x & z) | (~source_x & source_z & x & ~z)
+    minus = (source_x & source_z & x & ~z) | (source_x & ~source_z & ~x & z) | (~source_x & source_z & x & z)
+    exponent = popcount(plus).sum(axis=-1, dtype=np.int64) - popcount(minus).sum(axis=-1, dtype=np.int64)
+    phases = (2 * r.astype(np.int64) + 2 * int(source_r) + exponent) % 4
+    return x ^ source_x, z ^ source_z, (phases // 2).astype(np.uint8)
+
+
+def product_sign(x, z, r):
+    """Get the sign bit of the product of Pauli operators, rows of x, z and
+    r, in order, when the product is Hermitian.
+
+    With Y written as i X Z, each operator is i^(x.z) (-1)^r X^x Z^z, and
+    moving the Z parts after all the X parts adds a sign for each pair of a Z
+    of an operator and an X of a later one, counted with a prefix XOR of the
+    Z parts over the operators."""
+    z_before = np.bitwise_xor.accumulate(z, axis=0) ^ z
+    product_x = np.bitwise_xor.reduce(x, axis=0)
+    product_z = np.bitwise_xor.reduce(z, axis=0)
+    exponent = (
+        int(popcount(x & z).sum()) + 2 * int(popcount(z_before & x).sum()) + 2 * int(r.sum())
+        - int(popcount(product_x & product_z).sum())
+    )
+    return (exponent % 4) // 2
+
+
+class TableauSimulator:
+
+    """Simulates Clifford circuits on a stabilizer tableau, from |0...0>.
+
+    Rows 0 to n - 1 of the tableau are destabilizers, rows n to 2n - 1
+    stabilizers. Qubit q is bit q % 64 of word q // 64 of each row. Words
+    are stored word by word, x[word, row], so that gates, which change one
+    word of every row, read and write contiguous memory."""
+
+    def __init__(self, no_qubits, seed=None):
+        self.no_qubits = no_qubits
+        words = (no_qubits + WORD_BITS - 1) // WORD_BITS
+        self.x = np.zeros((words, 2 * no_qubits), dtype=np.uint64)
+        self.z = np.zeros((words, 2 * no_qubits), dtype=np.uint64)
+        self.r = np.zeros(2 * no_qubits, dtype=np.uint8)
+        qubits = np.arange(no_qubits)
+        self.x[qubits // WORD_BITS, qubits] = np.uint64(1) << (qubits % WORD_BITS).astype(np.uint64)
+        self.z[qubits // WORD_BITS, qubits + no_qubits] = np.uint64(1) << (qubits % WORD_BITS).astype(np.uint64)
+        self.random = np.random.default_rng(seed)
+
+    def copy(self):
+        simulator = TableauSimulator.__new__(TableauSimulator)
+        simulator.no_qubits = self.no_qubits
+        simulator.x, simulator.z, simulator.r = self.x.copy(), self.z.copy(), self.r.copy()
+        simulator.random = self.random
+        return simulator
+
+    def _bits(self, array, qubit):
+        return (array[qubit // WORD_BITS] >> np.uint64(qubit % WORD_BITS)) & np.uint64(1)
+
+    def apply_table(self, table, qubits):
+        """Apply a Clifford gate, given by its clifford_table, to qubits."""
+        index = np.zeros(2 * self.no_qubits, dtype=np.uint64)
+        for position, qubit in enumerate(qubits):
+            index |= self._bits(self.x, qubit) << np.uint64(2 * position)
+            index |= self._bits(self.z, qubit) << np.uint64(2 * position + 1)
+        images = table.T[:, index]
+        for position, qubit in enumerate(qubits):
+            word, shift = qubit // WORD_BITS, np.uint64(qubit % WORD_BITS)
+            mask = ~(np.uint64(1) << shift)
+            self.x[word] = (self.x[word] & mask) | (images[2 * position] << shift)
+            self.z[word] = (self.z[word] & mask) | (images[2 * position + 1] << shift)
+        self.r ^= images[-1].astype(np.uint8)
+
+    def apply_gate(self, gate):
+        """Apply a Clifford gate or a measurement, returns the measured bit
+        for measurements and None otherwise."""
+        name = gate["name"]
+        if name in SKIPPED_GATES:
+            return None
+        if name in MEASUREMENTS:
+            qubit = gate["targets"][0]
+            # measure x and y in the z basis after a basis change
+            basis_change = {"measure-x": ("hadamard",), "measure-y": ("s-dagger", "hadamard"), "measure-z": ()}[name]
+            for basis_gate in basis_change:
+                self.apply_gate({"name": basis_gate, "targets": [qubit]})
+            outcome = self.measure(qubit)
+            for basis_gate in reversed(basis_change):
+                self.apply_gate({"name": "hadamard" if basis_gate == "hadamard" else "s", "targets": [qubit]})
+            return outcome
+        table = clifford_table(gate_key(gate))
+        if table is None:
+            raise Exception(f"Gate {name} is not a Clifford gate.")
+        self.apply_table(table, gate_qubits(gate))
+        return None
+
+    def measure(self, qubit):
+        """Measure a qubit in the Z basis, returns the outcome."""
+        n = self.no_qubits
+        x_bits = self._bits(self.x, qubit).astype(bool)
+        anticommuting = np.flatnonzero(x_bits[n:])
+        if len(anticommuting):
+            # random outcome: the first anticommuting stabilizer is replaced by +-Z
+            pivot = n + anticommuting[0]
+            rows = np.flatnonzero(x_bits)
+            rows = rows[rows != pivot]
+            if len(rows):
+                x, z, self.r[rows] = multiply_rows(
+                    self.x[:, rows].T, self.z[:, rows].T, self.r[rows], self.x[:, pivot], self.z[:, pivot], self.r[pivot])
+                self.x[:, rows], self.z[:, rows] = x.T, z.T
+            self.x[:, pivot - n], self.z[:, pivot - n], self.r[pivot - n] = self.x[:, pivot], self.z[:, pivot], self.r[pivot]
+            self.x[:, pivot] = 0
+            self.z[:, pivot] = 0
+            self.z[qubit // WORD_BITS, pivot] = np.uint64(1) << np.uint64(qubit % WORD_BITS)
+            outcome = int(self.random.integers(2))
+            self.r[pivot] = outcome
+            return outcome
+        # deterministic outcome: Z is the product of the stabilizers paired
+        # with the destabilizers anticommuting with it
+        rows = np.flatnonzero(x_bits[:n]) + n
+        return product_sign(self.x[:, rows].T, self.z[:, rows].T, self.r[rows])
+
+    def run(self, circuit):
+        """Simulate a circuit given as yaml data or as a QuantumCircuit,
+        returns the measured classical bits as a dictionary."""
+        bits = {}
+        for gate in circuit_gates(circuit):
+            outcome = self.apply_gate(gate)
+            if outcome is not None:
+                bits[gate.get("bit", gate["targets"][0])] = outcome
+        return bits
+
+    @classmethod
+    def sample(cls, circuit, shots, seed=None, no_qubits=None):
+        """Run a circuit a number of times, returns the counts of the measured
+        bit strings, the highest classical bit first. Gates before the first
+        measurement are simulated once."""
+        gates = circuit_gates(circuit)
+        no_qubits = count_qubits(gates) if no_qubits is None else no_qubits
+        first_measurement = next((index for index, gate in enumerate(gates) if gate["name"] in MEASUREMENTS), len(gates))
+        prepared = cls(no_qubits, seed)
+        for gate in gates[:first_measurement]:
+            prepared.apply_gate(gate)
+        counts = collections.Counter()
+        for _ in range(shots):
+            simulator = prepared.copy()
+            bits = {}
+            for gate in gates[first_measurement:]:
+                outcome = simulator.apply_gate(gate)
+                if outcome is not None:
+                    bits[gate.get("bit", gate["targets"][0])] = outcome
+            counts["".join(str(bits[bit]) for bit in sorted(bits, reverse=True))] += 1
+        return dict(counts)
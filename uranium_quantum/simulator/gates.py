@@ -0,0 +1,108 @@
+"""Gates of circuits as simulators see them: a flat list of gates with their
+unitaries on local qubits, the targets first and then the controls, the
+first target being the least significant qubit of a matrix index."""
+
+import numpy as np
+
+from uranium_quantum.transpiler.basis_transpiler import control_basis_changes
+from uranium_quantum.transpiler.gate_library import gate_matrix, gate_matrix_derivative
+
+# gates without effect on the state
+SKIPPED_GATES = ("barrier", "identity")
+MEASUREMENTS = ("measure-x", "measure-y", "measure-z")
+# gate parameters which are angles, strings name symbolic parameters
+ANGLES = ("theta", "phi", "lambda")
+
+
+def yaml_gate(gate):
+    """Get a gate as written in yaml from a gate of a QuantumCircuit, which
+    keeps root degrees as 'root-k' or 'root-t'."""
+    if "root-k" not in gate and "root-t" not in gate:
+        return gate
+    gate = dict(gate)
+    if "root-k" in gate:
+        gate["root"] = f"1/2^{gate.pop('root-k')}"
+    else:
+        gate["root"] = f"1/{gate.pop('root-t')}"
+    return gate
+
+
+def circuit_gates(circuit):
+    """Get the gates of a circuit given as yaml data or as a QuantumCircuit,
+    in order. Aggregated gates are replaced by the gates they aggregate,
+    each with the controls of the aggregate."""
+    if isinstance(circuit, dict):
+        steps = (step.get("gates") or [] for step in circuit.get("steps") or [])
+    else:
+        steps = (step_gates for _, step_gates in circuit.iter_steps(expand=True))
+    gates = []
+    for step_gates in steps:
+        for gate in step_gates:
+            gate = yaml_gate(gate)
+            if gate["name"] == "aggregate":
+                gates += [dict(yaml_gate(aggregated_gate), controls=gate.get("controls") or []) for aggregated_gate in gate["gates"]]
+            elif gate["name"] == "circuit":
+                raise Exception("Circuits used as gates must be expanded before they are simulated.")
+            else:
+                gates.append(gate)
+    return gates
+
+
+def gate_qubits(gate):
+    """Get the local qubits of a gate, the targets first and then the controls."""
+    return list(gate.get("targets") or []) + [control["target"] for control in gate.get("controls") or []]
+
+
+def count_qubits(gates):
+    return max((max(gate_qubits(gate)) + 1 for gate in gates if gate_qubits(gate)), default=0)
+
+
+def control_vectors(gate):
+    """Get the state each control of a gate is on, the gate acting when all
+    its controls are in their states."""
+    states = [str(control["state"]) for control in gate.get("controls") or []]
+    before, _ = control_basis_changes(states, 0)
+    return [rotation.conj().T @ np.array([0, 1]) for _, _, rotation in before]
+
+
+def add_controls(matrix, gate, identity=True):
+    """Extend a matrix, or a stack of matrices, acting on the targets of a
+    gate to its controls: the matrix acts when the controls are in their
+    states, and the identity, or nothing when identity is False, otherwise."""
+    vectors = control_vectors(gate)
+    if not vectors:
+        return matrix
+    projector = np.ones((1, 1), dtype=complex)
+    for vector in vectors:
+        projector = np.kron(np.outer(vector, vector.conj()), projector)
+    size = len(projector) * matrix.shape[-1]
+    controlled = np.einsum("ij,...kl->...ikjl", projector, matrix).reshape(matrix.shape[:-2] + (size, size))
+    if not identity:
+        return controlled
+    return controlled + np.kron(np.eye(len(projector)) - projector, np.eye(matrix.shape[-1]))
+
+
+def gate_unitary(gate):
+    """Get the unitary of a gate on its local qubits, controls included. A
+    gate with arrays of angles has a stack of unitaries, one per binding."""
+    return add_controls(gate_matrix(gate), gate)
+
+
+def gate_derivative(gate, key):
+    """Get the derivative of the unitary of a gate on its local qubits,
+    controls included, with respect to one of its angles."""
+    return add_controls(gate_matrix_derivative(gate, key), gate, identity=False)
+
+
+def bind_gate(gate, bindings):
+    """Get a gate with its symbolic parameters, angles written as parameter
+    names, replaced by their values: numbers or arrays of values."""
+    if not any(isinstance(gate.get(key), str) for key in ANGLES):
+        return gate
+    bound_gate = dict(gate)
+    for key in ANGLES:
+        if isinstance(gate.get(key), str):
+            if gate[key] not in bindings:
+                raise Exception(f"Parameter {gate[key]} has no value.")
+            bound_gate[key] = bindings[gate[key]]
+    return bound_gate
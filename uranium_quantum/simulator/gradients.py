@@ -0,0 +1,62 @@
+"""Gradients of expectation values of circuits with symbolic parameters, by
+adjoint differentiation (Jones and Gacon, 2020).
+
+For a circuit U_N ... U_1 and an observable O, the derivative of
+<psi|O|psi> with respect to an angle of gate k is
+
+    2 Re <lambda_k| dU_k |psi_(k-1)>
+
+with psi_(k-1) the state before gate k and lambda_k = U_(k+1)^+ ... U_N^+ O psi.
+After one forward simulation, the gates are undone one by one, from the
+last, on psi and on lambda, so that both are available for every gate: the
+full gradient costs about three simulations and two statevectors, whatever
+the number of parameters. Derivatives of the gates come from the matrices
+of the gate catalogue. Like the statevector simulator, all the bindings of
+the parameters are differentiated at once."""
+
+import numpy as np
+
+from .gates import ANGLES, MEASUREMENTS, SKIPPED_GATES, bind_gate, circuit_gates, count_qubits, gate_derivative, gate_qubits, gate_unitary
+from .statevector import StatevectorSimulator, batch_size
+
+
+def adjoint_gradient(circuit, observable, bindings=None, no_qubits=None, **options):
+    """Get the expectation value of a PauliSum on the state of a circuit given
+    as yaml data or as a QuantumCircuit, and its gradient with respect to the
+    symbolic parameters of the circuit. Returns the values, one per binding,
+    and the gradient as a dictionary of derivatives, one per binding, by
+    parameter name. Options, such as the precision, are passed to the
+    simulators."""
+    gates = circuit_gates(circuit)
+    if any(gate["name"] in MEASUREMENTS for gate in gates):
+        raise Exception("Gradients of circuits with measurements are not supported.")
+    gates = [gate for gate in gates if gate["name"] not in SKIPPED_GATES]
+    bindings = {name: np.asarray(values, dtype=float) for name, values in (bindings or {}).items()}
+    no_qubits = count_qubits(gates) if no_qubits is None else no_qubits
+
+    state = StatevectorSimulator(no_qubits, batch_size(bindings), **options)
+    unitaries = []
+    for gate in gates:
+        unitaries.append(gate_unitary(bind_gate(gate, bindings)))
+        state.apply_matrix(unitaries[-1], gate_qubits(gate))
+    values = observable.expectation(state.states)
+
+    costate = StatevectorSimulator(no_qubits, state.batch_size, **options)
+    costate.amplitudes = observable.apply(state.amplitudes).astype(state.dtype)
+    gradient = {}
+    for gate, unitary in zip(reversed(gates), reversed(unitaries)):
+        qubits = gate_qubits(gate)
+        adjoint = np.conj(np.swapaxes(unitary, -1, -2))
+        state.apply_matrix(adjoint, qubits)
+        keys = [key for key in ANGLES if isinstance(gate.get(key), str)]
+        if keys:
+            overlaps = state.overlaps(costate, qubits)
+            bound_gate = bind_gate(gate, bindings)
+            for key in keys:
+                derivative = gate_derivative(bound_gate, key)
+                # a stack of derivatives has the batch axis last, as the overlaps
+                derivative = np.moveaxis(derivative, 0, -1) if derivative.ndim == 3 else derivative[..., None]
+                contribution = 2 * np.sum(derivative * overlaps, axis=(0, 1)).real
+                gradient[gate[key]] = gradient.get(gate[key], 0) + contribution
+        costate.apply_matrix(adjoint, qubits)
+    return values, gradient
@@ -0,0 +1,190 @@
+"""Matrix product state simulation of circuits with limited entanglement.
+
+The state of n qubits is a chain of n tensors of shape (left bond, 2, right
+bond). Gates on one qubit change one tensor, gates on two neighbouring
+qubits change two tensors and the bond between them, which is truncated
+with a singular value decomposition. Gates on distant qubits are applied
+after swapping one qubit along the chain next to the other; the qubit stays
+where it was moved, so that gates fanning out from a qubit need no swaps.
+
+Memory and time are polynomial in the number of qubits for a bounded bond
+dimension: shallow and nearest neighbour circuits of hundreds of qubits
+are simulated exactly, deeper ones approximately, the weight discarded by
+truncations being reported."""
+
+import collections
+
+import numpy as np
+
+from uranium_quantum.transpiler.gate_library import FIXED_GATES, H
+from .gates import MEASUREMENTS, SKIPPED_GATES, circuit_gates, count_qubits, gate_qubits, gate_unitary
+
+SWAP = FIXED_GATES["swap"]
+S_DAGGER = FIXED_GATES["s-dagger"]
+
+
+class MPSSimulator:
+
+    """Simulates circuits on a matrix product state, from |0...0>.
+
+    Bonds keep at most max_bond_dimension singular values, and singular
+    values are also dropped while the weight they carry stays below
+    truncation_error. The orthogonality center of the chain is moved to the
+    gates applied, so truncations are optimal."""
+
+    def __init__(self, no_qubits, max_bond_dimension=64, truncation_error=1e-12, seed=None):
+        self.no_qubits = no_qubits
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_error = truncation_error
+        self.tensors = [np.array([1, 0], dtype=complex).reshape(1, 2, 1) for _ in range(no_qubits)]
+        self.center = 0
+        # site of each qubit along the chain, and qubit at each site
+        self.sites = list(range(no_qubits))
+        self.qubits = list(range(no_qubits))
+        # total weight discarded by truncations, the fidelity with the exact
+        # state is at least 1 minus this weight
+        self.discarded_weight = 0.0
+        # qubits measured by the circuit and the classical bit of each
+        self.measured = {}
+        self.random = np.random.default_rng(seed)
+
+    @property
+    def bond_dimensions(self):
+        """Get the dimensions of the bonds between consecutive sites."""
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def _move_center(self, site):
+        """Move the orthogonality center to a site with QR decompositions."""
+        while self.center < site:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left * 2, right))
+            self.tensors[self.center] = q.reshape(left, 2, -1)
+            self.tensors[self.center + 1] = np.tensordot(r, self.tensors[self.center + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > site:
+            tensor = self.tensors[self.center]
+            left, _, right = tensor.shape
+            q, r = np.linalg.qr(tensor.reshape(left, 2 * right).T)
+            self.tensors[self.center] = q.T.reshape(-1, 2, right)
+            self.tensors[self.center - 1] = np.tensordot(self.tensors[self.center - 1], r.T, axes=(2, 0))
+            self.center -= 1
+
+    def apply_one_qubit(self, matrix, qubit):
+        site = self.sites[qubit]
+        self.tensors[site] = np.einsum("ij,ajb->aib", matrix, self.tensors[site])
+
+    def apply_neighbours(self, matrix, site):
+        """Apply a two qubit unitary to the qubits at site and site + 1, the
+        qubit at site being the least significant of the matrix index."""
+        self._move_center(site)
+        theta = np.tensordot(self.tensors[site], self.tensors[site + 1], axes=(2, 0))
+        theta = np.einsum("pqrs,asrb->aqpb", matrix.reshape(2, 2, 2, 2), theta)
+        left, right = theta.shape[0], theta.shape[3]
+        u, singular_values, vh = np.linalg.svd(theta.reshape(left * 2, 2 * right), full_matrices=False)
+
+        weights = singular_values ** 2
+        weights /= weights.sum()
+        # weight discarded when keeping the first k singular values
+        tail = np.concatenate((np.cumsum(weights[::-1])[::-1], [0.0]))
+        keep = max(1, min(self.max_bond_dimension, int(np.argmax(tail <= self.truncation_error))))
+        self.discarded_weight += float(tail[keep])
+
+        kept = singular_values[:keep] / np.linalg.norm(singular_values[:keep])
+        self.tensors[site] = (u[:, :keep] * kept).reshape(left, 2, keep)
+        self.tensors[site + 1] = vh[:keep].reshape(keep, 2, right)
+
+    def swap_sites(self, site):
+        """Swap the qubits at site and site + 1."""
+        self.apply_neighbours(SWAP, site)
+        first, second = self.qubits[site], self.qubits[site + 1]
+        self.qubits[site], self.qubits[site + 1] = second, first
+        self.sites[first], self.sites[second] = site + 1, site
+
+    def apply_two_qubit(self, matrix, first, second):
+        """Apply a two qubit unitary, first being the least significant qubit
+        of the matrix index. The second qubit is swapped next to the first."""
+        while abs(self.sites[second] - self.sites[first]) > 1:
+            site = self.sites[second]
+            self.swap_sites(site if site < self.sites[first] else site - 1)
+        if self.sites[first] < self.sites[second]:
+            self.apply_neighbours(matrix, self.sites[first])
+        else:
+            self.apply_neighbours(SWAP @ matrix @ SWAP, self.sites[second])
+
+    def apply_gate(self, gate):
+        """Apply a gate on one or two qubits, controls included. Measurements
+        are recorded and sampled at the end of the circuit."""
+        name = gate["name"]
+        if name in SKIPPED_GATES:
+            return
+        if name in MEASUREMENTS:
+            qubit = gate["targets"][0]
+            # measure x and y in the z basis after a basis change
+            if name == "measure-x":
+                self.apply_one_qubit(H, qubit)
+            elif name == "measure-y":
+                self.apply_one_qubit(H @ S_DAGGER, qubit)
+            self.measured[qubit] = gate.get("bit", qubit)
+            return
+        qubits = gate_qubits(gate)
+        if any(qubit in self.measured for qubit in qubits):
+            raise Exception("Gates after measurements of their qubits are not supported.")
+        if len(qubits) == 1:
+            self.apply_one_qubit(gate_unitary(gate), qubits[0])
+        elif len(qubits) == 2:
+            self.apply_two_qubit(gate_unitary(gate), qubits[0], qubits[1])
+        else:
+            raise Exception(f"Gate {name} acts on {len(qubits)} qubits, only gates on one or two qubits can be simulated.")
+
+    def run(self, circuit):
+        """Apply the gates of a circuit given as yaml data or as a QuantumCircuit."""
+        for gate in circuit_gates(circuit):
+            self.apply_gate(gate)
+        return self
+
+    def amplitude(self, index):
+        """Get the amplitude of a basis state, qubit 0 being the least
+        significant bit of the index."""
+        vector = np.ones(1, dtype=complex)
+        for qubit, tensor in zip(self.qubits, self.tensors):
+            vector = vector @ tensor[:, (index >> qubit) & 1, :]
+        return complex(vector[0])
+
+    def sample_qubits(self, shots):
+        """Sample all qubits, returns an array of shape (shots, qubits)."""
+        self._move_center(0)
+        # the tensors right of the center are right canonical: the norm of
+        # the contraction of the left part gives conditional probabilities
+        vectors = np.ones((shots, 1), dtype=complex)
+        outcomes = np.zeros((shots, self.no_qubits), dtype=np.uint8)
+        for qubit, tensor in zip(self.qubits, self.tensors):
+            zero = vectors @ tensor[:, 0, :]
+            one = vectors @ tensor[:, 1, :]
+            probability_zero = np.sum(abs(zero) ** 2, axis=1)
+            probability_one = np.sum(abs(one) ** 2, axis=1)
+            bits = self.random.random(shots) * (probability_zero + probability_one) >= probability_zero
+            outcomes[:, qubit] = bits
+            vectors = np.where(bits[:, None], one, zero)
+            vectors /= np.linalg.norm(vectors, axis=1)[:, None]
+        return outcomes
+
+    def sample(self, shots):
+        """Sample the measured bits, or all qubits when the circuit has no
+        measurements. Returns the counts of the bit strings, the highest
+        classical bit first."""
+        outcomes = self.sample_qubits(shots)
+        measured = self.measured or {qubit: qubit for qubit in range(self.no_qubits)}
+        columns = [qubit for qubit, _ in sorted(measured.items(), key=lambda item: item[1], reverse=True)]
+        counts = collections.Counter("".join(map(str, row)) for row in outcomes[:, columns])
+        return dict(counts)
+
+    @classmethod
+    def sample_circuit(cls, circuit, shots, seed=None, no_qubits=None, **options):
+        """Simulate a circuit given as yaml data or as a QuantumCircuit and
+        sample it, options are passed to the simulator."""
+        gates = circuit_gates(circuit)
+        simulator = cls(count_qubits(gates) if no_qubits is None else no_qubits, seed=seed, **options)
+        for gate in gates:
+            simulator.apply_gate(gate)
+        return simulator.sample(shots)
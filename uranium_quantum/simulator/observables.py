@@ -0,0 +1,126 @@
+"""Expectation values of sums of Pauli operators on statevectors.
+
+A Pauli operator on n qubits is kept as two bit masks, x and z, and the
+number of its Y factors: with Y = i X Z it is i^y X^x Z^z, which maps the
+basis state |b> to i^y (-1)^popcount(b & z) |b ^ x>. Its expectation value
+on a statevector psi is then
+
+    i^y sum_b (-1)^popcount(b & z) conj(psi[b ^ x]) psi[b]
+
+so terms sharing their X and Y support, their x mask, share the product
+conj(psi[b ^ x]) psi[b], computed once per group with an index permutation,
+and differ by a vector of signs. The signs of a chunk of terms are built
+from bit masks and applied with one matrix product; groups with more terms
+than qubits use a Walsh-Hadamard transform of the product, which gives the
+sums for all z masks at once. No operator matrix is ever built."""
+
+import numpy as np
+
+from .clifford import popcount
+
+# sign vectors are built for chunks of terms of at most this many entries
+MAX_SIGN_ENTRIES = 2 ** 22
+
+
+def walsh_hadamard(vectors):
+    """Get the Walsh-Hadamard transforms of the columns of an array, entry z
+    of a transform being sum_b (-1)^popcount(b & z) v[b]."""
+    result = np.array(vectors, dtype=complex)
+    size = len(result)
+    half = 1
+    while half < size:
+        view = result.reshape((-1, 2, half) + result.shape[1:])
+        first = view[:, 0].copy()
+        view[:, 0] += view[:, 1]
+        view[:, 1] = first - view[:, 1]
+        half *= 2
+    return result
+
+
+class PauliSum:
+
+    """A linear combination of Pauli operators, given by label, such as
+    "XIZY", the highest qubit first, with its coefficient. Terms are a
+    dictionary or a list of (label, coefficient) pairs."""
+
+    def __init__(self, terms, no_qubits=None):
+        terms = list(terms.items()) if isinstance(terms, dict) else list(terms)
+        self.labels = [label for label, _ in terms]
+        self.coefficients = np.array([coefficient for _, coefficient in terms])
+        self.no_qubits = max(map(len, self.labels), default=0) if no_qubits is None else no_qubits
+        self.x_masks = np.zeros(len(terms), dtype=np.int64)
+        self.z_masks = np.zeros(len(terms), dtype=np.int64)
+        self.y_counts = np.zeros(len(terms), dtype=np.int64)
+        for index, label in enumerate(self.labels):
+            if len(label) > self.no_qubits or set(label) - set("IXYZ"):
+                raise Exception(f"Pauli operator {label} is not a string of I, X, Y and Z on at most {self.no_qubits} qubits.")
+            x_mask = z_mask = 0
+            for qubit, pauli in enumerate(reversed(label)):
+                x_mask |= (pauli in "XY") << qubit
+                z_mask |= (pauli in "ZY") << qubit
+            self.x_masks[index], self.z_masks[index] = x_mask, z_mask
+            self.y_counts[index] = label.count("Y")
+
+    def __len__(self):
+        return len(self.labels)
+
+    def groups(self):
+        """Get the indices of the terms of each x mask, by x mask."""
+        order = np.argsort(self.x_masks, kind="stable")
+        masks, starts = np.unique(self.x_masks[order], return_index=True)
+        return dict(zip(masks.tolist(), np.split(order, starts[1:])))
+
+    def expectation_values(self, states):
+        """Get the expectation value of each term on a statevector, or on each
+        row of an array of statevectors, qubit 0 being the least significant
+        bit of the index of an amplitude."""
+        states = np.asarray(states)
+        if states.shape[-1] != 2 ** self.no_qubits:
+            raise Exception(f"Statevectors of {states.shape[-1]} amplitudes do not match operators on {self.no_qubits} qubits.")
+        # amplitudes of a basis state for all the statevectors are contiguous,
+        # so the permutations gather whole rows
+        amplitudes = np.ascontiguousarray(states.reshape(-1, states.shape[-1]).T)
+        indices = np.arange(len(amplitudes))
+        values = np.empty((len(self), amplitudes.shape[1]), dtype=complex)
+        chunk = max(1, MAX_SIGN_ENTRIES // len(amplitudes))
+        for x_mask, terms in self.groups().items():
+            products = amplitudes[indices ^ x_mask]
+            np.conjugate(products, out=products)
+            products *= amplitudes
+            z_masks = self.z_masks[terms]
+            if len(terms) > self.no_qubits:
+                values[terms] = walsh_hadamard(products)[z_masks]
+            else:
+                for start in range(0, len(terms), chunk):
+                    parities = popcount(z_masks[start:start + chunk, None] & indices) & 1
+                    values[terms[start:start + chunk]] = (1 - 2 * parities.astype(np.float64)) @ products
+            values[terms] *= (1j ** self.y_counts[terms])[:, None]
+        return values.T.reshape(states.shape[:-1] + (len(self),))
+
+    def apply(self, amplitudes):
+        """Apply the sum to statevectors given as columns, of shape (2^n,
+        bindings), returns the resulting vectors. The phases of the terms of
+        each x mask are added up into one vector of phases, for groups with
+        more terms than qubits with a Walsh-Hadamard transform of the
+        coefficients placed at the z masks."""
+        amplitudes = np.asarray(amplitudes)
+        if len(amplitudes) != 2 ** self.no_qubits:
+            raise Exception(f"Statevectors of {len(amplitudes)} amplitudes do not match operators on {self.no_qubits} qubits.")
+        indices = np.arange(len(amplitudes))
+        result = np.zeros(amplitudes.shape, dtype=complex)
+        for x_mask, terms in self.groups().items():
+            weights = self.coefficients[terms] * 1j ** self.y_counts[terms]
+            if len(terms) > self.no_qubits:
+                placed = np.zeros(len(amplitudes), dtype=complex)
+                np.add.at(placed, self.z_masks[terms], weights)
+                phases = walsh_hadamard(placed)
+            else:
+                phases = weights @ (1 - 2 * (popcount(self.z_masks[terms, None] & indices) & 1).astype(np.float64))
+            result += (phases[:, None] * amplitudes)[indices ^ x_mask]
+        return result
+
+    def expectation(self, states):
+        """Get the expectation value of the sum on a statevector, or on each
+        row of an array of statevectors. Values are real for real coefficients."""
+        values = self.expectation_values(states) @ self.coefficients
+        return values.real if np.isrealobj(self.coefficients) else values
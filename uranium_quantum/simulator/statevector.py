@@ -0,0 +1,190 @@
+"""Dense statevector simulation of a circuit for many bindings of its
+parameters at once.
+
+Variational algorithms evaluate one circuit over grids of angles. Rather
+than simulating the circuit once per binding, the statevectors of all the
+bindings are kept in one array of shape (2^n, bindings), the batch axis
+last so that the amplitudes of a basis state for all the bindings are
+contiguous. Gates with symbolic parameters have a stack of matrices, one
+per binding, built from the gate catalogue with arrays of angles, and are
+applied to all the statevectors at once, with one NumPy operation per
+matrix entry. Gates without symbolic parameters apply the same matrix to
+every statevector.
+
+Amplitudes are complex128 by default. In single precision they are
+complex64, which halves memory and bandwidth; the mixed precision keeps
+complex64 amplitudes but sums the terms of each gate and reductions, such
+as norms and overlaps, in complex128, so that rounding errors are made
+once per gate rather than once per term. The drift of the norms of the
+statevectors away from 1 measures the rounding errors accumulated."""
+
+import numpy as np
+
+from uranium_quantum.transpiler.gate_library import FIXED_GATES, H
+from .gates import MEASUREMENTS, SKIPPED_GATES, bind_gate, circuit_gates, count_qubits, gate_qubits, gate_unitary
+
+S_DAGGER = FIXED_GATES["s-dagger"]
+# dtype of the amplitudes and dtype of the arithmetic of each precision
+PRECISIONS = {
+    "double": (np.complex128, np.complex128),
+    "single": (np.complex64, np.complex64),
+    "mixed": (np.complex64, np.complex128),
+}
+
+
+def batch_size(bindings):
+    """Get the number of bindings of parameters given as arrays of values by
+    parameter name, single values are shared by all bindings."""
+    sizes = {len(values) for values in bindings.values() if np.ndim(values)}
+    if len(sizes) > 1:
+        raise Exception("Parameters must have the same number of values.")
+    return sizes.pop() if sizes else 1
+
+
+class StatevectorSimulator:
+
+    """Simulates circuits on a batch of statevectors, from |0...0>, qubit 0
+    being the least significant bit of the index of an amplitude.
+
+    Bindings give the values of the symbolic parameters of the circuit by
+    parameter name, an array of values per parameter, each statevector of
+    the batch using the values at its position.
+
+    The precision is one of PRECISIONS. With a norm_check_interval, the
+    norms of the statevectors are checked every this many gates, the
+    largest deviation of a squared norm from 1 being kept in norm_drift."""
+
+    def __init__(self, no_qubits, batch_size=1, precision="double", norm_check_interval=None):
+        if precision not in PRECISIONS:
+            raise Exception(f"Unknown precision {precision}, use one of: {', '.join(PRECISIONS)}.")
+        self.no_qubits = no_qubits
+        self.batch_size = batch_size
+        self.precision = precision
+        self.dtype, self.compute_dtype = PRECISIONS[precision]
+        self.amplitudes = np.zeros((2 ** no_qubits, batch_size), dtype=self.dtype)
+        self.amplitudes[0] = 1
+        # qubits measured by the circuit and the classical bit of each
+        self.measured = {}
+        self.norm_check_interval = norm_check_interval
+        self.norm_drift = 0.0
+        self.gates_applied = 0
+
+    @property
+    def states(self):
+        """Get the statevectors, one row per binding."""
+        return self.amplitudes.T
+
+    def _tensor(self):
+        return self.amplitudes.reshape((2,) * self.no_qubits + (self.batch_size,))
+
+    def _slices(self, qubits):
+        """Get the index of the slice of the amplitudes for each basis state of
+        qubits, the first qubit being the least significant."""
+        slices = []
+        for local_index in range(2 ** len(qubits)):
+            index = [slice(None)] * (self.no_qubits + 1)
+            for position, qubit in enumerate(qubits):
+                index[self.no_qubits - 1 - qubit] = (local_index >> position) & 1
+            slices.append(tuple(index))
+        return slices
+
+    def apply_matrix(self, matrix, qubits):
+        """Apply a matrix, or a stack of one matrix per statevector, to qubits,
+        the first qubit being the least significant of the matrix index."""
+        # the highest qubit comes first and the batch last; the slices of the
+        # amplitudes for each local basis state are views, so the gate is
+        # applied entry by entry without moving axes, and entries which are
+        # zero for all bindings, as in controlled gates, cost nothing
+        tensor = self._tensor()
+        slices = self._slices(qubits)
+        parts = [tensor[index] for index in slices]
+        # a stack of matrices has the batch axis last too, as the amplitudes
+        entries = np.asarray(np.moveaxis(matrix, 0, -1) if np.ndim(matrix) == 3 else matrix, dtype=self.compute_dtype)
+        nonzero = np.any(entries != 0, axis=-1) if np.ndim(matrix) == 3 else entries != 0
+        result = np.empty_like(tensor)
+        for row, index in enumerate(slices):
+            output = result[index]
+            terms = [(entries[row, column], part) for column, part in enumerate(parts) if nonzero[row, column]]
+            if not terms:
+                output[...] = 0
+                continue
+            # in mixed precision the terms are summed in double precision
+            total = output if self.dtype == self.compute_dtype else np.empty(output.shape, dtype=self.compute_dtype)
+            np.multiply(terms[0][1], terms[0][0], out=total)
+            for entry, part in terms[1:]:
+                total += part * entry
+            if total is not output:
+                output[...] = total
+        self.amplitudes = result.reshape(2 ** self.no_qubits, self.batch_size)
+
+    def overlaps(self, other, qubits):
+        """Get the inner products of the slices of the amplitudes of another
+        simulator, conjugated, and of this one, for each pair of basis states
+        of qubits: entry (i, j) of the result, one value per binding, is the
+        sum of conj(other[i]) * self[j]. For a matrix m on qubits, the inner
+        product <other|m|self> is then the sum of m * overlaps."""
+        slices = self._slices(qubits)
+        axes = tuple(range(self.no_qubits - len(qubits)))
+        tensor, other_tensor = self._tensor(), other._tensor()
+        return np.array([[np.sum(other_tensor[row].conj() * tensor[column], axis=axes, dtype=self.compute_dtype) for column in slices]
+                         for row in slices])
+
+    def norms(self):
+        """Get the squared norms of the statevectors, summed in double precision."""
+        parts = self.amplitudes.view(self.amplitudes.real.dtype).reshape(len(self.amplitudes), self.batch_size, 2)
+        return np.einsum("ijk,ijk->j", parts, parts, dtype=np.float64)
+
+    def check_norm(self):
+        """Check the norms of the statevectors, returns the largest deviation
+        of a squared norm from 1 and keeps the largest one seen in norm_drift."""
+        drift = float(np.max(abs(self.norms() - 1)))
+        self.norm_drift = max(self.norm_drift, drift)
+        return drift
+
+    def apply_gate(self, gate, bindings=None):
+        """Apply a gate, with its symbolic parameters bound. Measurements are
+        recorded, the probabilities of the outcomes are given by probabilities."""
+        name = gate["name"]
+        if name in SKIPPED_GATES:
+            return
+        if name in MEASUREMENTS:
+            qubit = gate["targets"][0]
+            # measure x and y in the z basis after a basis change
+            if name == "measure-x":
+                self.apply_matrix(H, [qubit])
+            elif name == "measure-y":
+                self.apply_matrix(H @ S_DAGGER, [qubit])
+            self.measured[qubit] = gate.get("bit", qubit)
+            return
+        qubits = gate_qubits(gate)
+        if any(qubit in self.measured for qubit in qubits):
+            raise Exception("Gates after measurements of their qubits are not supported.")
+        self.apply_matrix(gate_unitary(bind_gate(gate, bindings or {})), qubits)
+        self.gates_applied += 1
+        if self.norm_check_interval and self.gates_applied % self.norm_check_interval == 0:
+            self.check_norm()
+
+    def run(self, circuit, bindings=None):
+        """Apply the gates of a circuit given as yaml data or as a QuantumCircuit."""
+        bindings = {name: np.asarray(values, dtype=float) for name, values in (bindings or {}).items()}
+        for gate in circuit_gates(circuit):
+            self.apply_gate(gate, bindings)
+        return self
+
+    def probabilities(self):
+        """Get the probabilities of the basis states, one row per binding."""
+        return abs(self.states) ** 2
+
+    def expectation(self, observable):
+        """Get the expectation values of a PauliSum, one per binding."""
+        return observable.expectation(self.states)
+
+    @classmethod
+    def simulate(cls, circuit, bindings=None, no_qubits=None, **options):
+        """Simulate a circuit given as yaml data or as a QuantumCircuit for
+        bindings of its parameters, returns the statevectors, one per row.
+        Options, such as the precision, are passed to the simulator."""
+        gates = circuit_gates(circuit)
+        simulator = cls(count_qubits(gates) if no_qubits is None else no_qubits, batch_size(bindings or {}), **options)
+        simulator.run({"steps": [{"gates": gates}]}, bindings)
+        return simulator.states
@@ -0,0 +1 @@
+"""This module contains testing code."""
@@ -0,0 +1,93 @@
+"""Tests the stabilizer tableau simulator."""
+
+import random
+
+import numpy as np
+
+from uranium_quantum.circuit_composer.circuit_composer import QuantumCircuit, Control
+from ..clifford import TableauSimulator, is_clifford_circuit, is_clifford_gate
+from ..gates import gate_qubits, gate_unitary
+
+CLIFFORD_GATES = [
+    ("hadamard", 1), ("hadamard-xy", 1), ("hadamard-yz", 1), ("pauli-x", 1), ("pauli-y", 1), ("pauli-z", 1),
+    ("s", 1), ("s-dagger", 1), ("v", 1), ("v-dagger", 1), ("c", 1), ("swap", 2), ("iswap", 2), ("fswap", 2),
+    ("molmer-sorensen", 2), ("magic", 2),
+]
+
+
+def statevector(gates, no_qubits):
+    """Simulate a circuit with dense unitaries, qubit 0 being the least significant."""
+    state = np.zeros(2 ** no_qubits, dtype=complex)
+    state[0] = 1
+    for gate in gates:
+        qubits = gate_qubits(gate)
+        tensor = state.reshape([2] * no_qubits)
+        axes = [no_qubits - 1 - qubit for qubit in reversed(qubits)]
+        unitary = gate_unitary(gate).reshape([2] * (2 * len(qubits)))
+        tensor = np.tensordot(unitary, tensor, axes=(list(range(len(qubits), 2 * len(qubits))), axes))
+        state = np.moveaxis(tensor, list(range(len(qubits))), axes).reshape(-1)
+    return state
+
+
+def random_clifford_circuit(random_generator, no_qubits, no_gates):
+    gates = []
+    for _ in range(no_gates):
+        if random_generator.random() < 0.3:
+            control, target = random_generator.sample(range(no_qubits), 2)
+            name = random_generator.choice(["pauli-x", "pauli-y", "pauli-z"])
+            gates.append({"name": name, "targets": [target], "controls": [{"target": control, "state": random_generator.choice("01")}]})
+        else:
+            name, no_targets = random_generator.choice(CLIFFORD_GATES)
+            gates.append({"name": name, "targets": random_generator.sample(range(no_qubits), no_targets)})
+    return gates
+
+
+def test_clifford_detection():
+    assert all(is_clifford_gate({"name": name, "targets": list(range(no_targets))}) for name, no_targets in CLIFFORD_GATES)
+    assert is_clifford_gate({"name": "rz-theta", "targets": [0], "theta": np.pi / 2})
+    assert not is_clifford_gate({"name": "rz-theta", "targets": [0], "theta": 0.3})
+    assert not is_clifford_gate({"name": "t", "targets": [0]})
+    toffoli = {"name": "pauli-x", "targets": [2], "controls": [{"target": 0, "state": "1"}, {"target": 1, "state": "1"}]}
+    assert not is_clifford_gate(toffoli)
+
+    quantum_circuit = QuantumCircuit(3)
+    quantum_circuit.gate_hadamard([], [0]).increment_step()
+    quantum_circuit.gate_pauli_x([Control(target=0, state='1')], [1]).gate_measure_z([2], 0)
+    assert is_clifford_circuit(quantum_circuit)
+    quantum_circuit.increment_step().gate_t([], [1])
+    assert not is_clifford_circuit(quantum_circuit)
+
+
+def test_outcomes_match_the_statevector():
+    random_generator = random.Random(5)
+    no_qubits = 4
+    for _ in range(20):
+        gates = random_clifford_circuit(random_generator, no_qubits, 30)
+        probabilities = abs(statevector(gates, no_qubits)) ** 2
+        measurements = [{"name": "measure-z", "targets": [qubit], "bit": qubit} for qubit in range(no_qubits)]
+        counts = TableauSimulator.sample({"steps": [{"index": 0, "gates": gates + measurements}]}, 200, seed=1)
+        # stabilizer states are uniform over the outcomes they can have
+        support = {format(index, f"0{no_qubits}b") for index in np.flatnonzero(probabilities > 1e-9)}
+        assert set(counts) == support
+        assert np.allclose(probabilities[probabilities > 1e-9], 1 / len(support))
+
+
+def test_measurements_in_other_bases():
+    simulator = TableauSimulator(2, seed=0)
+    simulator.apply_gate({"name": "hadamard", "targets": [0]})
+    simulator.apply_gate({"name": "hadamard-xy", "targets": [1]})
+    assert simulator.apply_gate({"name": "measure-x", "targets": [0]}) == 0
+    assert [simulator.apply_gate({"name": "measure-z", "targets": [1]}) for _ in range(3)] == [1] * 3
+    simulator.apply_gate({"name": "hadamard-yz", "targets": [1]})
+    # the y basis measurement leaves the qubit in a y eigenstate
+    outcome = simulator.apply_gate({"name": "measure-y", "targets": [1]})
+    assert simulator.apply_gate({"name": "measure-y", "targets": [1]}) == outcome
+
+
+def test_thousands_of_qubits():
+    no_qubits = 2000
+    gates = [{"name": "hadamard", "targets": [0]}]
+    gates += [{"name": "pauli-x", "targets": [qubit + 1], "controls": [{"target": qubit, "state": "1"}]} for qubit in range(no_qubits - 1)]
+    gates += [{"name": "measure-z", "targets": [qubit], "bit": qubit} for qubit in range(0, no_qubits, 97)]
+    counts = TableauSimulator.sample({"steps": [{"index": 0, "gates": gates}]}, 20, seed=3)
+    assert set(counts) == {"0" * 21, "1" * 21}
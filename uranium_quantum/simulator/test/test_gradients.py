@@ -0,0 +1,66 @@
+"""Tests adjoint differentiation of expectation values."""
+
+import numpy as np
+import pytest
+
+from uranium_quantum.circuit_composer.circuit_composer import QuantumCircuit, Control, Parameter
+from uranium_quantum.transpiler.gate_library import gate_matrix, gate_matrix_derivative
+from ..gradients import adjoint_gradient
+from ..observables import PauliSum
+from ..statevector import StatevectorSimulator
+from .test_statevector import parametric_gates
+
+OBSERVABLE = PauliSum({"ZZI": 0.8, "IXY": -0.5, "YIX": 0.3, "IIZ": 1.1})
+
+
+def finite_differences(yaml_data, bindings, step=1e-6):
+    gradient = {}
+    for name in bindings:
+        shifted = [dict(bindings, **{name: bindings[name] + sign * step}) for sign in (1, -1)]
+        plus, minus = [OBSERVABLE.expectation(StatevectorSimulator.simulate(yaml_data, values)) for values in shifted]
+        gradient[name] = (plus - minus) / (2 * step)
+    return gradient
+
+
+def test_catalogue_derivatives():
+    for name in ("u3", "p", "rx-theta", "xx", "cross-resonance-dagger", "swap-theta", "xy", "givens", "a"):
+        gate = {"name": name, "targets": [0, 1], "theta": 0.4, "phi": -0.9, "lambda": 1.3}
+        for key in ("theta", "phi", "lambda"):
+            step = dict(gate, **{key: gate[key] + 1e-6}), dict(gate, **{key: gate[key] - 1e-6})
+            expected = (gate_matrix(step[0]) - gate_matrix(step[1])) / 2e-6
+            assert np.allclose(gate_matrix_derivative(gate, key), expected, atol=1e-7)
+    with pytest.raises(Exception):
+        gate_matrix_derivative({"name": "hadamard", "targets": [0]}, "theta")
+
+
+def test_gradients_match_finite_differences():
+    yaml_data = {"steps": [{"index": 0, "gates": parametric_gates()}]}
+    random_generator = np.random.default_rng(4)
+    bindings = {name: random_generator.uniform(-3, 3, 3) for name in ("alpha", "beta", "gamma")}
+    values, gradient = adjoint_gradient(yaml_data, OBSERVABLE, bindings)
+    assert np.allclose(values, OBSERVABLE.expectation(StatevectorSimulator.simulate(yaml_data, bindings)))
+    expected = finite_differences(yaml_data, bindings)
+    assert sorted(gradient) == ["alpha", "beta", "gamma"]
+    for name in bindings:
+        assert gradient[name].shape == (3,)
+        assert np.allclose(gradient[name], expected[name], atol=1e-6)
+
+
+def test_composer_circuits():
+    quantum_circuit = QuantumCircuit(3)
+    quantum_circuit.gate_ry_theta([], [0], Parameter("alpha")).gate_hadamard([], [2]).increment_step()
+    quantum_circuit.gate_zz([Control(target=0, state='1')], [1, 2], Parameter("beta")).increment_step()
+    quantum_circuit.gate_rx_theta([], [1], Parameter("alpha")).gate_u3([], [2], 0.3, Parameter("beta"), 0.2).increment_step()
+    quantum_circuit.gate_identity([0])
+    bindings = {"alpha": 0.7, "beta": -1.2}
+    values, gradient = adjoint_gradient(quantum_circuit, OBSERVABLE, bindings)
+    expected = finite_differences(quantum_circuit, {name: np.array([value]) for name, value in bindings.items()})
+    assert values.shape == (1,)
+    for name in bindings:
+        assert np.allclose(gradient[name], expected[name], atol=1e-6)
+
+
+def test_measurements_are_rejected():
+    yaml_data = {"steps": [{"index": 0, "gates": [{"name": "measure-z", "targets": [0]}]}]}
+    with pytest.raises(Exception):
+        adjoint_gradient(yaml_data, PauliSum({"Z": 1.0}))
@@ -0,0 +1,78 @@
+"""Tests the matrix product state simulator."""
+
+import random
+
+import numpy as np
+
+from ..mps import MPSSimulator
+from .test_clifford import statevector
+
+GATES = [
+    ("hadamard", 1, ()), ("t", 1, ()), ("v", 1, ()), ("rx-theta", 1, ("theta",)), ("u3", 1, ("theta", "phi", "lambda")),
+    ("swap", 2, ()), ("iswap", 2, ()), ("zz", 2, ("theta",)), ("molmer-sorensen", 2, ()),
+]
+
+
+def random_circuit(random_generator, no_qubits, no_gates):
+    gates = []
+    for _ in range(no_gates):
+        if random_generator.random() < 0.3:
+            control, target = random_generator.sample(range(no_qubits), 2)
+            name, parameters = random_generator.choice([("pauli-x", ()), ("hadamard", ()), ("rz-theta", ("theta",))])
+            gate = {"name": name, "targets": [target], "controls": [{"target": control, "state": random_generator.choice(["0", "1", "+", "-i"])}]}
+        else:
+            name, no_targets, parameters = random_generator.choice(GATES)
+            gate = {"name": name, "targets": random_generator.sample(range(no_qubits), no_targets)}
+        gate.update((parameter, random_generator.uniform(-np.pi, np.pi)) for parameter in parameters)
+        gates.append(gate)
+    return gates
+
+
+def test_amplitudes_match_the_statevector():
+    random_generator = random.Random(7)
+    no_qubits = 6
+    for _ in range(10):
+        gates = random_circuit(random_generator, no_qubits, 40)
+        simulator = MPSSimulator(no_qubits).run({"steps": [{"index": 0, "gates": gates}]})
+        amplitudes = [simulator.amplitude(index) for index in range(2 ** no_qubits)]
+        assert np.allclose(amplitudes, statevector(gates, no_qubits))
+        assert simulator.discarded_weight < 1e-9
+
+
+def test_truncation():
+    random_generator = random.Random(3)
+    no_qubits = 8
+    gates = random_circuit(random_generator, no_qubits, 120)
+    exact = statevector(gates, no_qubits)
+    simulator = MPSSimulator(no_qubits, max_bond_dimension=4).run({"steps": [{"index": 0, "gates": gates}]})
+
+    assert max(simulator.bond_dimensions) <= 4
+    assert simulator.discarded_weight > 0
+    amplitudes = np.array([simulator.amplitude(index) for index in range(2 ** no_qubits)])
+    # the fidelity is bounded by the discarded weight
+    assert abs(np.vdot(amplitudes, exact)) ** 2 >= 1 - simulator.discarded_weight - 1e-9
+
+
+def test_sampling():
+    gates = [{"name": "hadamard", "targets": [0]}, {"name": "pauli-x", "targets": [2]}]
+    gates += [{"name": "measure-x", "targets": [0], "bit": 1}, {"name": "measure-z", "targets": [2], "bit": 0}]
+    assert MPSSimulator.sample_circuit({"steps": [{"index": 0, "gates": gates}]}, 50, seed=0) == {"01": 50}
+
+    simulator = MPSSimulator(3, seed=1)
+    simulator.apply_gate({"name": "hadamard", "targets": [1]})
+    counts = simulator.sample(2000)
+    assert set(counts) == {"000", "010"}
+    assert abs(counts["010"] - 1000) < 150
+
+
+def test_hundreds_of_qubits():
+    no_qubits = 300
+    # a GHZ state with gates between distant qubits has bonds of dimension 2
+    gates = [{"name": "hadamard", "targets": [0]}]
+    gates += [{"name": "pauli-x", "targets": [qubit], "controls": [{"target": 0, "state": "1"}]} for qubit in range(1, no_qubits)]
+    simulator = MPSSimulator(no_qubits, seed=2).run({"steps": [{"index": 0, "gates": gates}]})
+
+    assert max(simulator.bond_dimensions) == 2
+    assert np.isclose(simulator.amplitude(2 ** no_qubits - 1), 2 ** -0.5)
+    assert np.isclose(simulator.amplitude(1), 0)
+    assert set(simulator.sample(20)) == {"0" * no_qubits, "1" * no_qubits}
@@ -0,0 +1,64 @@
+"""Tests expectation values of sums of Pauli operators."""
+
+import random
+
+import numpy as np
+import pytest
+
+from ..clifford import pauli_matrix
+from ..observables import PauliSum, walsh_hadamard
+from ..statevector import StatevectorSimulator
+
+BITS = {"I": (0, 0), "X": (1, 0), "Z": (0, 1), "Y": (1, 1)}
+
+
+def dense_expectation(label, state):
+    matrix = pauli_matrix([BITS[pauli] for pauli in reversed(label)])
+    return state.conj() @ matrix @ state
+
+
+def random_states(random_generator, rows, no_qubits):
+    states = random_generator.normal(size=(rows, 2 ** no_qubits)) + 1j * random_generator.normal(size=(rows, 2 ** no_qubits))
+    return states / np.linalg.norm(states, axis=1)[:, None]
+
+
+def test_terms_match_dense_operators():
+    random_generator = random.Random(3)
+    no_qubits = 5
+    labels = ["".join(random_generator.choice("IXYZ") for _ in range(no_qubits)) for _ in range(40)]
+    # a large group of terms sharing their x mask uses the Walsh-Hadamard transform
+    labels += ["X" + "".join(random_generator.choice("IZ") for _ in range(no_qubits - 1)) for _ in range(20)]
+    observable = PauliSum([(label, random_generator.uniform(-1, 1)) for label in labels])
+    states = random_states(np.random.default_rng(1), 3, no_qubits)
+
+    values = observable.expectation_values(states)
+    assert values.shape == (3, len(labels))
+    expected = np.array([[dense_expectation(label, state) for label in labels] for state in states])
+    assert np.allclose(values, expected)
+    assert np.allclose(observable.expectation(states), expected.real @ observable.coefficients)
+    assert np.allclose(observable.expectation(states[0]), expected[0].real @ observable.coefficients)
+    assert observable.expectation(states).dtype == float
+
+
+def test_walsh_hadamard():
+    vectors = np.random.default_rng(0).normal(size=(8, 2))
+    signs = np.array([[(-1) ** bin(b & z).count("1") for b in range(8)] for z in range(8)])
+    assert np.allclose(walsh_hadamard(vectors), signs @ vectors)
+
+
+def test_simulated_states():
+    yaml_data = {"steps": [{"index": 0, "gates": [
+        {"name": "ry-theta", "targets": [0], "theta": "alpha"},
+        {"name": "pauli-x", "targets": [1], "controls": [{"target": 0, "state": "1"}]},
+    ]}]}
+    alphas = np.linspace(0, np.pi, 4)
+    simulator = StatevectorSimulator(2, 4).run(yaml_data, {"alpha": alphas})
+    observable = PauliSum({"ZZ": 1.0, "XX": 0.5, "IZ": 2.0})
+    assert np.allclose(simulator.expectation(observable), 1 + 0.5 * np.sin(alphas) + 2 * np.cos(alphas))
+
+
+def test_invalid_operators():
+    with pytest.raises(Exception):
+        PauliSum({"XA": 1.0})
+    with pytest.raises(Exception):
+        PauliSum({"XX": 1.0}).expectation(np.ones(8) / np.sqrt(8))
@@ -0,0 +1,90 @@
+"""Tests the batched statevector simulator."""
+
+import numpy as np
+import pytest
+
+from uranium_quantum.circuit_composer.circuit_composer import QuantumCircuit, Control, Parameter
+from uranium_quantum.circuit_composer.random_circuit_generator import generate_random_circuit
+from ..gates import circuit_gates
+from ..statevector import StatevectorSimulator
+from .test_clifford import statevector
+
+PARAMETRIC_GATES = [
+    ("rx-theta", 1, ("theta",)), ("ry-theta", 1, ("theta",)), ("rz-theta", 1, ("theta",)), ("p", 1, ("theta",)),
+    ("u3", 1, ("theta", "phi", "lambda")), ("xx", 2, ("theta",)), ("yy", 2, ("theta",)), ("zz", 2, ("theta",)),
+    ("swap-theta", 2, ("theta",)), ("xy", 2, ("theta",)), ("givens", 2, ("theta",)),
+]
+
+
+def parametric_gates():
+    """Gates taking angles given as parameters, with and without controls."""
+    gates = [{"name": "hadamard", "targets": [qubit]} for qubit in range(3)]
+    for index, (name, no_targets, angles) in enumerate(PARAMETRIC_GATES):
+        targets = [(index + offset) % 3 for offset in range(no_targets)]
+        gate = {"name": name, "targets": targets}
+        gate.update((angle, parameter) for angle, parameter in zip(angles, ("alpha", "beta", "gamma")))
+        if no_targets == 1:
+            gate["controls"] = [{"target": (index + 1) % 3, "state": "1" if index % 2 else "-"}]
+        gates.append(gate)
+    return gates
+
+
+def bound(gates, values):
+    return [{key: values[value] if isinstance(value, str) and key in ("theta", "phi", "lambda") else value for key, value in gate.items()}
+            for gate in gates]
+
+
+def test_batches_match_single_bindings():
+    gates = parametric_gates()
+    random_generator = np.random.default_rng(2)
+    bindings = {name: random_generator.uniform(-3, 3, 7) for name in ("alpha", "beta", "gamma")}
+    states = StatevectorSimulator.simulate({"steps": [{"index": 0, "gates": gates}]}, bindings)
+    assert states.shape == (7, 8)
+    for index in range(7):
+        values = {name: bindings[name][index] for name in bindings}
+        assert np.allclose(states[index], statevector(bound(gates, values), 3))
+
+
+def test_composer_circuits_and_shared_values():
+    quantum_circuit = QuantumCircuit(2)
+    quantum_circuit.gate_hadamard([], [0]).increment_step()
+    quantum_circuit.gate_rx_theta([Control(target=0, state='1')], [1], Parameter("alpha")).increment_step()
+    quantum_circuit.gate_zz([], [0, 1], Parameter("beta"))
+    alphas = np.linspace(0, np.pi, 5)
+    states = StatevectorSimulator.simulate(quantum_circuit, {"alpha": alphas, "beta": 0.3})
+    for alpha, state in zip(alphas, states):
+        expected = StatevectorSimulator.simulate(quantum_circuit.bind_parameters({"alpha": alpha, "beta": 0.3}))
+        assert np.allclose(state, expected[0])
+    probabilities = StatevectorSimulator(2, 5).run(quantum_circuit, {"alpha": alphas, "beta": 0.3}).probabilities()
+    assert np.allclose(probabilities.sum(axis=1), 1)
+    assert np.allclose(probabilities[:, 3], np.sin(alphas / 2) ** 2 / 2)
+
+
+def test_missing_and_mismatched_bindings():
+    yaml_data = {"steps": [{"index": 0, "gates": [{"name": "rx-theta", "targets": [0], "theta": "alpha"}]}]}
+    with pytest.raises(Exception, match="Parameter alpha has no value."):
+        StatevectorSimulator.simulate(yaml_data)
+    with pytest.raises(Exception, match="same number of values"):
+        StatevectorSimulator.simulate(yaml_data, {"alpha": [0.1, 0.2], "beta": [0.1, 0.2, 0.3]})
+    assert circuit_gates(yaml_data)[0]["theta"] == "alpha"
+
+
+def test_precisions():
+    quantum_circuit = generate_random_circuit(8, 120, seed=3)
+    reference = StatevectorSimulator.simulate(quantum_circuit, no_qubits=8)[0]
+    for precision, tolerance in (("single", 1e-4), ("mixed", 1e-6)):
+        simulator = StatevectorSimulator(8, precision=precision, norm_check_interval=10).run(quantum_circuit)
+        assert simulator.amplitudes.dtype == np.complex64
+        assert 1 - abs(np.vdot(reference, simulator.states[0])) ** 2 < tolerance
+        assert 0 < simulator.norm_drift < tolerance
+        assert np.allclose(simulator.norms(), 1, atol=tolerance)
+    simulator = StatevectorSimulator(8).run(quantum_circuit)
+    assert simulator.check_norm() < 1e-12
+    with pytest.raises(Exception, match="Unknown precision"):
+        StatevectorSimulator(2, precision="half")
+
+
+def test_random_circuits_are_repeatable():
+    first, same, other = (StatevectorSimulator.simulate(generate_random_circuit(6, 50, seed=seed), no_qubits=6) for seed in (7, 7, 8))
+    assert np.array_equal(first, same)
+    assert not np.allclose(first, other)
@@ -0,0 +1,7 @@
+"""This module rewrites quantum circuits into a basis of gates and routes
+them on the coupling maps of devices."""
+
+__all__ = ["BasisTranspiler", "CouplingMap", "Router"]
+
+from uranium_quantum.transpiler.basis_transpiler import BasisTranspiler
+from uranium_quantum.transpiler.routing import CouplingMap, Router
@@ -0,0 +1,216 @@
+"""Rewrites yaml circuits so that they only use the gates of a basis, such
+as {u3, cx} or {rz, sx, cx}. Exporters then emit native gates instead of
+unitary matrices downstream tools have to synthesize."""
+
+import functools
+
+import numpy as np
+
+from .gate_library import OPAQUE_GATES, H, X, ROTATION_TO_Y_BASIS, UNDO_ROTATION_TO_Y_BASIS, SX, gate_matrix, rz, u3
+from .synthesis import (
+    TOLERANCE, control_operations, inverse_operations, is_identity, merge_operations, qft_operations, two_qubit_unitary, zyz_angles,
+)
+
+SUPPORTED_BASES = (frozenset(["u3", "cx"]), frozenset(["rz", "sx", "cx"]))
+
+
+def parse_basis(basis):
+    """Get a basis from its gate names, given as a list or as a comma
+    separated string such as 'rz,sx,cx'."""
+    if isinstance(basis, str):
+        basis = basis.split(",")
+    basis = frozenset(name.strip().lower() for name in basis)
+    if basis not in SUPPORTED_BASES:
+        raise Exception(f"Basis {','.join(sorted(basis))} is not supported, use one of: " +
+                        ", ".join(",".join(sorted(supported)) for supported in SUPPORTED_BASES) + ".")
+    return basis
+
+
+def gate_key(gate):
+    """Identify what a decomposition depends on: the gate, its parameters,
+    its number of targets and the states of its controls, not the qubits."""
+    controls = tuple(str(control["state"]) for control in gate.get("controls") or [])
+    parameters = tuple(gate.get(key) for key in ("theta", "phi", "lambda", "root"))
+    return (gate["name"], len(gate["targets"]), controls) + parameters
+
+
+def one_qubit_gates(matrix, qubit, basis):
+    """Get the basis gates of a single qubit unitary and the global phase
+    they leave out."""
+    if is_identity(matrix):
+        return [], np.angle(np.trace(matrix))
+    if "u3" in basis:
+        _, phi, theta, lambda_ = (float(angle) for angle in zyz_angles(matrix))
+        gates = [("u3", qubit, theta, phi, lambda_)]
+        product = u3(theta, phi, lambda_)
+    elif abs(matrix[1, 0]) < TOLERANCE:
+        theta = float(np.angle(matrix[1, 1]) - np.angle(matrix[0, 0]))
+        gates = [("rz", qubit, theta)]
+        product = rz(theta)
+    else:
+        # Rz(phi) Ry(theta) Rz(lambda) is Rz(phi + pi) SX Rz(theta + pi) SX Rz(lambda) up to a phase
+        _, phi, theta, lambda_ = (float(angle) for angle in zyz_angles(matrix))
+        gates = []
+        product = np.eye(2)
+        for angle in (lambda_, None, theta + np.pi, None, phi + np.pi):
+            if angle is None:
+                gates.append(("sx", qubit))
+                product = SX @ product
+            else:
+                angle = float((angle + np.pi) % (2 * np.pi) - np.pi)
+                if abs(angle) > TOLERANCE:
+                    gates.append(("rz", qubit, angle))
+                    product = rz(angle) @ product
+    return gates, np.angle(np.trace(matrix @ product.conj().T))
+
+
+def control_basis_changes(states, first_control):
+    """Get the single qubit unitaries mapping each control state to state 1,
+    applied before the controlled gate, and the ones undoing them."""
+    before, after = [], []
+    for index, state in enumerate(states):
+        qubit = first_control + index
+        if "i" in state:
+            rotation, undo_rotation = ROTATION_TO_Y_BASIS, UNDO_ROTATION_TO_Y_BASIS
+        elif "+" in state or "-" in state:
+            rotation, undo_rotation = H, H
+        else:
+            rotation, undo_rotation = np.eye(2), np.eye(2)
+        if state in ("0", "+", "+i"):
+            rotation, undo_rotation = X @ rotation, undo_rotation @ X
+        before.append(("u", qubit, rotation))
+        after.append(("u", qubit, undo_rotation))
+    return before, after
+
+
+@functools.lru_cache(maxsize=4096)
+def decompose(key, basis):
+    """Decompose a gate identified by gate_key into basis gates acting on
+    local qubits, the targets first and then the controls. Returns the
+    gates and the global phase they leave out. Decompositions are memoized
+    per gate, parameters and control states."""
+    name, no_targets, control_states = key[:3]
+    theta, phi, lambda_, root = key[3:]
+    gate = {"name": name, "targets": list(range(no_targets)), "theta": theta, "phi": phi, "lambda": lambda_, "root": root}
+
+    if name in ("qft", "qft-dagger"):
+        operations = qft_operations(no_targets)
+        if name == "qft-dagger":
+            operations = inverse_operations(operations)
+    elif no_targets == 1:
+        operations = [("u", 0, gate_matrix(gate))]
+    elif no_targets == 2:
+        operations = two_qubit_unitary(gate_matrix(gate))
+    else:
+        raise Exception(f"Gate {name} with {no_targets} targets cannot be decomposed.")
+
+    if control_states:
+        before, after = control_basis_changes(control_states, no_targets)
+        controls = list(range(no_targets, no_targets + len(control_states)))
+        operations = before + control_operations(operations, controls) + after
+    operations = merge_operations(operations)
+
+    gates = []
+    global_phase = 0.0
+    for operation in operations:
+        if operation[0] == "u":
+            operation_gates, operation_phase = one_qubit_gates(operation[2], operation[1], basis)
+            gates += operation_gates
+            global_phase += operation_phase
+        else:
+            gates.append(operation)
+    return tuple(gates), float(global_phase)
+
+
+def basis_gate_yaml(gate, qubits):
+    """Get a yaml gate for a basis gate on local qubits."""
+    name = gate[0]
+    if name == "u3":
+        return {"name": "u3", "targets": [qubits[gate[1]]], "theta": gate[2], "phi": gate[3], "lambda": gate[4]}
+    if name == "rz":
+        return {"name": "rz-theta", "targets": [qubits[gate[1]]], "theta": gate[2]}
+    if name == "sx":
+        return {"name": "v", "targets": [qubits[gate[1]]]}
+    return {"name": "pauli-x", "targets": [qubits[gate[2]]], "controls": [{"target": qubits[gate[1]], "state": "1"}]}
+
+
+def gate_qubits(gate):
+    qubits = list(gate.get("targets") or [])
+    qubits += [control["target"] for control in gate.get("controls") or []]
+    for aggregated_gate in gate.get("gates") or []:
+        qubits += aggregated_gate["targets"]
+    return qubits
+
+
+def pack_layers(gates):
+    """Place gates, in order, into as few layers as possible with the gates
+    of a layer on distinct qubits. Gates after a barrier are placed in
+    layers after it."""
+    layers = []
+    next_layer = {}
+    floor = 0
+    for gate in gates:
+        qubits = gate_qubits(gate)
+        if gate["name"] == "barrier":
+            layer = max([floor] + list(next_layer.values()))
+            floor = layer + 1
+        else:
+            layer = max([floor] + [next_layer.get(qubit, 0) for qubit in qubits])
+        for qubit in qubits:
+            next_layer[qubit] = layer + 1
+        if layer == len(layers):
+            layers.append([])
+        layers[layer].append(gate)
+    return layers
+
+
+class BasisTranspiler:
+
+    """Rewrites every gate of yaml circuits, controlled gates included, into
+    the gates of a basis. Sub-circuits used as gates, measurements, barriers
+    and identity gates are kept as they are.
+
+    Gates are decomposed exactly: the global phase left out by the basis
+    gates is stored as the 'global_phase' of the circuit, it matters when
+    the circuit is used as a controlled gate."""
+
+    def __init__(self, basis):
+        self.basis = parse_basis(basis)
+
+    def transpile_gate(self, gate):
+        """Get the basis gates replacing a gate and the global phase they leave out."""
+        if gate["name"] in OPAQUE_GATES:
+            return [gate], 0.0
+        if gate["name"] == "aggregate":
+            gates, global_phase = [], 0.0
+            for aggregated_gate in gate["gates"]:
+                aggregated_gate = dict(aggregated_gate, controls=gate.get("controls") or [])
+                aggregated_gates, aggregated_phase = self.transpile_gate(aggregated_gate)
+                gates += aggregated_gates
+                global_phase += aggregated_phase
+            return gates, global_phase
+        basis_gates, global_phase = decompose(gate_key(gate), self.basis)
+        qubits = list(gate["targets"]) + [control["target"] for control in gate.get("controls") or []]
+        return [basis_gate_yaml(basis_gate, qubits) for basis_gate in basis_gates], global_phase
+
+    def transpile_circuit(self, yaml_data):
+        """Get a copy of a yaml circuit using only basis gates. Each step is
+        replaced by as many steps as needed to keep the gates of a step on
+        distinct qubits."""
+        steps = []
+        global_phase = float(yaml_data.get("global_phase") or 0.0)
+        for step in yaml_data.get("steps") or []:
+            basis_gates = []
+            for gate in step.get("gates") or []:
+                gates, gate_phase = self.transpile_gate(gate)
+                basis_gates += gates
+                global_phase += gate_phase
+            for layer in pack_layers(basis_gates):
+                steps.append({"index": len(steps), "gates": layer})
+
+        transpiled = {key: value for key, value in yaml_data.items() if key not in ("steps", "global_phase")}
+        transpiled["steps"] = steps
+        global_phase = (global_phase + np.pi) % (2 * np.pi) - np.pi
+        if abs(global_phase) > TOLERANCE:
+            transpiled["global_phase"] = float(global_phase)
+        return transpiled
@@ -0,0 +1,254 @@
+"""Unitary matrices of the gates in the Uranium gate catalogue, as numpy
+arrays. Matrices follow the conventions of the qiskit exporter: the first
+target is the least significant qubit of a matrix index.
+
+Angles of parametric gates may also be arrays of values, one per binding of
+the parameters of a circuit: the matrix is then a stack of matrices, of
+shape (bindings, d, d)."""
+
+import numpy as np
+
+SQRT_2 = np.sqrt(2)
+
+I2 = np.eye(2, dtype=complex)
+X = np.array([[0, 1], [1, 0]], dtype=complex)
+Y = np.array([[0, -1j], [1j, 0]], dtype=complex)
+Z = np.array([[1, 0], [0, -1]], dtype=complex)
+H = np.array([[1, 1], [1, -1]], dtype=complex) / SQRT_2
+SX = np.array([[1 + 1j, 1 - 1j], [1 - 1j, 1 + 1j]], dtype=complex) / 2
+
+# basis changes applied to controls in state +/- and +i/-i
+ROTATION_TO_Y_BASIS = np.array([[1, 1], [1j, -1j]], dtype=complex) / SQRT_2
+UNDO_ROTATION_TO_Y_BASIS = np.array([[1, -1j], [1, 1j]], dtype=complex) / SQRT_2
+
+# gates which are not unitary or are not decomposed
+OPAQUE_GATES = ("circuit", "barrier", "measure-x", "measure-y", "measure-z", "identity")
+
+
+def get_root(root):
+    """Get the root degree from a root written as 1/2^k or 1/t."""
+    root = str(root)
+    degree = root[4:] if '^' in root else root[2:]
+    degree = float(degree) if '.' in degree else int(degree)
+    return 2 ** degree if '^' in root else degree
+
+
+def angle(value):
+    """Get an angle of a yaml gate as a number, or an array of numbers."""
+    if isinstance(value, np.ndarray):
+        return value.astype(float, copy=False)
+    return float(value)
+
+
+def matrix(rows):
+    """Build a matrix from entries which are numbers or arrays of one value
+    per binding, the result is a stack of matrices when entries are arrays."""
+    try:
+        # entries all numbers, or all arrays of the same shape
+        result = np.array(rows, dtype=complex)
+        return np.moveaxis(result, (0, 1), (-2, -1)) if result.ndim > 2 else result
+    except ValueError:
+        pass
+    entries = np.broadcast_arrays(*(np.asarray(entry, dtype=complex) for row in rows for entry in row))
+    return np.stack(entries, axis=-1).reshape(entries[0].shape + (len(rows), len(rows)))
+
+
+def u3(theta, phi, lambda_):
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    return matrix([
+        [cos, -np.exp(1j * lambda_) * sin],
+        [np.exp(1j * phi) * sin, np.exp(1j * (phi + lambda_)) * cos],
+    ])
+
+
+def phase(lambda_):
+    return matrix([[1, 0], [0, np.exp(1j * lambda_)]])
+
+
+def rx(theta):
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    return matrix([[cos, -1j * sin], [-1j * sin, cos]])
+
+
+def ry(theta):
+    cos, sin = np.cos(theta / 2), np.sin(theta / 2)
+    return matrix([[cos, -sin], [sin, cos]])
+
+
+def rz(theta):
+    return matrix([[np.exp(-0.5j * theta), 0], [0, np.exp(0.5j * theta)]])
+
+
+def pauli_root(pauli, root, dagger):
+    angle = np.pi / (2 * root)
+    if pauli == "z":
+        return np.exp(1j * angle) * phase(-2 * angle if dagger else 2 * angle)
+    sign = 1 if dagger else -1
+    off_diagonal = sign * 1j * np.sin(angle) if pauli == "x" else np.sin(angle)
+    # the y root and its dagger share the same matrix in the exporters
+    return np.exp(1j * angle) * np.array([
+        [np.cos(angle), off_diagonal if pauli == "x" else -off_diagonal],
+        [off_diagonal, np.cos(angle)],
+    ], dtype=complex)
+
+
+def two_qubit_rotation(pauli_1, pauli_0, theta):
+    """exp(-i theta/2 P1 P0), with P0 acting on the first target."""
+    if np.ndim(theta):
+        theta = theta[..., None, None]
+    return np.cos(theta / 2) * np.eye(4) - 1j * np.sin(theta / 2) * np.kron(pauli_1, pauli_0)
+
+
+def swap_root(root, dagger):
+    angle = -np.pi / (2 * root) if dagger else np.pi / (2 * root)
+    return np.exp(-0.5j * angle) * np.array([
+        [np.exp(1j * angle), 0, 0, 0],
+        [0, np.cos(angle), 1j * np.sin(angle), 0],
+        [0, 1j * np.sin(angle), np.cos(angle), 0],
+        [0, 0, 0, np.exp(1j * angle)],
+    ], dtype=complex)
+
+
+def qft(no_qubits):
+    size = 2 ** no_qubits
+    indices = np.arange(size)
+    return np.exp(2j * np.pi * np.outer(indices, indices) / size) / np.sqrt(size)
+
+
+COS_PI_8, SIN_PI_8 = np.cos(np.pi / 8), np.sin(np.pi / 8)
+COS_3_PI_8, SIN_3_PI_8 = np.cos(3 * np.pi / 8), np.sin(3 * np.pi / 8)
+
+FIXED_GATES = {
+    "hadamard": H,
+    "hadamard-zx": H,
+    "hadamard-xy": np.array([[0, 1 + 1j], [1 - 1j, 0]], dtype=complex) / SQRT_2,
+    "hadamard-yz": np.array([[1, -1j], [1j, -1]], dtype=complex) / SQRT_2,
+    "pauli-x": X,
+    "pauli-y": Y,
+    "pauli-z": Z,
+    "t": phase(np.pi / 4),
+    "t-dagger": phase(-np.pi / 4),
+    "s": phase(np.pi / 2),
+    "s-dagger": phase(-np.pi / 2),
+    "v": SX,
+    "v-dagger": SX.conj().T,
+    "h": np.array([[1, -1], [1, 1]], dtype=complex) / SQRT_2,
+    "h-dagger": np.array([[1, 1], [-1, 1]], dtype=complex) / SQRT_2,
+    "c": np.array([[1 - 1j, -1 - 1j], [1 - 1j, 1 + 1j]], dtype=complex) / 2,
+    "c-dagger": np.array([[1 + 1j, 1 + 1j], [-1 + 1j, 1 - 1j]], dtype=complex) / 2,
+    "swap": np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex),
+    "iswap": np.array([[1, 0, 0, 0], [0, 0, 1j, 0], [0, 1j, 0, 0], [0, 0, 0, 1]], dtype=complex),
+    "fswap": np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, -1]], dtype=complex),
+    "sqrt-swap": np.array([
+        [1, 0, 0, 0], [0, (1 + 1j) / 2, (1 - 1j) / 2, 0], [0, (1 - 1j) / 2, (1 + 1j) / 2, 0], [0, 0, 0, 1],
+    ], dtype=complex),
+    "sqrt-swap-dagger": np.array([
+        [1, 0, 0, 0], [0, (1 - 1j) / 2, (1 + 1j) / 2, 0], [0, (1 + 1j) / 2, (1 - 1j) / 2, 0], [0, 0, 0, 1],
+    ], dtype=complex),
+    "molmer-sorensen": np.array([[1, 0, 0, 1j], [0, 1, 1j, 0], [0, 1j, 1, 0], [1j, 0, 0, 1]], dtype=complex) / SQRT_2,
+    "molmer-sorensen-dagger": np.array([[1, 0, 0, -1j], [0, 1, -1j, 0], [0, -1j, 1, 0], [-1j, 0, 0, 1]], dtype=complex) / SQRT_2,
+    "berkeley": np.array([
+        [COS_PI_8, 0, 0, 1j * SIN_PI_8],
+        [0, COS_3_PI_8, 1j * SIN_3_PI_8, 0],
+        [0, 1j * SIN_3_PI_8, COS_3_PI_8, 0],
+        [1j * SIN_PI_8, 0, 0, COS_PI_8],
+    ], dtype=complex),
+    "berkeley-dagger": np.array([
+        [COS_PI_8, 0, 0, -1j * SIN_PI_8],
+        [0, COS_3_PI_8, -1j * SIN_3_PI_8, 0],
+        [0, -1j * SIN_3_PI_8, COS_3_PI_8, 0],
+        [-1j * SIN_PI_8, 0, 0, COS_PI_8],
+    ], dtype=complex),
+    "ecp": np.array([
+        [2 * COS_PI_8, 0, 0, -2j * SIN_PI_8],
+        [0, (1 + 1j) * (COS_PI_8 - SIN_PI_8), (1 - 1j) * (COS_PI_8 + SIN_PI_8), 0],
+        [0, (1 - 1j) * (COS_PI_8 + SIN_PI_8), (1 + 1j) * (COS_PI_8 - SIN_PI_8), 0],
+        [-2j * SIN_PI_8, 0, 0, 2 * COS_PI_8],
+    ], dtype=complex) / 2,
+    "ecp-dagger": np.array([
+        [2 * COS_PI_8, 0, 0, 2j * SIN_PI_8],
+        [0, (1 - 1j) * (COS_PI_8 - SIN_PI_8), (1 + 1j) * (COS_PI_8 + SIN_PI_8), 0],
+        [0, (1 + 1j) * (COS_PI_8 + SIN_PI_8), (1 - 1j) * (COS_PI_8 - SIN_PI_8), 0],
+        [2j * SIN_PI_8, 0, 0, 2 * COS_PI_8],
+    ], dtype=complex) / 2,
+    "w": np.array([
+        [1, 0, 0, 0], [0, 1 / SQRT_2, 1 / SQRT_2, 0], [0, 1 / SQRT_2, -1 / SQRT_2, 0], [0, 0, 0, 1],
+    ], dtype=complex),
+    "magic": np.array([[1, 1j, 0, 0], [0, 0, 1j, 1], [0, 0, 1j, -1], [1, -1j, 0, 0]], dtype=complex) / SQRT_2,
+    "magic-dagger": np.array([[1, 0, 0, 1], [-1j, 0, 0, 1j], [0, -1j, -1j, 0], [0, 1, -1, 0]], dtype=complex) / SQRT_2,
+}
+
+PARAMETRIC_GATES = {
+    "u3": lambda gate: u3(angle(gate["theta"]), angle(gate["phi"]), angle(gate["lambda"])),
+    "u2": lambda gate: u3(np.pi / 2, angle(gate["phi"]), angle(gate["lambda"])),
+    "u1": lambda gate: phase(angle(gate["lambda"])),
+    "p": lambda gate: phase(angle(gate["theta"])),
+    "rx-theta": lambda gate: rx(angle(gate["theta"])),
+    "ry-theta": lambda gate: ry(angle(gate["theta"])),
+    "rz-theta": lambda gate: rz(angle(gate["theta"])),
+    "pauli-x-root": lambda gate: pauli_root("x", get_root(gate["root"]), False),
+    "pauli-y-root": lambda gate: pauli_root("y", get_root(gate["root"]), False),
+    "pauli-z-root": lambda gate: pauli_root("z", get_root(gate["root"]), False),
+    "pauli-x-root-dagger": lambda gate: pauli_root("x", get_root(gate["root"]), True),
+    "pauli-y-root-dagger": lambda gate: pauli_root("y", get_root(gate["root"]), True),
+    "pauli-z-root-dagger": lambda gate: pauli_root("z", get_root(gate["root"]), True),
+    "swap-root": lambda gate: swap_root(get_root(gate["root"]), False),
+    "swap-root-dagger": lambda gate: swap_root(get_root(gate["root"]), True),
+    "swap-theta": lambda gate: matrix([
+        [1, 0, 0, 0],
+        [0, 0, np.exp(1j * angle(gate["theta"])), 0],
+        [0, np.exp(1j * angle(gate["theta"])), 0, 0],
+        [0, 0, 0, 1],
+    ]),
+    "xx": lambda gate: two_qubit_rotation(X, X, angle(gate["theta"])),
+    "yy": lambda gate: two_qubit_rotation(Y, Y, angle(gate["theta"])),
+    "zz": lambda gate: two_qubit_rotation(Z, Z, angle(gate["theta"])),
+    "cross-resonance": lambda gate: two_qubit_rotation(X, Z, angle(gate["theta"])),
+    "cross-resonance-dagger": lambda gate: two_qubit_rotation(X, Z, -angle(gate["theta"])),
+    "xy": lambda gate: matrix([
+        [1, 0, 0, 0],
+        [0, np.cos(angle(gate["theta"])), -1j * np.sin(angle(gate["theta"])), 0],
+        [0, -1j * np.sin(angle(gate["theta"])), np.cos(angle(gate["theta"])), 0],
+        [0, 0, 0, 1],
+    ]),
+    "givens": lambda gate: matrix([
+        [1, 0, 0, 0],
+        [0, np.cos(angle(gate["theta"])), -np.sin(angle(gate["theta"])), 0],
+        [0, np.sin(angle(gate["theta"])), np.cos(angle(gate["theta"])), 0],
+        [0, 0, 0, 1],
+    ]),
+    "a": lambda gate: matrix([
+        [1, 0, 0, 0],
+        [0, np.cos(angle(gate["theta"])), np.sin(angle(gate["theta"])) * np.exp(1j * angle(gate["phi"])), 0],
+        [0, np.sin(angle(gate["theta"])) * np.exp(-1j * angle(gate["phi"])), -np.cos(angle(gate["theta"])), 0],
+        [0, 0, 0, 1],
+    ]),
+    "qft": lambda gate: qft(len(gate["targets"])),
+    "qft-dagger": lambda gate: qft(len(gate["targets"])).conj().T,
+}
+
+
+def gate_matrix(gate):
+    """Get the unitary matrix of a yaml gate, leaving out its controls."""
+    name = gate["name"]
+    if name in FIXED_GATES:
+        return FIXED_GATES[name]
+    if name in PARAMETRIC_GATES:
+        return PARAMETRIC_GATES[name](gate)
+    raise Exception(f"Gate {name} has no unitary matrix.")
+
+
+# angles enter the matrices above as e^(+-i a / 2) and e^(+-i a) at most, so
+# the derivative of a matrix with respect to an angle is exactly a weighted
+# sum of the matrix at four shifted angles (a general parameter shift rule)
+DERIVATIVE_SHIFTS = [(2 * index - 1) * np.pi / 2 for index in range(1, 5)]
+DERIVATIVE_WEIGHTS = [(-1) ** (index - 1) / (16 * np.sin((2 * index - 1) * np.pi / 8) ** 2) for index in range(1, 5)]
+
+
+def gate_matrix_derivative(gate, key):
+    """Get the derivative of the unitary matrix of a yaml gate, leaving out
+    its controls, with respect to one of its angles: theta, phi or lambda."""
+    if gate["name"] not in PARAMETRIC_GATES or key not in gate:
+        raise Exception(f"Gate {gate['name']} has no angle {key}.")
+    value = angle(gate[key])
+    return sum(weight * gate_matrix({**gate, key: value + shift}) for shift, weight in zip(DERIVATIVE_SHIFTS, DERIVATIVE_WEIGHTS))
@@ -0,0 +1,303 @@
+"""Maps the qubits of yaml circuits onto the qubits of a device, inserting
+swap gates so that every two qubit gate acts on qubits coupled on the
+device.
+
+Swap gates are chosen with the lookahead heuristic of SABRE (Li, Ding and
+Xie, 2019): among the swaps touching the gates blocked on uncoupled qubits,
+pick the one bringing these gates, and to a lesser extent the gates coming
+after them, the closest together. Distances between qubits of the device are
+computed once, so routing takes time roughly linear in the number of gates."""
+
+from .basis_transpiler import gate_qubits, pack_layers
+
+
+class CouplingMap:
+
+    """Undirected graph of the qubits of a device coupled to each other,
+    with the distances between all pairs of qubits."""
+
+    def __init__(self, edges, no_qubits=None):
+        edges = [(int(first), int(second)) for first, second in edges]
+        if no_qubits is None:
+            no_qubits = max(max(edge) for edge in edges) + 1 if edges else 1
+        self.no_qubits = no_qubits
+        neighbors = [set() for _ in range(no_qubits)]
+        for first, second in edges:
+            if first == second or not (0 <= first < no_qubits and 0 <= second < no_qubits):
+                raise Exception(f"Invalid coupling between qubits {first} and {second}.")
+            neighbors[first].add(second)
+            neighbors[second].add(first)
+        self.neighbors = [sorted(qubit_neighbors) for qubit_neighbors in neighbors]
+        self.distances = [self._distances_from(qubit) for qubit in range(no_qubits)]
+        self.diameter = max(max(row) for row in self.distances)
+
+    @classmethod
+    def line(cls, no_qubits):
+        return cls([(qubit, qubit + 1) for qubit in range(no_qubits - 1)], no_qubits)
+
+    @classmethod
+    def grid(cls, rows, columns):
+        edges = []
+        for row in range(rows):
+            for column in range(columns):
+                qubit = row * columns + column
+                if column + 1 < columns:
+                    edges.append((qubit, qubit + 1))
+                if row + 1 < rows:
+                    edges.append((qubit, qubit + columns))
+        return cls(edges, rows * columns)
+
+    def _distances_from(self, source):
+        """Breadth first search of the distances from a qubit."""
+        distances = [-1] * self.no_qubits
+        distances[source] = 0
+        frontier = [source]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for qubit in frontier:
+                for neighbor in self.neighbors[qubit]:
+                    if distances[neighbor] < 0:
+                        distances[neighbor] = distance
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        if -1 in distances:
+            raise Exception("The coupling map is not connected.")
+        return distances
+
+
+def remap_gate(gate, layout):
+    """Get a copy of a gate acting on the physical qubits of its logical qubits."""
+    remapped = dict(gate)
+    if "targets" in gate:
+        remapped["targets"] = [layout[qubit] for qubit in gate["targets"]]
+    if gate.get("controls"):
+        remapped["controls"] = [dict(control, target=layout[control["target"]]) for control in gate["controls"]]
+    if gate.get("gates"):
+        remapped["gates"] = [dict(aggregated_gate, targets=[layout[qubit] for qubit in aggregated_gate["targets"]]) for aggregated_gate in gate["gates"]]
+    return remapped
+
+
+class Router:
+
+    """Routes yaml circuits on a coupling map.
+
+    lookahead is the number of two qubit gates following the blocked ones
+    taken into account when choosing a swap, weighted by extended_weight.
+    Qubits swapped recently are penalized by decay_rate, so that swaps on
+    distinct qubits, which can run in parallel, are preferred; penalties are
+    cleared after decay_reset swaps or when a gate can run."""
+
+    def __init__(self, coupling_map, lookahead=20, extended_weight=0.5, decay_rate=0.001, decay_reset=5):
+        self.coupling_map = coupling_map
+        self.lookahead = lookahead
+        self.extended_weight = extended_weight
+        self.decay_rate = decay_rate
+        self.decay_reset = decay_reset
+        # the heuristic may cycle, after that many rounds of swaps the closest
+        # blocked gate is routed along a shortest path
+        self.max_rounds_without_progress = 3 * coupling_map.diameter + 10
+
+    def route(self, yaml_data, initial_layout=None):
+        """Get a copy of a yaml circuit acting on physical qubits, with swap
+        gates inserted, and the final layout: the physical qubit of each
+        logical qubit at the end of the circuit. The initial layout gives the
+        physical qubit of each logical qubit, the identity by default.
+
+        Gates must act on at most two qubits, barriers excepted: transpile
+        circuits with a BasisTranspiler before routing them."""
+        distances = self.coupling_map.distances
+        neighbors = self.coupling_map.neighbors
+        no_physical = self.coupling_map.no_qubits
+
+        gates = [gate for step in yaml_data.get("steps") or [] for gate in step.get("gates") or []]
+        gates_qubits = [list(dict.fromkeys(gate_qubits(gate))) for gate in gates]
+        no_logical = max([max(qubits) + 1 for qubits in gates_qubits if qubits] + [len(initial_layout or [])])
+        if no_logical > no_physical:
+            raise Exception(f"The circuit uses {no_logical} qubits, the coupling map has {no_physical}.")
+        # pairs of logical qubits which have to be coupled for each gate
+        pairs = []
+        for gate, qubits in zip(gates, gates_qubits):
+            if gate["name"] == "barrier":
+                if not qubits:
+                    qubits[:] = range(no_logical)
+                pairs.append(None)
+            elif len(qubits) > 2:
+                raise Exception(f"Gate {gate['name']} acts on {len(qubits)} qubits, transpile the circuit "
+                                "with a BasisTranspiler before routing it.")
+            else:
+                pairs.append(tuple(qubits) if len(qubits) == 2 else None)
+
+        layout = list(initial_layout) if initial_layout is not None else list(range(no_logical))
+        if len(layout) != no_logical or len(set(layout)) != len(layout) or not all(0 <= qubit < no_physical for qubit in layout):
+            raise Exception("The initial layout must map logical qubits to distinct physical qubits.")
+        # unused physical qubits hold idle logical qubits, the layout is a permutation
+        used = set(layout)
+        layout += [qubit for qubit in range(no_physical) if qubit not in used]
+        physical = [0] * no_physical
+        for logical_qubit, physical_qubit in enumerate(layout):
+            physical[physical_qubit] = logical_qubit
+
+        # gates of each logical qubit in order, a gate can run once it is
+        # the next gate of all its qubits
+        queues = [[] for _ in range(no_physical)]
+        for index, qubits in enumerate(gates_qubits):
+            for qubit in qubits:
+                queues[qubit].append(index)
+        heads = [0] * no_physical
+        waiting = [len(qubits) for qubits in gates_qubits]
+        ready = []
+        for queue in queues:
+            if queue:
+                waiting[queue[0]] -= 1
+                if waiting[queue[0]] == 0:
+                    ready.append(queue[0])
+        ready.reverse()
+
+        routed = []
+        # blocked gates, a blocked gate is the next gate of both its qubits
+        front = {}
+        front_of = {}
+        decay = [1.0] * no_physical
+        rounds_since_reset = 0
+        rounds_without_progress = 0
+        extended = None
+
+        def swap(first, second):
+            first_logical, second_logical = physical[first], physical[second]
+            physical[first], physical[second] = second_logical, first_logical
+            layout[first_logical], layout[second_logical] = second, first
+            decay[first] += self.decay_rate
+            decay[second] += self.decay_rate
+            routed.append({"name": "swap", "targets": [first, second]})
+            # blocked gates on the swapped qubits may be able to run now
+            for logical_qubit in (first_logical, second_logical):
+                index = front_of.get(logical_qubit)
+                if index is not None and distances[layout[front[index][0]]][layout[front[index][1]]] == 1:
+                    del front[index], front_of[pairs[index][0]], front_of[pairs[index][1]]
+                    ready.append(index)
+
+        while True:
+            progress = False
+            while ready:
+                index = ready.pop()
+                pair = pairs[index]
+                if pair is not None and distances[layout[pair[0]]][layout[pair[1]]] != 1:
+                    front[index] = pair
+                    front_of[pair[0]] = front_of[pair[1]] = index
+                    continue
+                progress = True
+                routed.append(remap_gate(gates[index], layout))
+                for qubit in gates_qubits[index]:
+                    heads[qubit] += 1
+                    if heads[qubit] < len(queues[qubit]):
+                        following = queues[qubit][heads[qubit]]
+                        waiting[following] -= 1
+                        if waiting[following] == 0:
+                            ready.append(following)
+            if not front:
+                break
+
+            if progress or extended is None:
+                extended = self._extended_set(front, pairs, queues, heads)
+                decay = [1.0] * no_physical
+                rounds_since_reset = rounds_without_progress = 0
+            elif rounds_since_reset >= self.decay_reset:
+                decay = [1.0] * no_physical
+                rounds_since_reset = 0
+
+            if rounds_without_progress >= self.max_rounds_without_progress:
+                # route the closest blocked gate along a shortest path
+                first, second = min(front.values(), key=lambda pair: (distances[layout[pair[0]]][layout[pair[1]]], pair))
+                while distances[layout[first]][layout[second]] > 1:
+                    current, goal = layout[first], layout[second]
+                    closer = next(neighbor for neighbor in neighbors[current] if distances[neighbor][goal] < distances[current][goal])
+                    swap(current, closer)
+                continue
+
+            for first, second in self._best_swaps(front, extended, pairs, layout, physical, decay):
+                swap(first, second)
+            rounds_since_reset += 1
+            rounds_without_progress += 1
+
+        routed_data = {key: value for key, value in yaml_data.items() if key != "steps"}
+        routed_data["steps"] = [{"index": index, "gates": layer} for index, layer in enumerate(pack_layers(routed))]
+        return routed_data, layout[:no_logical]
+
+    def _extended_set(self, front, pairs, queues, heads):
+        """Get the next two qubit gates following the blocked ones."""
+        extended = []
+        seen = set(front)
+        for pair in front.values():
+            for qubit in pair:
+                queue = queues[qubit]
+                for position in range(heads[qubit] + 1, len(queue)):
+                    if len(extended) >= self.lookahead:
+                        return extended
+                    index = queue[position]
+                    if pairs[index] is not None and index not in seen:
+                        seen.add(index)
+                        extended.append(index)
+        return extended
+
+    def _best_swaps(self, front, extended, pairs, layout, physical, decay):
+        """Get the swap with the lowest score, followed by the swaps bringing
+        blocked gates closer which are independent of the swaps already
+        chosen: they touch other qubits and other gates, so their scores add
+        up. Large circuits have many blocked gates, choosing several swaps at
+        once keeps the number of scoring rounds low.
+
+        Scores are computed incrementally, from the gates touching the swapped
+        qubits only."""
+        distances = self.coupling_map.distances
+        neighbors = self.coupling_map.neighbors
+
+        # weighted gates of each logical qubit
+        weighted_gates = {}
+        base = 0.0
+        front_weight = 1.0 / len(front)
+        extended_weight = self.extended_weight / max(len(extended), 1)
+        for indices, weight in ((front, front_weight), (extended, extended_weight)):
+            for index in indices:
+                qubit_a, qubit_b = pairs[index]
+                base += weight * distances[layout[qubit_a]][layout[qubit_b]]
+                weighted_gates.setdefault(qubit_a, []).append((index, weight))
+                weighted_gates.setdefault(qubit_b, []).append((index, weight))
+
+        candidates = set()
+        for qubit_a, qubit_b in front.values():
+            for qubit in (qubit_a, qubit_b):
+                current = layout[qubit]
+                for neighbor in neighbors[current]:
+                    candidates.add((current, neighbor) if current < neighbor else (neighbor, current))
+
+        scored = []
+        for first, second in candidates:
+            delta = front_delta = 0.0
+            for logical_qubit in (physical[first], physical[second]):
+                for index, weight in weighted_gates.get(logical_qubit, ()):
+                    qubit_a, qubit_b = pairs[index]
+                    physical_a, physical_b = layout[qubit_a], layout[qubit_b]
+                    swapped_a = second if physical_a == first else first if physical_a == second else physical_a
+                    swapped_b = second if physical_b == first else first if physical_b == second else physical_b
+                    change = weight * (distances[swapped_a][swapped_b] - distances[physical_a][physical_b])
+                    delta += change
+                    if index in front:
+                        front_delta += change
+            scored.append(((base + delta) * max(decay[first], decay[second]), first, second, front_delta))
+        scored.sort()
+
+        swaps = [scored[0][1:3]]
+        used_qubits = set(scored[0][1:3])
+        used_gates = {index for qubit in scored[0][1:3] for index, _ in weighted_gates.get(physical[qubit], ())}
+        for _, first, second, front_delta in scored[1:]:
+            if front_delta >= 0 or first in used_qubits or second in used_qubits:
+                continue
+            touched = {index for qubit in (first, second) for index, _ in weighted_gates.get(physical[qubit], ())}
+            if touched & used_gates:
+                continue
+            swaps.append((first, second))
+            used_qubits.update((first, second))
+            used_gates |= touched
+        return swaps
@@ -0,0 +1,254 @@
+"""Exact decompositions of unitaries and controlled unitaries into single
+qubit unitaries and CX gates.
+
+Decompositions are lists of operations on local qubit indices, either
+("u", qubit, 2x2 unitary) or ("cx", control, target). Their product is
+exactly the decomposed unitary, global phase included, so decompositions
+can be controlled again."""
+
+import numpy as np
+
+from .gate_library import I2, X, H, phase, ry, rz
+
+S = phase(np.pi / 2)
+
+TOLERANCE = 1e-9
+
+# two qubit matrices, the first qubit of an operation is the least significant
+MAGIC_BASIS = np.array([[1, 0, 0, 1j], [0, 1j, 1, 0], [0, 1j, -1, 0], [1, 0, 0, -1j]], dtype=complex) / np.sqrt(2)
+PAULI_PRODUCTS = [np.kron(pauli, pauli) for pauli in (X, np.array([[0, -1j], [1j, 0]]), np.diag([1, -1]).astype(complex))]
+# XX, YY and ZZ are diagonal in the magic basis
+MAGIC_DIAGONALS = np.array([np.real(np.diag(MAGIC_BASIS.conj().T @ product @ MAGIC_BASIS)) for product in PAULI_PRODUCTS] + [np.ones(4)])
+
+
+def is_identity(matrix):
+    """Check whether a unitary is the identity up to a global phase."""
+    return abs(abs(np.trace(matrix)) - len(matrix)) < TOLERANCE
+
+
+def unitary_sqrt(matrix):
+    """Get a square root of a 2x2 unitary."""
+    determinant_root = np.sqrt(np.linalg.det(matrix) + 0j)
+    trace = np.trace(matrix)
+    if abs(trace + 2 * determinant_root) < abs(trace - 2 * determinant_root):
+        determinant_root = -determinant_root
+    return (matrix + determinant_root * I2) / np.sqrt(trace + 2 * determinant_root)
+
+
+def zyz_angles(matrix):
+    """Get (alpha, beta, gamma, delta) with matrix equal to
+    exp(i alpha) Rz(beta) Ry(gamma) Rz(delta)."""
+    alpha = np.angle(np.linalg.det(matrix)) / 2
+    special = np.exp(-1j * alpha) * matrix
+    gamma = 2 * np.arctan2(abs(special[1, 0]), abs(special[0, 0]))
+    sum_angle = 2 * np.angle(special[1, 1])
+    difference_angle = 2 * np.angle(special[1, 0])
+    return alpha, (sum_angle + difference_angle) / 2, gamma, (sum_angle - difference_angle) / 2
+
+
+def operations_matrix(operations, no_qubits):
+    """Get the unitary of a list of operations, used to check decompositions."""
+    size = 2 ** no_qubits
+    result = np.eye(size, dtype=complex)
+    indices = np.arange(size)
+    for operation in operations:
+        if operation[0] == "u":
+            _, qubit, matrix = operation
+            full = np.zeros((size, size), dtype=complex)
+            bits = (indices >> qubit) & 1
+            for row in (0, 1):
+                for column in (0, 1):
+                    mask = bits == column
+                    full[indices[mask] ^ ((column ^ row) << qubit), indices[mask]] = matrix[row, column]
+        else:
+            _, control, target = operation
+            full = np.eye(size, dtype=complex)[:, indices ^ (((indices >> control) & 1) << target)]
+        result = full @ result
+    return result
+
+
+def controlled_x(controls, target):
+    """Decompose an X gate with any number of controls, all in state 1."""
+    if len(controls) == 1:
+        return [("cx", controls[0], target)]
+    if len(controls) == 2:
+        first, second = controls
+        t, t_dagger = phase(np.pi / 4), phase(-np.pi / 4)
+        return [
+            ("u", target, H), ("cx", second, target), ("u", target, t_dagger), ("cx", first, target),
+            ("u", target, t), ("cx", second, target), ("u", target, t_dagger), ("cx", first, target),
+            ("u", second, t), ("u", target, H @ t), ("cx", first, second),
+            ("u", first, t), ("u", second, t_dagger), ("cx", first, second),
+        ]
+    return controlled_unitary(X, controls, target)
+
+
+def controlled_unitary(matrix, controls, target):
+    """Decompose a single qubit unitary with any number of controls, all in
+    state 1. One control uses two CX gates, more controls are removed one at
+    a time with square roots of the unitary (Barenco et al., lemma 7.8), so
+    the number of CX gates grows quickly with the number of controls."""
+    if not controls:
+        return [("u", target, matrix)]
+    if len(controls) == 1:
+        control = controls[0]
+        # X, Z and Y need a single CX
+        for basis_change in (I2, H, S):
+            if np.allclose(matrix, basis_change @ X @ basis_change.conj().T, atol=TOLERANCE):
+                return [("u", target, basis_change.conj().T), ("cx", control, target), ("u", target, basis_change)]
+        alpha, beta, gamma, delta = zyz_angles(matrix)
+        return [
+            ("u", target, rz((delta - beta) / 2)),
+            ("cx", control, target),
+            ("u", target, ry(-gamma / 2) @ rz(-(delta + beta) / 2)),
+            ("cx", control, target),
+            ("u", target, rz(beta) @ ry(gamma / 2)),
+            ("u", control, phase(alpha)),
+        ]
+    *other_controls, last_control = controls
+    root = unitary_sqrt(matrix)
+    return (
+        controlled_unitary(root, [last_control], target)
+        + controlled_x(other_controls, last_control)
+        + controlled_unitary(root.conj().T, [last_control], target)
+        + controlled_x(other_controls, last_control)
+        + controlled_unitary(root, other_controls, target)
+    )
+
+
+def control_operations(operations, controls):
+    """Control each operation of a decomposition."""
+    controlled = []
+    for operation in operations:
+        if operation[0] == "u":
+            controlled += controlled_unitary(operation[2], controls, operation[1])
+        else:
+            controlled += controlled_x(list(controls) + [operation[1]], operation[2])
+    return controlled
+
+
+def kronecker_factors(matrix):
+    """Split a 4x4 unitary which is a tensor product into (first qubit,
+    second qubit) factors, their product being exactly the matrix."""
+    tensor = matrix.reshape(2, 2, 2, 2).transpose(0, 2, 1, 3).reshape(4, 4)
+    left, values, right = np.linalg.svd(tensor)
+    second = np.sqrt(values[0]) * left[:, 0].reshape(2, 2)
+    first = np.sqrt(values[0]) * right[0, :].reshape(2, 2)
+    return first, second
+
+
+def diagonalize_symmetric_unitary(matrix):
+    """Get a real orthogonal matrix with determinant 1 diagonalizing a
+    complex symmetric unitary: its real and imaginary parts commute and are
+    diagonalized together through a generic real combination of both."""
+    random = np.random.default_rng(0)
+    for _ in range(100):
+        weight = random.uniform()
+        _, vectors = np.linalg.eigh(weight * matrix.real + (1 - weight) * matrix.imag)
+        diagonal = vectors.T @ matrix @ vectors
+        if np.allclose(diagonal, np.diag(np.diag(diagonal)), atol=TOLERANCE):
+            if np.linalg.det(vectors) < 0:
+                vectors[:, 0] = -vectors[:, 0]
+            return vectors
+    raise Exception("The unitary could not be diagonalized.")
+
+
+def canonical_interaction(a, b, c):
+    """Decompose exp(i(a XX + b YY + c ZZ)) up to a global phase, with
+    three CX gates (Vatan and Williams) or two when only a is not zero."""
+    if abs(b) < TOLERANCE and abs(c) < TOLERANCE:
+        # exp(i a XX) is exp(i a ZZ) in the Hadamard basis
+        return [
+            ("u", 0, H), ("u", 1, H), ("cx", 1, 0), ("u", 0, rz(-2 * a)),
+            ("cx", 1, 0), ("u", 0, H), ("u", 1, H),
+        ]
+    return [
+        ("u", 0, rz(-np.pi / 2)),
+        ("cx", 0, 1),
+        ("u", 1, rz(np.pi / 2 - 2 * c)),
+        ("u", 0, ry(2 * a - np.pi / 2)),
+        ("cx", 1, 0),
+        ("u", 0, ry(np.pi / 2 - 2 * b)),
+        ("cx", 0, 1),
+        ("u", 1, rz(np.pi / 2)),
+    ]
+
+
+def two_qubit_unitary(matrix):
+    """Decompose a two qubit unitary with the KAK decomposition: single
+    qubit unitaries around exp(i(a XX + b YY + c ZZ)), which needs at most
+    three CX gates. Products of single qubit unitaries need none."""
+    determinant_phase = np.angle(np.linalg.det(matrix)) / 4
+    special = np.exp(-1j * determinant_phase) * matrix
+    magic = MAGIC_BASIS.conj().T @ special @ MAGIC_BASIS
+    vectors = diagonalize_symmetric_unitary(magic.T @ magic)
+    angles = np.angle(np.diag(vectors.T @ magic.T @ magic @ vectors)) / 2
+    left = magic @ vectors @ np.diag(np.exp(-1j * angles))
+    if np.linalg.det(left.real) < 0:
+        angles[0] += np.pi
+        left[:, 0] = -left[:, 0]
+    a, b, c, _ = np.linalg.solve(MAGIC_DIAGONALS.T, angles)
+
+    first_after, second_after = kronecker_factors(MAGIC_BASIS @ left @ MAGIC_BASIS.conj().T)
+    first_before, second_before = kronecker_factors(MAGIC_BASIS @ vectors.T @ MAGIC_BASIS.conj().T)
+    if abs(a) < TOLERANCE and abs(b) < TOLERANCE and abs(c) < TOLERANCE:
+        interaction = []
+    elif abs(a) < TOLERANCE and abs(b) < TOLERANCE:
+        # exp(i c ZZ) is exp(i c XX) in the Hadamard basis
+        interaction = [("u", 0, H), ("u", 1, H)] + canonical_interaction(c, 0, 0) + [("u", 0, H), ("u", 1, H)]
+    else:
+        interaction = canonical_interaction(a, b, c)
+    operations = [("u", 0, first_before), ("u", 1, second_before)] + interaction + [("u", 0, first_after), ("u", 1, second_after)]
+
+    # move the remaining global phase into a single qubit unitary
+    remaining = matrix @ operations_matrix(operations, 2).conj().T
+    operations[-1] = ("u", 1, remaining[0, 0] * second_after)
+    return merge_operations(operations)
+
+
+def qft_operations(no_qubits):
+    """Decompose the quantum Fourier transform as built by qiskit."""
+    operations = []
+    for target in reversed(range(no_qubits)):
+        operations.append(("u", target, H))
+        for control in reversed(range(target)):
+            operations += controlled_unitary(phase(np.pi / 2 ** (target - control)), [target], control)
+    for qubit in range(no_qubits // 2):
+        other = no_qubits - qubit - 1
+        operations += [("cx", qubit, other), ("cx", other, qubit), ("cx", qubit, other)]
+    return merge_operations(operations)
+
+
+def inverse_operations(operations):
+    return [
+        ("u", operation[1], operation[2].conj().T) if operation[0] == "u" else operation
+        for operation in reversed(operations)
+    ]
+
+
+def merge_operations(operations):
+    """Multiply single qubit unitaries acting one after the other on the
+    same qubit, drop CX pairs cancelling each other."""
+    merged = []
+    # index in merged of the last operation acting on each qubit
+    last = {}
+    for operation in operations:
+        if operation[0] == "u":
+            _, qubit, matrix = operation
+            index = last.get(qubit)
+            if index is not None and merged[index][0] == "u":
+                merged[index] = ("u", qubit, matrix @ merged[index][2])
+                continue
+            last[qubit] = len(merged)
+            merged.append(operation)
+        else:
+            _, control, target = operation
+            index = last.get(control)
+            if index is not None and index == last.get(target) and merged[index] == operation:
+                merged[index] = None
+                last.pop(control)
+                last.pop(target)
+                continue
+            last[control] = last[target] = len(merged)
+            merged.append(operation)
+    return [operation for operation in merged if operation is not None]
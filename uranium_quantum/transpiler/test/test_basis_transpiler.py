@@ -0,0 +1,89 @@
+"""Tests decomposing gates into a basis of gates."""
+
+import numpy as np
+import pytest
+
+from ..basis_transpiler import BasisTranspiler, decompose, gate_key, parse_basis
+from ..gate_library import FIXED_GATES, X, gate_matrix, qft
+from ..synthesis import controlled_unitary, controlled_x, operations_matrix, qft_operations, two_qubit_unitary
+
+
+def random_unitary(random, size):
+    q, r = np.linalg.qr(random.normal(size=(size, size)) + 1j * random.normal(size=(size, size)))
+    return q * (np.diag(r) / abs(np.diag(r)))
+
+
+def controlled_matrix(matrix, no_controls):
+    """The matrix of a single qubit unitary on qubit 0 controlled by the next qubits."""
+    full = np.eye(2 ** (no_controls + 1), dtype=complex)
+    full[-2:, -2:] = matrix
+    return full
+
+
+def test_two_qubit_decompositions_are_exact():
+    random = np.random.default_rng(1)
+    for matrix in [random_unitary(random, 4) for _ in range(20)] + [gate for gate in FIXED_GATES.values() if len(gate) == 4]:
+        operations = two_qubit_unitary(matrix)
+        assert np.allclose(operations_matrix(operations, 2), matrix)
+        assert sum(operation[0] == "cx" for operation in operations) <= 3
+
+    # single interaction terms need two CX gates, products of single qubit unitaries none
+    zz = gate_matrix({"name": "zz", "targets": [0, 1], "theta": 0.3})
+    assert sum(operation[0] == "cx" for operation in two_qubit_unitary(zz)) == 2
+    local = np.kron(random_unitary(random, 2), random_unitary(random, 2))
+    assert [operation[0] for operation in two_qubit_unitary(local)] == ["u", "u"]
+
+
+def test_controlled_decompositions_are_exact():
+    random = np.random.default_rng(2)
+    for no_controls in range(1, 5):
+        matrix = random_unitary(random, 2)
+        controls = list(range(1, no_controls + 1))
+        assert np.allclose(operations_matrix(controlled_unitary(matrix, controls, 0), no_controls + 1), controlled_matrix(matrix, no_controls))
+        assert np.allclose(operations_matrix(controlled_x(controls, 0), no_controls + 1), controlled_matrix(X, no_controls))
+    assert controlled_x([1], 0) == [("cx", 1, 0)]
+
+
+def test_qft_decomposition():
+    for no_qubits in range(1, 5):
+        assert np.allclose(operations_matrix(qft_operations(no_qubits), no_qubits), qft(no_qubits))
+
+
+def test_transpile_circuit():
+    circuit = {
+        "circuit_id": 1,
+        "circuit_name": "Main",
+        "steps": [
+            {"index": 0, "gates": [
+                {"name": "berkeley", "targets": [0, 1]},
+                {"name": "hadamard", "targets": [2], "controls": [{"target": 3, "state": "+i"}]},
+            ]},
+            {"index": 1, "gates": [
+                {"name": "measure-z", "targets": [0], "bit": 0},
+                {"name": "berkeley", "targets": [2, 1]},
+            ]},
+        ],
+    }
+    decompose.cache_clear()
+
+    transpiled = BasisTranspiler("rz,sx,cx").transpile_circuit(circuit)
+
+    assert (transpiled["circuit_id"], transpiled["circuit_name"]) == (1, "Main")
+    assert "global_phase" in transpiled
+    assert [step["index"] for step in transpiled["steps"]] == list(range(len(transpiled["steps"])))
+    names = set()
+    for step in transpiled["steps"]:
+        qubits = [qubit for gate in step["gates"] for qubit in gate["targets"] + [control["target"] for control in gate.get("controls", [])]]
+        # gates of a step act on distinct qubits
+        assert len(qubits) == len(set(qubits))
+        names.update(gate["name"] for gate in step["gates"])
+    assert names == {"rz-theta", "v", "pauli-x", "measure-z"}
+    # the second berkeley gate reuses the decomposition of the first one
+    assert decompose.cache_info().hits == 1
+    assert gate_key(circuit["steps"][0]["gates"][0]) == gate_key(circuit["steps"][1]["gates"][1])
+
+
+def test_unsupported_basis():
+    assert parse_basis(["CX", "u3"]) == frozenset(["u3", "cx"])
+    with pytest.raises(Exception, match="Basis cx,rx is not supported"):
+        BasisTranspiler("rx,cx")
@@ -0,0 +1,115 @@
+"""Tests routing circuits on coupling maps."""
+
+import random
+
+import numpy as np
+import pytest
+
+from ..basis_transpiler import BasisTranspiler
+from ..gate_library import gate_matrix
+from ..routing import CouplingMap, Router
+from ..synthesis import operations_matrix
+
+
+def circuit_matrix(yaml_data, no_qubits):
+    """The unitary of a circuit of single qubit gates, CX gates and swaps."""
+    operations = []
+    for step in yaml_data["steps"]:
+        for gate in step["gates"]:
+            if gate["name"] == "swap":
+                first, second = gate["targets"]
+                operations += [("cx", first, second), ("cx", second, first), ("cx", first, second)]
+            elif gate.get("controls"):
+                operations.append(("cx", gate["controls"][0]["target"], gate["targets"][0]))
+            elif gate["name"] != "barrier":
+                operations.append(("u", gate["targets"][0], gate_matrix(gate)))
+    return operations_matrix(operations, no_qubits)
+
+
+def layout_matrix(layout):
+    """The permutation moving each logical qubit to its physical qubit."""
+    size = 2 ** len(layout)
+    matrix = np.zeros((size, size))
+    for index in range(size):
+        moved = sum(((index >> logical) & 1) << physical for logical, physical in enumerate(layout))
+        matrix[moved, index] = 1
+    return matrix
+
+
+def random_circuit(random_generator, no_qubits, no_gates):
+    gates = []
+    for _ in range(no_gates):
+        if random_generator.random() < 0.5:
+            first, second = random_generator.sample(range(no_qubits), 2)
+            gates.append({"name": "pauli-x", "targets": [second], "controls": [{"target": first, "state": "1"}]})
+        else:
+            name = random_generator.choice(["hadamard", "t", "v"])
+            gates.append({"name": name, "targets": [random_generator.randrange(no_qubits)]})
+    return {"circuit_id": 0, "steps": [{"index": index, "gates": [gate]} for index, gate in enumerate(gates)]}
+
+
+def assert_coupled(routed, coupling_map):
+    for step in routed["steps"]:
+        qubits = [qubit for gate in step["gates"] for qubit in gate["targets"] + [control["target"] for control in gate.get("controls") or []]]
+        assert len(qubits) == len(set(qubits))
+        for gate in step["gates"]:
+            if gate["name"] == "swap":
+                first, second = gate["targets"]
+            elif gate.get("controls"):
+                first, second = gate["controls"][0]["target"], gate["targets"][0]
+            else:
+                continue
+            assert coupling_map.distances[first][second] == 1
+
+
+def test_coupling_map_distances():
+    grid = CouplingMap.grid(3, 4)
+    assert grid.neighbors[5] == [1, 4, 6, 9]
+    assert (grid.distances[0][11], grid.distances[11][0], grid.distances[5][5]) == (5, 5, 0)
+    assert grid.diameter == 5
+    assert CouplingMap.line(6).distances[1][5] == 4
+    with pytest.raises(Exception, match="not connected"):
+        CouplingMap([(0, 1), (2, 3)])
+
+
+def test_routed_circuits_are_equivalent():
+    random_generator = random.Random(3)
+    for coupling_map in (CouplingMap.line(5), CouplingMap.grid(2, 3), CouplingMap([(0, 1), (0, 2), (0, 3), (0, 4)])):
+        no_qubits = coupling_map.no_qubits
+        for _ in range(5):
+            circuit = random_circuit(random_generator, no_qubits, 40)
+            initial_layout = random_generator.sample(range(no_qubits), no_qubits)
+            routed, final_layout = Router(coupling_map).route(circuit, initial_layout)
+            assert routed["circuit_id"] == 0
+            assert_coupled(routed, coupling_map)
+            assert sorted(final_layout) == list(range(no_qubits))
+            assert np.allclose(
+                circuit_matrix(routed, no_qubits) @ layout_matrix(initial_layout),
+                layout_matrix(final_layout) @ circuit_matrix(circuit, no_qubits),
+            )
+
+
+def test_routing_on_a_larger_device():
+    coupling_map = CouplingMap.grid(10, 10)
+    circuit = random_circuit(random.Random(4), 80, 3000)
+    routed, final_layout = Router(coupling_map).route(circuit)
+    assert_coupled(routed, coupling_map)
+    assert len(final_layout) == 80
+    routed_gates = [gate for step in routed["steps"] for gate in step["gates"] if gate["name"] != "swap"]
+    assert len(routed_gates) == 3000
+    # the swaps of independent blocked gates share steps
+    assert len(routed["steps"]) < sum(len(step["gates"]) for step in routed["steps"]) / 2
+
+
+def test_routing_requires_gates_on_at_most_two_qubits():
+    toffoli = {"name": "pauli-x", "targets": [2], "controls": [{"target": 0, "state": "1"}, {"target": 1, "state": "1"}]}
+    circuit = {"steps": [{"index": 0, "gates": [toffoli]}, {"index": 1, "gates": [{"name": "barrier", "targets": [0, 1, 2]}]}]}
+    router = Router(CouplingMap.line(3))
+    with pytest.raises(Exception, match="BasisTranspiler"):
+        router.route(circuit)
+
+    routed, final_layout = router.route(BasisTranspiler("u3,cx").transpile_circuit(circuit), initial_layout=[1, 0, 2])
+    assert_coupled(routed, router.coupling_map)
+    assert routed["steps"][-1]["gates"][-1] == {"name": "barrier", "targets": [final_layout[0], final_layout[1], final_layout[2]]}
+    with pytest.raises(Exception, match="distinct physical qubits"):
+        router.route({"steps": circuit["steps"][1:]}, initial_layout=[0, 0, 1])